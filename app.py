@@ -3,8 +3,15 @@ import pandas as pd
 import json
 import os
 import base64
+import hashlib
 import re
-from datetime import datetime, date
+import shutil
+from datetime import date
+
+from member_store import MemberRepository
+from member_search import MemberSearchIndex
+from record_store import MeasureRecordStore
+from measure_columns import MeasureColumnStore, start_background_compaction
 
 # =====================================
 # 기본 설정
@@ -14,7 +21,8 @@ st.set_page_config(page_title="ELBURIM CRM", layout="wide")
 DATA_DIR = "data_members"
 os.makedirs(DATA_DIR, exist_ok=True)
 
-MEMBER_FILE = os.path.join(DATA_DIR, "members_master.csv")
+MEMBER_FILE = os.path.join(DATA_DIR, "members_master.csv")  # 예전 저장 형식 (DB로 1회 가져옴)
+MEMBER_DB = os.path.join(DATA_DIR, "members.db")
 RECORD_FILE = os.path.join(DATA_DIR, "measure_records.csv")
 
 # =====================================
@@ -82,8 +90,17 @@ def migrate_legacy_members_if_needed():
     df.to_csv(MEMBER_FILE, index=False, encoding="utf-8-sig")
 
 
-# 앱 시작 시 마이그레이션 실행
-migrate_legacy_members_if_needed()
+@st.cache_resource
+def get_member_repo() -> MemberRepository:
+    """
+    회원 저장소 (프로세스당 1번 생성)
+    - 마이그레이션: legacy 엑셀 → CSV → DB (최초 1회)
+    """
+    migrate_legacy_members_if_needed()
+    return MemberRepository(MEMBER_DB, csv_path=MEMBER_FILE)
+
+
+member_repo = get_member_repo()
 
 
 # 1) 프로젝트 내부 상대경로(배포/다른PC 대비) - 우선
@@ -91,15 +108,49 @@ TEMPLATE_REL = os.path.join(DATA_DIR, "measure_images", "elburim_customer_servic
 # 2) 로컬 PC 절대경로(네가 준 경로) - fallback
 TEMPLATE_ABS = r"G:\My Drive\MyPortfolio\No2_data_automation\data_members\measure_images\elburim_customer_service.png"
 
+# 정적 파일 폴더 (.streamlit/config.toml 의 server.enableStaticServing = true 일 때 /app/static/ 으로 제공)
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "static")
+
 
 # =====================================
 # 유틸
 # =====================================
-def image_to_data_url(path: str) -> str:
+@st.cache_data(show_spinner=False)
+def _encode_data_url(path: str, mtime_ns: int) -> str:
+    # (경로, 수정시각) 기준 캐시 → 프로세스당 1번만 base64 인코딩
     with open(path, "rb") as f:
         b64 = base64.b64encode(f.read()).decode()
     return f"data:image/png;base64,{b64}"
 
+def image_to_data_url(path: str) -> str:
+    return _encode_data_url(path, os.stat(path).st_mtime_ns)
+
+@st.cache_data(show_spinner=False)
+def _publish_static(path: str, mtime_ns: int) -> str:
+    """
+    이미지를 static/ 폴더에 내용 해시 파일명으로 복사 → 'app/static/<파일명>' 반환
+    파일명이 내용에 따라 바뀌므로 브라우저는 한 번 받은 이미지를 계속 캐시해서 사용
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    stem, ext = os.path.splitext(os.path.basename(path))
+    name = f"{stem}_{digest}{ext}"
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    dest = os.path.join(STATIC_DIR, name)
+    if not os.path.exists(dest):
+        shutil.copyfile(path, dest)
+    return f"app/static/{name}"
+
+def template_image_url(path: str) -> str:
+    """
+    양식 배경 이미지 URL
+    - 정적 파일 제공이 켜져 있으면 static URL (페이지에는 짧은 URL만 들어감)
+    - 아니면 base64 data URL (캐시된 값 재사용)
+    """
+    if st.get_option("server.enableStaticServing"):
+        return _publish_static(path, os.stat(path).st_mtime_ns)
+    return image_to_data_url(path)
+
 def get_template_path():
     # 상대경로 우선
     if os.path.exists(TEMPLATE_REL):
@@ -133,48 +184,41 @@ def normalize_phone(s: str) -> str:
         return f"{digits[:3]}-{digits[3:7]}-{digits[7:]}"
     return raw  # 입력 그대로 두되, 검색 가능하도록 문자열 유지
 
+@st.cache_data(show_spinner=False)
+def _members_snapshot(version: int) -> pd.DataFrame:
+    return member_repo.all()
+
 def load_members():
-    df = _read_csv_safe(MEMBER_FILE)
-    if df.empty:
-        return pd.DataFrame(columns=["member_id", "name", "phone"])
-    # 컬럼 누락 방어
-    for c in ["member_id", "name", "phone"]:
-        if c not in df.columns:
-            df[c] = ""
-    return df[["member_id", "name", "phone"]].copy()
+    # DB 쓰기가 있을 때만 다시 읽음 (version 기준 캐시)
+    return _members_snapshot(member_repo.version())
 
-def save_members(df):
-    # 표준 컬럼만 저장
-    for c in ["member_id", "name", "phone"]:
-        if c not in df.columns:
-            df[c] = ""
-    _write_csv_safe(df[["member_id", "name", "phone"]], MEMBER_FILE)
+@st.cache_resource(max_entries=2, show_spinner=False)
+def _member_search_index(version: int) -> MemberSearchIndex:
+    return MemberSearchIndex(_members_snapshot(version))
+
+def get_member_search_index() -> MemberSearchIndex:
+    # 회원 데이터 버전당 1번만 인덱스 생성 (키 입력마다 전체 스캔하지 않음)
+    return _member_search_index(member_repo.version())
 
-def ensure_record_file():
-    if not os.path.exists(RECORD_FILE):
-        _write_csv_safe(pd.DataFrame(columns=["created_at", "member_id", "payload_json"]), RECORD_FILE)
+@st.cache_resource
+def get_record_store() -> MeasureRecordStore:
+    # measure_records.csv + 회원별 offset 인덱스 (프로세스당 1번 생성)
+    return MeasureRecordStore(RECORD_FILE)
+
+@st.cache_resource
+def get_measure_columns() -> MeasureColumnStore:
+    # 기록 → 타입 컬럼 파일(data_members/measure_columns/) 백그라운드 compact (프로세스당 1번 시작)
+    store = MeasureColumnStore(RECORD_FILE)
+    start_background_compaction(store)
+    return store
 
 def load_records(member_id: str):
-    ensure_record_file()
-    df = _read_csv_safe(RECORD_FILE)
-    if df.empty:
-        return df
-    for c in ["created_at", "member_id", "payload_json"]:
-        if c not in df.columns:
-            df[c] = ""
-    return df[df["member_id"].astype(str) == str(member_id)].copy()
+    # 해당 회원 기록만 인덱스로 읽음 (전체 CSV 스캔 없음)
+    return get_record_store().load(member_id)
 
 def append_record(member_id: str, values: dict):
-    ensure_record_file()
-    row = {
-        "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "member_id": str(member_id),
-        "payload_json": json.dumps(values, ensure_ascii=False),
-    }
-    # append
-    pd.DataFrame([row]).to_csv(
-        RECORD_FILE, mode="a", header=False, index=False, encoding="utf-8-sig"
-    )
+    # CSV 끝에 1줄 추가 + 인덱스 갱신
+    get_record_store().append(member_id, values)
 
 def safe_json_load(s):
     try:
@@ -182,18 +226,6 @@ def safe_json_load(s):
     except:
         return {}
 
-def next_member_id(members_df: pd.DataFrame) -> str:
-    """
-    M0001 ~ 형태에서 max+1로 생성 (중복 방지)
-    """
-    if members_df is None or members_df.empty:
-        return "M0001"
-    series = members_df["member_id"].astype(str).str.replace("M", "", regex=False)
-    nums = pd.to_numeric(series, errors="coerce")
-    if nums.notna().any():
-        return f"M{int(nums.max()) + 1:04d}"
-    return f"M{len(members_df) + 1:04d}"
-
 
 # =====================================
 # 종이양식 필드 좌표(비율 기반)
@@ -266,7 +298,8 @@ def inject_css(tablet_mode: bool):
 # =====================================
 # 사이드바: 회원 선택 / 검색 / 태블릿 모드 / 기록 불러오기
 # =====================================
-members = load_members()
+member_index = get_member_search_index()
+get_measure_columns()
 
 st.sidebar.title("회원 관리")
 tablet_mode = st.sidebar.toggle("태블릿 모드", value=True)
@@ -276,52 +309,31 @@ st.sidebar.subheader("회원 검색")
 q_name = st.sidebar.text_input("이름 검색", value="")
 q_phone = st.sidebar.text_input("전화번호 검색", value="")
 
-filtered = members.copy()
-
-if q_name.strip() or q_phone.strip():
-    mask = False
-
-    if q_name.strip():
-        mask = members["name"].astype(str).str.contains(q_name.strip(), na=False)
-
-    if q_phone.strip():
-        phone_mask = members["phone"].astype(str).str.contains(q_phone.strip(), na=False)
-        mask = mask | phone_mask if isinstance(mask, pd.Series) else phone_mask
-
-    filtered = members[mask]
-
 # (B) 신규 회원
 with st.sidebar.expander("➕ 신규 회원 등록", expanded=False):
     new_name = st.text_input("이름", key="new_name")
     new_phone = st.text_input("전화번호", key="new_phone")
     if st.button("등록", key="btn_register"):
-        new_id = next_member_id(members)
-        row = {
-            "member_id": new_id,
-            "name": str(new_name).strip(),
-            "phone": normalize_phone(new_phone),
-        }
-        members = pd.concat([members, pd.DataFrame([row])], ignore_index=True)
-        save_members(members)
+        # 회원번호 발급 + 저장을 DB 트랜잭션 하나로 처리
+        new_id = member_repo.add(str(new_name).strip(), normalize_phone(new_phone))
         st.session_state["selected_member"] = new_id
         st.success(f"등록 완료: {new_id}")
         st.rerun()
 
 # =========================
 # 회원 검색 (이름 OR 전화번호)
+# - 이름: 앞부분 → 초성(ㄱㅊㅅ) → 중간 일치 순 / 전화: 하이픈 무시, 앞자리 → 뒷자리 → 중간 일치 순
+# - 검색어가 없으면 최근 등록 회원부터, 최대 SEARCH_LIMIT 명
 # =========================
+SEARCH_LIMIT = 50
 
-filtered = members.copy()
 if q_name.strip() or q_phone.strip():
-    mask = pd.Series([False] * len(members))
-
-    if q_name.strip():
-        mask = mask | members["name"].astype(str).str.contains(q_name.strip(), na=False)
-
-    if q_phone.strip():
-        mask = mask | members["phone"].astype(str).str.contains(q_phone.strip(), na=False)
+    filtered = member_index.search(q_name, q_phone, limit=SEARCH_LIMIT)
+else:
+    filtered = member_index.recent(limit=SEARCH_LIMIT)
 
-    filtered = members[mask].copy()
+if len(filtered) >= SEARCH_LIMIT and len(member_index) > SEARCH_LIMIT:
+    st.sidebar.caption(f"상위 {SEARCH_LIMIT}명만 표시합니다. 검색어를 더 입력해 주세요.")
 
 # =========================
 # 회원 선택 (검색 결과 기반)
@@ -374,14 +386,14 @@ if template_path is None:
     st.code(TEMPLATE_ABS)
     st.stop()
 
-bg_url = image_to_data_url(template_path)
+bg_url = template_image_url(template_path)
 
 if not selected_member:
     st.title("🧵 ELBURIM CRM")
     st.info("왼쪽에서 회원을 등록하거나 선택하세요.")
     st.stop()
 
-member = members[members["member_id"].astype(str) == str(selected_member)].iloc[0]
+member = member_repo.get(selected_member)
 st.title(f"🧵 고객 상담 기록지 - {member['name']} ({member['member_id']})")
 
 # 상단 액션 바
@@ -5,6 +5,11 @@ import pandas as pd
 import streamlit as st
 import json
 
+from data_context import DataContext
+from id_sequence import IdSequence
+from write_behind import WriteBehindQueue
+from size_rules import SIZE_RULE_SPECS, ensure_rule_file, load_size_rules, rule_path, save_size_rules
+
 # ==========================================================
 # 기본 설정
 # ==========================================================
@@ -18,7 +23,7 @@ os.makedirs(SETTINGS_DIR, exist_ok=True)
 MASTER_FILE = os.path.join(DATA_DIR, "members_master.xlsx")
 MEASURE_FILE = os.path.join(DATA_DIR, "members_measurements.xlsx")
 CONSULT_FILE = os.path.join(DATA_DIR, "consultations.xlsx")
-SIZE_RULE_FILE = os.path.join(SETTINGS_DIR, "size_rules.xlsx")
+SIZE_RULE_FILE = rule_path("jacket")
 
 # ==========================================================
 # 공통: 컬럼 표준/한글 매핑 (members/consult 내부처리용)
@@ -58,7 +63,7 @@ COL_KOR_MAP_CONSULT = {
 }
 
 COL_INTERNAL_MEASURES = [
-    "member_id", "measure_date",
+    "measure_id", "member_id", "measure_date",
     "shoulder_in", "shoulder_cm",
     "chest_in", "chest_cm",
     "waist_in", "waist_cm",
@@ -69,6 +74,7 @@ COL_INTERNAL_MEASURES = [
 ]
 
 COL_KOR_MAP_MEASURES = {
+    "measure_id": "치수번호",
     "member_id": "회원번호",
     "measure_date": "측정일",
     "shoulder_in": "어깨_in",
@@ -136,22 +142,11 @@ def clean_phone(value):
 # 설정 – 사이즈 규칙
 # ==========================================================
 def ensure_size_rule_file():
-    if not os.path.exists(SIZE_RULE_FILE):
-        df = pd.DataFrame({
-            "가슴_cm_하한": [92, 96, 100, 104],
-            "가슴_cm_상한": [95, 99, 103, 107],
-            "상의호칭": ["K48", "K50", "K52", "K54"]
-        })
-        df.to_excel(SIZE_RULE_FILE, index=False)
+    ensure_rule_file("jacket")
 
 def recommend_jacket_size(chest_cm):
-    if pd.isna(chest_cm) or chest_cm is None:
-        return "추천 불가"
-    rules = pd.read_excel(SIZE_RULE_FILE)
-    for _, r in rules.iterrows():
-        if r["가슴_cm_하한"] <= chest_cm <= r["가슴_cm_상한"]:
-            return r["상의호칭"]
-    return "규칙 없음"
+    # 규칙은 파일이 바뀌었을 때만 다시 읽음 (size_rules.load_size_rules)
+    return load_size_rules("jacket").recommend_one(chest_cm)
 
 # ==========================================================
 # 파일 생성 보장
@@ -165,7 +160,7 @@ def ensure_files():
     # 치수: 한글 컬럼으로 저장(현장 입력용)
     if not os.path.exists(MEASURE_FILE):
         pd.DataFrame(columns=[
-            "회원번호", "측정일",
+            "치수번호", "회원번호", "측정일",
             "어깨_in", "어깨_cm",
             "가슴_in", "가슴_cm",
             "허리_in", "허리_cm",
@@ -185,8 +180,31 @@ ensure_size_rule_file()
 
 # ==========================================================
 # 로드/세이브 (중요: 내부처리는 영문 컬럼 통일)
+# 저장은 write-behind 큐로: WAL 기록 후 바로 반환, 엑셀 다시 쓰기는 백그라운드
+# 화면에서 새로 만든 행은 append_* 로 행만 추가 (다른 태블릿이 추가한 행을 덮어쓰지 않음)
+# 읽기 전에는 그 파일의 대기 중인 저장이 끝나기를 기다림
 # ==========================================================
+@st.cache_resource
+def get_write_queue():
+    queue = WriteBehindQueue(os.path.join(DATA_DIR, "wal"))
+    queue.recover()  # 이전 실행에서 기록하지 못한 저장
+    return queue
+
+def wait_saved(path):
+    # 대기 중인 저장을 마무리하고 읽기, 기록에 실패해 재시도 중이면 화면에 알림 (파일은 이전 내용)
+    queue = get_write_queue()
+    if not queue.wait(path):
+        error = queue.errors.get(os.path.abspath(path), "시간 초과")
+        st.warning(f"{os.path.basename(path)} 저장이 아직 반영되지 않았습니다 (자동 재시도 중): {error}")
+
+@st.cache_resource
+def get_id_sequence():
+    # 회원번호/상담번호/주문번호 발급 (여러 태블릿이 동시에 등록해도 중복 없음)
+    # app.py 회원 저장소(members.db)의 id_seq 를 같이 씀 → 두 화면이 같은 회원번호를 내지 않음
+    return IdSequence(os.path.join(DATA_DIR, "members.db"))
+
 def read_members():
+    wait_saved(MASTER_FILE)
     df = pd.read_excel(MASTER_FILE)
     # 한글 컬럼이면 영문으로 변환
     if "이름" in df.columns:
@@ -207,7 +225,10 @@ def save_members(df_internal):
     df_internal = df_internal.copy()
     # 내부(영문) -> 한글로 저장
     df_kor = df_to_kor(df_internal, "members")
-    df_kor.to_excel(MASTER_FILE, index=False)
+    return get_write_queue().submit(MASTER_FILE, df_kor)
+
+def append_members(rows_internal):
+    return get_write_queue().submit_rows(MASTER_FILE, df_to_kor(rows_internal, "members"), key="회원번호")
 
 def df_to_kor_measures(df):
     if df is None or df.empty:
@@ -225,6 +246,7 @@ def ensure_measures_file():
 
 def read_measures():
     ensure_measures_file()
+    wait_saved(MEASURE_FILE)
     df = pd.read_excel(MEASURE_FILE)
 
     # 한글로 저장된 파일이면 영문으로 변환
@@ -240,10 +262,14 @@ def read_measures():
 
 def save_measures(df):
     df_kor = df_to_kor_measures(df)
-    df_kor.to_excel(MEASURE_FILE, index=False)
+    return get_write_queue().submit(MEASURE_FILE, df_kor)
+
+def append_measures(rows):
+    return get_write_queue().submit_rows(MEASURE_FILE, df_to_kor_measures(rows), key="치수번호")
 
 
 def read_consults():
+    wait_saved(CONSULT_FILE)
     df = pd.read_excel(CONSULT_FILE)
     if "상담일" in df.columns:
         df = df_to_eng(df, "consult")
@@ -256,18 +282,10 @@ def read_consults():
 
 def save_consults(df_internal):
     df_kor = df_to_kor(df_internal, "consult")
-    df_kor.to_excel(CONSULT_FILE, index=False)
-
-def read_measures():
-    # 치수는 한글 컬럼으로 계속 유지 (현장/엑셀 보기 우선)
-    df = pd.read_excel(MEASURE_FILE)
-    for col in ["회원번호", "측정일"]:
-        if col not in df.columns:
-            df[col] = ""
-    return df
+    return get_write_queue().submit(CONSULT_FILE, df_kor)
 
-def save_measures(df):
-    df.to_excel(MEASURE_FILE, index=False)
+def append_consults(rows_internal):
+    return get_write_queue().submit_rows(CONSULT_FILE, df_to_kor(rows_internal, "consult"), key="상담번호")
 
 # ==========================================================
 # 주문/작업지시서 파일 처리
@@ -292,19 +310,19 @@ def ensure_orders_file():
 
 def read_orders():
     ensure_orders_file()
+    wait_saved(ORDER_FILE)
     return pd.read_excel(ORDER_FILE)
 
 def save_orders(df):
-    df.to_excel(ORDER_FILE, index=False)
+    return get_write_queue().submit(ORDER_FILE, df)
 
+def append_orders(rows):
+    return get_write_queue().submit_rows(ORDER_FILE, rows, key="order_id")
 
-# ==========================================================
-# 데이터 로드
-# ==========================================================
-members = read_members()
 
 # 기존 엑셀 파일이 영문 컬럼이면 → 한글 컬럼으로 1회 강제 저장(마이그레이션)
 def migrate_excel_columns_to_korean():
+    get_write_queue().flush()  # 다른 세션이 저장 중인 파일은 기록이 끝난 뒤 확인
     # 1) members_master.xlsx
     df_m = pd.read_excel(MASTER_FILE)
 
@@ -325,6 +343,7 @@ def migrate_excel_columns_to_korean():
     # 예전에 영문 컬럼으로 저장된 적이 있으면 여기서 한글로 강제 변환
     # (영문 치수 파일을 쓰던 버전이 있었다면 아래 매핑을 맞춰주면 됨)
     eng_to_kor_measure = {
+        "measure_id": "치수번호",
         "member_id": "회원번호",
         "measure_date": "측정일",
         "shoulder_in": "어깨_in", "shoulder_cm": "어깨_cm",
@@ -344,14 +363,24 @@ def migrate_excel_columns_to_korean():
             changed = True
 
     if changed:
-        df_me.to_excel(MEASURE_FILE, index=False)
+        get_write_queue().submit(MEASURE_FILE, df_me)
 
-# 실행
-migrate_excel_columns_to_korean()
-
-members = read_members()
-measures = read_measures()
-consults = read_consults()
+# ==========================================================
+# 데이터 로드: 세션마다 DataContext 1개
+# (파일이 바뀌었을 때만 다시 읽음, 회원별 조회는 인덱스, 저장은 flush 때)
+# ==========================================================
+def get_data_context():
+    if "data_ctx" not in st.session_state:
+        migrate_excel_columns_to_korean()
+        st.session_state["data_ctx"] = DataContext({
+            "members": (MASTER_FILE, read_members, save_members, append_members),
+            "consults": (CONSULT_FILE, read_consults, save_consults, append_consults),
+            "measures": (MEASURE_FILE, read_measures, save_measures, append_measures),
+            "orders": (ORDER_FILE, read_orders, save_orders, append_orders),
+        }, written=get_write_queue().written_version)  # 저장한 표는 기록이 끝나도 다시 읽지 않음
+    return st.session_state["data_ctx"]
+
+ctx = get_data_context()
 
 # ==========================================================
 # session_state 기본값
@@ -371,8 +400,8 @@ page = st.sidebar.radio("메뉴 선택", ["HOME - ELBURIM 양복점", "회원 
 # ==========================================================
 if page == "HOME - ELBURIM 양복점":
     st.title("ELBURIM 양복점 CRM 요약")
-    st.metric("총 회원 수", len(members))
-    st.metric("치수 등록 건수", len(measures))
+    st.metric("총 회원 수", len(ctx.frame("members")))
+    st.metric("치수 등록 건수", len(ctx.frame("measures")))
 
 # ==========================================================
 # 회원 관리
@@ -392,10 +421,10 @@ elif page == "회원 관리":
     # -------------------------
     # 1) 데이터 로드 (내부표준: 영문 컬럼 고정)
     # -------------------------
-    members = read_members()      # 내부: member_id, name, birth_date, phone, address, job, first_visit, note, status(있으면)
-    consults = read_consults()    # 내부: consult_id, member_id, consult_date ...
-    measures = read_measures()    # 내부: member_id, measure_date, shoulder_in, shoulder_cm ... (네 파일 구조에 맞춰)
-    orders = read_orders()        # 내부: order_id, member_id, template_name, payload ...
+    members = ctx.frame("members")    # 내부: member_id, name, birth_date, phone, address, job, first_visit, note, status(있으면)
+    consults = ctx.frame("consults")  # 내부: consult_id, member_id, consult_date ...
+    orders = ctx.frame("orders")      # 내부: order_id, member_id, template_name, payload ...
+    # 치수는 선택 회원 것만 ctx.for_member("measures", ...) 로 조회
 
     # members에 status 컬럼 없으면 추가(안전)
     if "status" not in members.columns:
@@ -457,14 +486,11 @@ elif page == "회원 관리":
             submit = st.form_submit_button("등록 완료")
 
         if submit:
-            # 새 ID 생성
-            if members.empty:
-                new_id = "M0001"
-            else:
-                nums = members["member_id"].astype(str).str.replace("M", "", regex=False)
-                nums = pd.to_numeric(nums, errors="coerce")
-                new_num = int(nums.max()) + 1 if nums.notna().any() else (len(members) + 1)
-                new_id = f"M{new_num:04d}"
+            # 새 ID 생성 (시퀀스에서 발급 → 다른 태블릿과 겹치지 않음, 파일의 최대 번호보다는 항상 큼)
+            nums = members["member_id"].astype(str).str.replace("M", "", regex=False)
+            nums = pd.to_numeric(nums, errors="coerce")
+            max_num = int(nums.max()) if nums.notna().any() else len(members)
+            new_id = f"M{get_id_sequence().next('member', at_least=max_num):04d}"
 
             new_row = {
                 "member_id": new_id,
@@ -478,8 +504,8 @@ elif page == "회원 관리":
                 "status": status,
             }
 
-            members = pd.concat([members, pd.DataFrame([new_row])], ignore_index=True)
-            save_members(members) 
+            ctx.append("members", new_row)
+            ctx.flush()
 
             st.session_state["selected_member"] = new_id
             st.session_state["show_register"] = False
@@ -495,7 +521,7 @@ elif page == "회원 관리":
         st.markdown("---")
         st.subheader("선택 회원 상세")
 
-        info = members[members["member_id"] == selected_member].iloc[0]
+        info = ctx.for_member("members", selected_member).iloc[0]
 
         c1, c2 = st.columns(2)
         with c1:
@@ -528,7 +554,7 @@ elif page == "회원 관리":
             today_consults = consults[
                 consults["consult_id"].astype(str).str.contains(f"C{today_key}-", na=False)
             ]
-            seq = 1 if today_consults.empty else (today_consults.shape[0] + 1)
+            seq = get_id_sequence().next(f"consult-{today_key}", at_least=today_consults.shape[0])
             consult_id = f"C{today_key}-{seq:04d}"
 
             new_c = {
@@ -542,12 +568,12 @@ elif page == "회원 관리":
                 "created_at": now_str,
             }
 
-            consults = pd.concat([consults, pd.DataFrame([new_c])], ignore_index=True)
-            save_consults(consults)
+            ctx.append("consults", new_c)
+            ctx.flush()
             st.success("상담 저장 완료")
             st.rerun()
 
-        hist_c = consults[consults["member_id"] == selected_member].copy()
+        hist_c = ctx.for_member("consults", selected_member)
         if hist_c.empty:
             st.info("상담 이력이 없습니다.")
         else:
@@ -560,6 +586,9 @@ elif page == "회원 관리":
         # -------------------------
         st.markdown("---")
         st.subheader("치수 입력 (inch 입력 → cm 변환 + 기성 사이즈 추천)")
+        rule_error = load_size_rules("jacket").error
+        if rule_error:
+            st.warning(f"상의 사이즈 규칙을 쓸 수 없어 추천 호칭이 '규칙 없음'으로 저장됩니다 (설정에서 수정): {rule_error}")
 
         with st.form(f"measure_form_{selected_member}"):
             m_date = st.date_input("측정일", value=datetime.now().date())
@@ -580,8 +609,12 @@ elif page == "회원 관리":
         if save_measure_btn:
             chest_cm = inch_to_cm(chest_in)
             size = recommend_jacket_size(chest_cm)
+            # 치수번호: 재시작 후 WAL 을 다시 반영해도 같은 치수가 두 번 붙지 않도록 행마다 고유 번호
+            measure_seq = get_id_sequence().next("measure", at_least=len(ctx.frame("measures")))
+            measure_id = f"S{datetime.now().strftime('%Y%m%d')}-{measure_seq:04d}"
 
             row = {
+                "measure_id": measure_id,
                 "member_id": selected_member,
                 "measure_date": m_date.strftime("%Y-%m-%d"),
                 "shoulder_in": shoulder_in, "shoulder_cm": inch_to_cm(shoulder_in),
@@ -590,16 +623,16 @@ elif page == "회원 관리":
                 "hip_in": hip_in, "hip_cm": inch_to_cm(hip_in),
                 "sleeve_in": sleeve_in, "sleeve_cm": inch_to_cm(sleeve_in),
                 "length_in": length_in, "length_cm": inch_to_cm(length_in),
-                "recommend_jacket": size,
+                "recommended_jacket_size": size,
             }
 
-            measures = pd.concat([measures, pd.DataFrame([row])], ignore_index=True)
-            save_measures(measures) 
+            ctx.append("measures", row)
+            ctx.flush()
             st.success("치수 저장 완료")
             st.rerun()
 
         st.write("최근 치수 기록")
-        history = measures[measures["member_id"] == selected_member].copy()
+        history = ctx.for_member("measures", selected_member)
         if history.empty:
             st.info("치수 이력이 없습니다.")
         else:
@@ -630,7 +663,8 @@ elif page == "회원 관리":
 
         if submit:
             now_str = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            order_id = f"O{datetime.now().strftime('%Y%m%d')}-{(len(orders)+1):04d}"
+            order_seq = get_id_sequence().next("order", at_least=len(orders))
+            order_id = f"O{datetime.now().strftime('%Y%m%d')}-{order_seq:04d}"
 
             row = {
                 "order_id": order_id,
@@ -645,13 +679,13 @@ elif page == "회원 관리":
                 "created_at": now_str,
             }
 
-            orders = pd.concat([orders, pd.DataFrame([row])], ignore_index=True)
-            save_orders(orders)
+            ctx.append("orders", row)
+            ctx.flush()
             st.success("저장 완료")
             st.rerun()
 
         st.write("저장된 주문/작업지시서 목록(회원 기준)")
-        my_orders = orders[orders["member_id"] == selected_member].copy()
+        my_orders = ctx.for_member("orders", selected_member)
         if my_orders.empty:
             st.info("저장된 주문서가 없습니다.")
         else:
@@ -665,12 +699,17 @@ elif page == "회원 관리":
 elif page == "설정":
     st.title("설정 – 사이즈 규칙 / 매장 약속 용어(추가 예정)")
 
-    ensure_size_rule_file()
-    rules = pd.read_excel(SIZE_RULE_FILE)
+    for kind, spec in SIZE_RULE_SPECS.items():
+        rules = pd.read_excel(ensure_rule_file(kind))
 
-    st.subheader("상의 사이즈 규칙 (가슴 cm 범위 → 상의호칭)")
-    edited = st.data_editor(rules, num_rows="dynamic", use_container_width=True)
+        st.subheader(f"{spec['title']} 사이즈 규칙 ({spec['part']} cm 범위 → {spec['label']})")
+        if load_size_rules(kind).error:
+            st.warning(f"현재 규칙 파일 오류: {load_size_rules(kind).error}")
+        edited = st.data_editor(rules, num_rows="dynamic", use_container_width=True, key=f"size_rules_{kind}")
 
-    if st.button("저장"):
-        edited.to_excel(SIZE_RULE_FILE, index=False)
-        st.success("저장 완료")
+        if st.button("저장", key=f"save_size_rules_{kind}"):
+            try:
+                save_size_rules(edited, kind)
+                st.success("저장 완료")
+            except ValueError as e:
+                st.error(f"저장하지 않았습니다: {e}")
@@ -0,0 +1,158 @@
+# data_context.py
+"""
+회원 관리 화면용 데이터 묶음 (app_legacy 의 회원/상담/치수/주문 엑셀)
+
+- 표마다 읽기/저장 함수를 등록해 두고, 파일 버전(mtime·크기)이 바뀌었을 때만 다시 읽음
+  → 버튼 클릭·검색어 입력 같은 rerun 은 엑셀을 열지 않음
+- 읽은 DataFrame 은 내부(영문) 컬럼 그대로 메모리에 보관
+- 회원별 조회는 member_id groupby 인덱스(행 위치)로 바로 슬라이스 (전체 비교 없음)
+- append()/replace() 는 메모리에만 반영하고 dirty 표시, flush() 때 표마다 1번씩 저장
+  (추가 함수를 등록한 표에 append 만 했으면 추가한 행만 넘김 → 다른 태블릿이 추가한 행을 덮어쓰지 않음)
+- 저장이 뒤에서 기록되는 경우(write_behind) written 에 queue.written_version 을 넘기면,
+  저장 함수가 돌려준 순번의 기록이 끝난 뒤 그 파일 버전을 받아 두므로 방금 저장한 표를 다시 읽지 않음
+  (다른 저장과 섞여 기록됐거나 그 사이 다른 태블릿이 고쳤으면 다시 읽음)
+
+    ctx = DataContext({"members": (MASTER_FILE, read_members, save_members), ...}, written=queue.written_version)
+    ctx.for_member("consults", "M0001")
+    ctx.append("consults", new_row)
+    ctx.flush()
+"""
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from write_behind import file_version as _file_version
+
+KEY_COLUMN = "member_id"
+
+
+class _Table:
+    def __init__(self, path: str, read: Callable[[], pd.DataFrame], save: Callable[[pd.DataFrame], None],
+                 append: Optional[Callable[[pd.DataFrame], None]] = None):
+        self.path = path
+        self.read = read
+        self.save = save
+        self.append = append
+        self.df: Optional[pd.DataFrame] = None
+        self.version = None
+        self.index: Optional[Dict[str, np.ndarray]] = None
+        self.dirty = False
+        self.added = []       # flush 전 append 한 행들
+        self.replaced = False  # flush 전 replace 했는지 (그러면 표 전체 저장)
+        self.saved = None     # 뒤에서 기록 중인 저장 (순번, 메모리 표를 읽은 파일 버전)
+
+
+class DataContext:
+    """
+    표 이름 → (파일 경로, 읽기 함수, 저장 함수[, 추가 함수])
+    읽기 함수는 내부 컬럼 DataFrame 을, 저장 함수는 그 DataFrame 을 받아 파일에 씀
+    추가 함수는 새 행만 받아 파일 끝에 붙임
+    written(path, 순번, 버전): 저장 함수가 순번을 돌려줄 때, 그 기록 직후의 파일 버전 (메모리 표를 그대로 써도 될 때만)
+    """
+
+    def __init__(self, sources: Dict[str, Tuple], key: str = KEY_COLUMN,
+                 written: Optional[Callable[[str, int, Optional[Tuple[int, int]]], Optional[Tuple[int, int]]]] = None):
+        self.key = key
+        self.written = written
+        self._tables = {name: _Table(*spec) for name, spec in sources.items()}
+        self.loads = 0  # 실제로 파일을 읽은 횟수 (확인용)
+
+    def _table(self, name: str) -> _Table:
+        t = self._tables[name]
+        version = _file_version(t.path)
+        # 저장하지 않은 변경이 있으면 메모리 쪽을 유지 (flush 때 덮어씀)
+        if t.df is None or (not t.dirty and version != t.version):
+            if t.df is not None and t.saved is not None and version is not None \
+                    and self.written(t.path, *t.saved) == version:
+                # 바뀐 것은 내 저장 기록뿐 → 메모리 표가 파일과 같음
+                t.version = version
+                t.saved = None
+                return t
+            t.df = t.read().reset_index(drop=True)
+            t.version = _file_version(t.path)
+            t.index = None
+            t.saved = None
+            self.loads += 1
+        return t
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """
+        표 전체 (캐시를 고쳐도 영향 없도록 얕은 복사본)
+        """
+        return self._table(name).df.copy(deep=False)
+
+    def for_member(self, name: str, member_id) -> pd.DataFrame:
+        """
+        member_id 의 행만 (groupby 인덱스는 표를 다시 읽거나 고쳤을 때만 새로 만듦)
+        """
+        t = self._table(name)
+        if t.index is None:
+            keys = t.df[self.key].astype(str).str.strip()
+            t.index = keys.groupby(keys, sort=False).indices if len(keys) else {}
+        rows = t.index.get(str(member_id).strip())
+        if rows is None:
+            return t.df.iloc[0:0].copy()
+        return t.df.iloc[rows].copy()
+
+    def append(self, name: str, rows) -> pd.DataFrame:
+        """
+        dict 1건 또는 여러 건(list/DataFrame)을 메모리 표 끝에 추가 (저장은 flush)
+        """
+        t = self._table(name)
+        if isinstance(rows, dict):
+            rows = [rows]
+        new = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+        if len(new):
+            parts = [t.df, new] if len(t.df) else [new.reindex(columns=t.df.columns.union(new.columns, sort=False))]
+            t.df = pd.concat(parts, ignore_index=True)
+            t.added.append(new)
+            t.index = None
+            t.dirty = True
+        return t.df
+
+    def replace(self, name: str, df: pd.DataFrame) -> None:
+        t = self._tables[name]
+        t.df = df.reset_index(drop=True)
+        t.index = None
+        t.dirty = True
+        t.replaced = True
+
+    def flush(self, names: Iterable[str] = None) -> list:
+        """
+        dirty 표를 저장 함수로 1번씩 기록 → 저장한 표 이름 목록
+        - 바로 기록하는 저장 함수: 저장 후 파일 버전을 기억하므로 다음 rerun 에서 다시 읽지 않음
+        - 뒤에서 기록하는 저장 함수(순번 반환, written 지정): 기록이 끝나면 written 으로 버전을 받아
+          다시 읽지 않음, 그 전까지는 메모리 표 사용
+        """
+        saved = []
+        for name in (names or list(self._tables)):
+            t = self._tables[name]
+            if not t.dirty:
+                continue
+            if t.append is not None and not t.replaced:
+                seq = t.append(pd.concat(t.added, ignore_index=True))
+            else:
+                seq = t.save(t.df)
+            if self.written is not None and isinstance(seq, int):
+                t.saved = (seq, t.version)
+            else:
+                t.version = _file_version(t.path)
+            t.dirty = False
+            t.added = []
+            t.replaced = False
+            saved.append(name)
+        return saved
+
+    def invalidate(self, name: str = None) -> None:
+        """
+        메모리 표 삭제 (저장 안 한 변경도 버림) → 다음 조회 때 파일에서 다시 읽음
+        """
+        for t in ([self._tables[name]] if name else self._tables.values()):
+            t.df = None
+            t.version = None
+            t.index = None
+            t.dirty = False
+            t.added = []
+            t.replaced = False
+            t.saved = None
@@ -0,0 +1,74 @@
+# id_sequence.py
+import sqlite3
+from contextlib import contextmanager
+
+
+ID_SEQ_TABLE = """
+    CREATE TABLE IF NOT EXISTS id_seq (
+        name  TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    )
+"""
+
+
+def advance(conn: sqlite3.Connection, name: str, at_least: int) -> None:
+    """
+    name 의 마지막 번호를 at_least 이상으로 (없으면 만듦), 호출한 쪽 트랜잭션 안에서
+    """
+    conn.execute(
+        "INSERT INTO id_seq(name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = MAX(value, excluded.value)",
+        (name, int(at_least)),
+    )
+
+
+def next_in(conn: sqlite3.Connection, name: str, at_least: int = 0) -> int:
+    """
+    호출한 쪽 쓰기 트랜잭션(BEGIN IMMEDIATE) 안에서 다음 번호 발급
+    (회원 INSERT 처럼 번호와 행을 같은 트랜잭션에 넣을 때 - member_store.MemberRepository)
+    """
+    advance(conn, name, at_least)
+    conn.execute("UPDATE id_seq SET value = value + 1 WHERE name = ?", (name,))
+    return conn.execute("SELECT value FROM id_seq WHERE name = ?", (name,)).fetchone()[0]
+
+
+class IdSequence:
+    """
+    이름별 번호 발급기 (SQLite id_seq 테이블, data_members/members.db 를 회원 저장소와 같이 씀)
+    - 'member', 'consult-20250101', 'order' 처럼 이름마다 마지막 번호 1개
+    - BEGIN IMMEDIATE 트랜잭션 안에서 증가 → 여러 태블릿(프로세스)이 동시에 받아도 중복 없음
+    - at_least: 파일에 이미 있는 최대 번호 (시퀀스가 새로 만들어졌거나 밖에서 행이 추가된 경우 그 뒤부터)
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(ID_SEQ_TABLE)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def next(self, name: str, at_least: int = 0) -> int:
+        """
+        name 의 다음 번호 = max(마지막 번호, at_least) + 1
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                num = next_in(conn, name, at_least)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return num
+
+    def current(self, name: str) -> int:
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM id_seq WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
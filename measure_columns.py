@@ -0,0 +1,269 @@
+# measure_columns.py
+import io
+import json
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from record_store import RECORD_COLUMNS
+from scripts.file_lock import file_lock
+from settings_manager import get_measure_parser
+
+# payload_json → 타입 컬럼으로 꺼낼 항목 (app.py FIELDS id 기준)
+MEASURE_FIELDS = ["height", "neck", "armhole", "shoulder", "sleeve"]      # 치수 → float
+PRICE_FIELDS = ["total_price", "deposit", "balance"]                      # 금액 → float
+DATE_FIELDS = ["order_date", "fitting_date", "delivery_date"]            # 날짜 → datetime
+PROJECTED_FIELDS = MEASURE_FIELDS + PRICE_FIELDS + DATE_FIELDS
+
+MAX_PARTS = 16  # part 파일이 이보다 많아지면 1개로 합침
+
+
+# ------------------------------
+# payload 디코딩 / 타입 변환 (벡터)
+# ------------------------------
+def decode_payloads(payloads: pd.Series) -> pd.DataFrame:
+    """
+    payload_json 여러 줄을 한 번에 디코딩 → PROJECTED_FIELDS 컬럼 DataFrame (값은 원문 그대로)
+    - 정상이면 JSON 배열 1개로 묶어 json.loads 1번
+    - 깨진 줄이 있으면 그 청크만 줄 단위로 (safe_json_load 와 같이 {} 처리)
+    """
+    texts = payloads.fillna("").astype(str).str.strip()
+    texts = texts.where(texts != "", "{}")
+    try:
+        records = json.loads("[" + ",".join(texts.tolist()) + "]")
+        if len(records) != len(texts):
+            raise ValueError("payload 개수 불일치")
+    except ValueError:
+        records = []
+        for t in texts.tolist():
+            try:
+                records.append(json.loads(t))
+            except ValueError:
+                records.append({})
+    records = [r if isinstance(r, dict) else {} for r in records]
+    return pd.DataFrame.from_records(records, columns=PROJECTED_FIELDS, index=payloads.index)
+
+
+def _parse_price_text(s: pd.Series) -> pd.Series:
+    digits = s.astype("string").str.replace(r"[^0-9.\-]", "", regex=True)
+    return pd.to_numeric(digits.replace("", pd.NA), errors="coerce").astype("float64")
+
+
+def parse_measure_series(s: pd.Series) -> pd.Series:
+    """
+    "17 1/4", "17¼", "17-1/4", "17.25", "1/2" → float (해석 불가 → NaN)
+    매장 설정(shop_settings.json 약속표기)의 MeasureParser 로 고유값만 해석
+    """
+    return get_measure_parser().parse_series(s)
+
+
+def parse_price_series(s: pd.Series) -> pd.Series:
+    """
+    1500000 / "1,500,000" / "1,500,000원" → 숫자만 남겨 float
+    """
+    return _parse_price_text(s)
+
+
+def parse_date_series(s: pd.Series) -> pd.Series:
+    return pd.to_datetime(s.astype("string").str.strip(), errors="coerce", format="mixed")
+
+
+def project_records(raw: pd.DataFrame) -> pd.DataFrame:
+    """
+    measure_records 행(created_at, member_id, payload_json) → 타입 컬럼 + 원문 JSON
+    """
+    fields = decode_payloads(raw["payload_json"])
+    out = pd.DataFrame({
+        "created_at": pd.to_datetime(raw["created_at"], errors="coerce").astype("datetime64[ns]"),
+        "member_id": raw["member_id"].astype(str),
+    })
+    for c in MEASURE_FIELDS:
+        out[c] = parse_measure_series(fields[c])
+    for c in PRICE_FIELDS:
+        out[c] = parse_price_series(fields[c])
+    for c in DATE_FIELDS:
+        out[c] = parse_date_series(fields[c]).astype("datetime64[ns]")
+    out["payload_json"] = raw["payload_json"].fillna("").astype(str)
+    return out.reset_index(drop=True)
+
+
+# ------------------------------
+# 컬럼 저장소
+# ------------------------------
+class MeasureColumnStore:
+    """
+    measure_records.csv → 타입 컬럼 Parquet (data_members/measure_columns/)
+
+    - compact(): CSV에서 지난번 이후 늘어난 부분만 읽어 part 파일 1개로 추가
+      (CSV는 append-only 라 byte 위치만 기억하면 됨, 줄었거나 바뀌었으면 전체 재생성)
+    - part 파일이 MAX_PARTS 개를 넘으면 1개로 합침
+    - payload_json 원문도 같이 저장 (타입 컬럼에 없는 항목은 원문에서)
+    - load(): 필요한 컬럼만 읽어 회원 전체 집계를 벡터 연산으로
+    원본은 계속 measure_records.csv, 이 폴더는 지워도 compact() 로 다시 만들어짐.
+    """
+
+    def __init__(self, csv_path: str, out_dir: Optional[str] = None):
+        self.csv_path = csv_path
+        self.out_dir = out_dir or os.path.join(os.path.dirname(csv_path) or ".", "measure_columns")
+        self.state_path = os.path.join(self.out_dir, "_state.json")
+        self.lock_path = os.path.join(self.out_dir, "_compact.lock")
+
+    # ------------------------------
+    # 상태 / 잠금
+    # ------------------------------
+    def _read_state(self) -> Dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"csv_size": 0, "rows": 0, "parts": []}
+
+    def _write_state(self, state: Dict) -> None:
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def _tail_is_consistent(self, offset: int) -> bool:
+        if offset == 0:
+            return True
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset - 1)
+            return f.read(1) == b"\n"
+
+    # ------------------------------
+    # compact
+    # ------------------------------
+    def _read_csv_from(self, offset: int):
+        """
+        offset 부터 마지막 완전한 줄까지 읽기 → (raw DataFrame, 새 offset)
+        """
+        with open(self.csv_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        data = data[:end]
+        if offset == 0:
+            data = data.split(b"\n", 1)[1] if b"\n" in data else b""  # 헤더 제외
+        if not data.strip():
+            return pd.DataFrame(columns=RECORD_COLUMNS), offset + end
+
+        raw = pd.read_csv(
+            io.BytesIO(data), header=None, names=RECORD_COLUMNS, usecols=range(len(RECORD_COLUMNS)),
+            dtype=str, keep_default_na=False, encoding="utf-8",
+        )
+        return raw, offset + end
+
+    def _write_part(self, df: pd.DataFrame, name: str) -> None:
+        path = os.path.join(self.out_dir, name)
+        tmp = path + ".tmp"
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+
+    def _merge_parts(self, state: Dict) -> Dict:
+        merged = self.load()
+        name = f"part-{state['csv_size']:012d}-merged.parquet"
+        self._write_part(merged, name)
+        old = state["parts"]
+        state = {**state, "parts": [name]}
+        self._write_state(state)
+        for p in old:
+            if p != name:
+                os.remove(os.path.join(self.out_dir, p))
+        return state
+
+    def compact(self) -> int:
+        """
+        새 기록만 컬럼 파일로 추가 → 추가한 행 수 (다른 프로세스가 진행 중이면 0)
+        """
+        if not os.path.exists(self.csv_path):
+            return 0
+        os.makedirs(self.out_dir, exist_ok=True)
+        try:
+            # 기다리지 않음 (timeout=0) - 다른 프로세스가 compact 중이면 그쪽이 처리
+            with file_lock(self.lock_path, timeout=0, stale_seconds=600):
+                return self._compact()
+        except TimeoutError:
+            return 0
+
+    def _compact(self) -> int:
+        state = self._read_state()
+        size = os.path.getsize(self.csv_path)
+        if state["csv_size"] > size or not self._tail_is_consistent(state["csv_size"]):
+            for p in state["parts"]:
+                os.remove(os.path.join(self.out_dir, p))
+            state = {"csv_size": 0, "rows": 0, "parts": []}
+        if state["csv_size"] == size:
+            return 0
+
+        raw, new_size = self._read_csv_from(state["csv_size"])
+        added = len(raw)
+        if added:
+            name = f"part-{state['csv_size']:012d}.parquet"
+            self._write_part(project_records(raw), name)
+            state["parts"] = state["parts"] + [name]
+        state = {**state, "csv_size": new_size, "rows": state["rows"] + added}
+        self._write_state(state)
+
+        if len(state["parts"]) > MAX_PARTS:
+            self._merge_parts(state)
+        return added
+
+    # ------------------------------
+    # 조회
+    # ------------------------------
+    def load(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        컬럼 파일 전체 (columns 지정 시 그 컬럼만 읽음)
+        잠금 없이 읽음 → 읽는 중에 compact 가 part 를 합치고 지우면 바뀐 상태로 다시 읽음
+        """
+        state = self._read_state()
+        while True:
+            parts = [os.path.join(self.out_dir, p) for p in state["parts"]]
+            if not parts:
+                empty = project_records(pd.DataFrame(columns=RECORD_COLUMNS))
+                return empty[columns] if columns else empty
+            try:
+                return pd.concat(
+                    [pd.read_parquet(p, columns=columns) for p in parts], ignore_index=True
+                )
+            except FileNotFoundError:
+                latest = self._read_state()
+                if latest == state:
+                    raise
+                state = latest
+
+    def monthly_mean(self, field: str, date_col: str = "created_at") -> pd.Series:
+        """
+        예) monthly_mean("shoulder") → 월별 평균 어깨 치수
+        """
+        df = self.load(columns=[date_col, field])
+        return df.groupby(df[date_col].dt.to_period("M"))[field].mean()
+
+
+def start_background_compaction(store: MeasureColumnStore, interval_seconds: float = 300) -> threading.Thread:
+    """
+    interval 마다 compact() 를 도는 데몬 스레드 (app.py 에서 프로세스당 1번)
+    """
+    def _loop():
+        while True:
+            try:
+                store.compact()
+            except Exception as e:
+                print(f"[measure_columns] compact 실패: {e}")
+            time.sleep(interval_seconds)
+
+    t = threading.Thread(target=_loop, name="measure-columns-compact", daemon=True)
+    t.start()
+    return t
+
+
+if __name__ == "__main__":
+    # python measure_columns.py compact [measure_records.csv 경로] → 새 기록만 컬럼 파일로 추가
+    # (성능 비교는 scripts/benchmark.py)
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join("data_members", "measure_records.csv")
+    print(f"[measure_columns] 추가 {MeasureColumnStore(path).compact()}건")
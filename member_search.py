@@ -0,0 +1,200 @@
+# member_search.py
+import re
+from bisect import bisect_left
+from typing import Iterable, Iterator, List
+
+import pandas as pd
+
+# 한글 초성 (호환 자모)
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_SET = set(CHOSEONG)
+_HANGUL_FIRST, _HANGUL_LAST = 0xAC00, 0xD7A3
+_MAX_CHAR = "\U0010ffff"
+
+
+def to_chosung(text: str) -> str:
+    """
+    '김철수' -> 'ㄱㅊㅅ' (한글 음절만 초성으로, 나머지 문자는 그대로)
+    """
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+            out.append(CHOSEONG[(code - _HANGUL_FIRST) // 588])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def normalize_name(value) -> str:
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return re.sub(r"\s+", "", str(value)).lower()
+
+
+def phone_digits(value) -> str:
+    """
+    '010-1234-5678' / '01012345678' / '010 1234 5678' -> '01012345678'
+    (normalize_phone 결과든 원문이든 숫자만 비교)
+    """
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return ""
+    return re.sub(r"[^0-9]", "", str(value))
+
+
+class _SortedKeys:
+    """
+    정렬된 키 + bisect 로 앞부분 일치 범위를 O(log n)에 찾음
+    """
+
+    def __init__(self, keys: List[str]):
+        self.rows = sorted(range(len(keys)), key=keys.__getitem__)
+        self.keys = [keys[i] for i in self.rows]
+
+    def prefix(self, q: str) -> Iterator[int]:
+        lo = bisect_left(self.keys, q)
+        hi = bisect_left(self.keys, q + _MAX_CHAR)
+        return (self.rows[i] for i in range(lo, hi))
+
+
+class _GramIndex:
+    """
+    n-gram → 행 번호 목록 (부분 문자열 검색 후보 축소용)
+    """
+
+    def __init__(self, values: List[str], sizes: Iterable[int]):
+        self.sizes = sorted(sizes)
+        self.postings = {}
+        for row, v in enumerate(values):
+            grams = {v[i:i + n] for n in self.sizes for i in range(len(v) - n + 1)}
+            for g in grams:
+                self.postings.setdefault(g, []).append(row)
+
+    def candidates(self, q: str) -> List[int]:
+        usable = [n for n in self.sizes if n <= len(q)]
+        if not usable:
+            return []
+        n = usable[-1]
+        lists = [self.postings.get(q[i:i + n], []) for i in range(len(q) - n + 1)]
+        return min(lists, key=len)
+
+
+class MemberSearchIndex:
+    """
+    회원 검색 인덱스 (회원 데이터 버전당 1번 생성)
+
+    이름 검색 순위: 이름 앞부분 일치 → 초성 일치('ㄱㅊㅅ', '김ㅊ') → 이름 중간 일치
+    전화 검색 순위: 번호 앞자리 일치 → 뒷자리 일치 → 중간 일치 (하이픈 무시)
+    이름+전화 같이 입력하면 둘 다 맞는 회원 먼저, 그다음 이름/전화 중 하나만 맞는 회원.
+    결과는 limit 명까지만 (selectbox 표시용).
+    """
+
+    def __init__(self, members: pd.DataFrame):
+        self.members = members.reset_index(drop=True)
+        self._names = [normalize_name(v) for v in self.members["name"].tolist()]
+        self._cho = [to_chosung(n) for n in self._names]
+        self._phones = [phone_digits(v) for v in self.members["phone"].tolist()]
+
+        self._name_sorted = _SortedKeys(self._names)
+        self._cho_sorted = _SortedKeys(self._cho)
+        self._phone_sorted = _SortedKeys(self._phones)
+        self._phone_rev_sorted = _SortedKeys([p[::-1] for p in self._phones])
+
+        self._name_grams = _GramIndex(self._names, (1, 2))
+        self._phone_grams = _GramIndex(self._phones, (3,))
+
+        # 최근 등록 순서: 회원번호 숫자 역순 (문자열 비교면 M9999 가 M10000 보다 앞), 숫자 없는 번호는 맨 뒤
+        ids = self.members["member_id"].astype(str).str.strip()
+        nums = pd.to_numeric(ids.str.extract(r"(\d+)\s*$", expand=False), errors="coerce")
+        order = pd.DataFrame({"num": nums, "id": ids}).sort_values(
+            ["num", "id"], ascending=False, na_position="last", kind="stable"
+        )
+        self._recent_rows = order.index.to_numpy()
+
+    def __len__(self) -> int:
+        return len(self.members)
+
+    # ------------------------------
+    # 이름
+    # ------------------------------
+    def _cho_match(self, row: int, q: str) -> bool:
+        name, cho = self._names[row], self._cho[row]
+        if len(name) < len(q):
+            return False
+        return all(
+            (cho[i] == c) if c in _CHOSEONG_SET else (name[i] == c)
+            for i, c in enumerate(q)
+        )
+
+    def _name_rows(self, q: str) -> Iterator[int]:
+        yield from self._name_sorted.prefix(q)
+
+        if any(c in _CHOSEONG_SET for c in q):
+            for row in self._cho_sorted.prefix(to_chosung(q)):
+                if self._cho_match(row, q):
+                    yield row
+
+        for row in self._name_grams.candidates(q):
+            if q in self._names[row]:
+                yield row
+
+    def _name_match(self, row: int, q: str) -> bool:
+        return q in self._names[row] or self._cho_match(row, q)
+
+    # ------------------------------
+    # 전화번호
+    # ------------------------------
+    def _phone_rows(self, d: str) -> Iterator[int]:
+        yield from self._phone_sorted.prefix(d)
+        yield from self._phone_rev_sorted.prefix(d[::-1])
+
+        for row in self._phone_grams.candidates(d):
+            if d in self._phones[row]:
+                yield row
+
+    def _phone_match(self, row: int, d: str) -> bool:
+        return d in self._phones[row]
+
+    # ------------------------------
+    # 검색
+    # ------------------------------
+    def search_rows(self, name_query: str = "", phone_query: str = "", limit: int = 50) -> List[int]:
+        q = normalize_name(name_query)
+        d = phone_digits(phone_query)
+
+        tiers = []
+        if q and d:
+            # 둘 다 맞는 회원: 후보가 적은 쪽(전화 3자리 이상이면 전화 n-gram)에서 출발
+            if len(d) >= 3:
+                both = (
+                    r for r in self._phone_grams.candidates(d)
+                    if self._phone_match(r, d) and self._name_match(r, q)
+                )
+            else:
+                both = (r for r in self._name_rows(q) if self._phone_match(r, d))
+            tiers.append(both)
+        if q:
+            tiers.append(self._name_rows(q))
+        if d:
+            tiers.append(self._phone_rows(d))
+
+        seen = set()
+        out = []
+        for tier in tiers:
+            for row in tier:
+                if row not in seen:
+                    seen.add(row)
+                    out.append(row)
+                    if len(out) >= limit:
+                        return out
+        return out
+
+    def search(self, name_query: str = "", phone_query: str = "", limit: int = 50) -> pd.DataFrame:
+        rows = self.search_rows(name_query, phone_query, limit)
+        return self.members.iloc[rows]
+
+    def recent(self, limit: int = 50) -> pd.DataFrame:
+        """
+        검색어가 없을 때: 최근 등록 회원(회원번호 숫자 역순) limit 명 (순서는 인덱스 만들 때 1번 정렬)
+        """
+        return self.members.iloc[self._recent_rows[:limit]]
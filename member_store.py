@@ -0,0 +1,181 @@
+# member_store.py
+import os
+import sqlite3
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pandas as pd
+
+from id_sequence import ID_SEQ_TABLE, advance, next_in
+
+MEMBER_COLUMNS = ["member_id", "name", "phone"]
+ID_PREFIX = "M"
+
+
+def format_member_id(num: int) -> str:
+    return f"{ID_PREFIX}{num:04d}"
+
+
+def parse_member_num(member_id) -> Optional[int]:
+    """
+    'M0012' -> 12 (형식이 다르면 None)
+    """
+    s = str(member_id).strip()
+    if s.startswith(ID_PREFIX):
+        s = s[len(ID_PREFIX):]
+    return int(s) if s.isdigit() else None
+
+
+class MemberRepository:
+    """
+    회원 저장소 (SQLite, data_members/members.db)
+    - member_id(PK) / name / phone 인덱스 → 단건 조회·검색이 파일 전체 읽기 없이 처리됨
+    - 회원번호는 id_seq 테이블에서 트랜잭션으로 발급 (동시 등록해도 중복 없음, id_sequence 와 같은 테이블·로직)
+    - 기존 members_master.csv 는 처음 한 번만 가져옴
+    - version: 쓰기마다 1씩 증가 → 화면 쪽 캐시 키로 사용
+    """
+
+    def __init__(self, db_path: str, csv_path: Optional[str] = None):
+        self.db_path = db_path
+        self._init_schema()
+        if csv_path:
+            self.import_csv_once(csv_path)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        """
+        쓰기 트랜잭션 (BEGIN IMMEDIATE → 다른 프로세스/태블릿 쓰기와 직렬화)
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(ID_SEQ_TABLE)
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS members (
+                    member_id TEXT PRIMARY KEY,
+                    name      TEXT NOT NULL DEFAULT '',
+                    phone     TEXT NOT NULL DEFAULT ''
+                );
+                CREATE INDEX IF NOT EXISTS idx_members_name  ON members(name);
+                CREATE INDEX IF NOT EXISTS idx_members_phone ON members(phone);
+
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO meta(key, value) VALUES ('version', 0);
+                INSERT OR IGNORE INTO meta(key, value) VALUES ('csv_imported', 0);
+            """)
+
+    # ------------------------------
+    # CSV 1회 가져오기
+    # ------------------------------
+    def import_csv_once(self, csv_path: str) -> int:
+        """
+        members_master.csv → DB (이미 가져왔으면 아무것도 안 함)
+        반환: 가져온 회원 수
+        """
+        with self._connect() as conn:
+            done = conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()[0]
+        if done or not os.path.exists(csv_path):
+            return 0
+
+        try:
+            df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str)
+        except UnicodeDecodeError:
+            df = pd.read_csv(csv_path, encoding="utf-8", dtype=str)
+        for c in MEMBER_COLUMNS:
+            if c not in df.columns:
+                df[c] = ""
+        df = df[MEMBER_COLUMNS].fillna("").reset_index(drop=True)
+        df["member_id"] = df["member_id"].str.strip()
+        # 회원번호가 비었거나 앞 행과 겹치는 회원(예전 max+1 동시 등록)은 버리지 않고 새 번호 발급
+        remap = (df["member_id"] == "") | df["member_id"].duplicated()
+
+        nums = [n for n in map(parse_member_num, df["member_id"]) if n is not None]
+
+        with self._write() as conn:
+            # 다른 프로세스가 먼저 가져갔으면 건너뜀
+            if conn.execute("SELECT value FROM meta WHERE key = 'csv_imported'").fetchone()[0]:
+                return 0
+            advance(conn, "member", max(nums, default=0))
+            old_ids = df.loc[remap, "member_id"]
+            df.loc[remap, "member_id"] = [self.allocate_id(conn) for _ in range(int(remap.sum()))]
+            conn.executemany(
+                "INSERT OR IGNORE INTO members(member_id, name, phone) VALUES (?, ?, ?)",
+                df.itertuples(index=False, name=None),
+            )
+            conn.execute("UPDATE meta SET value = 1 WHERE key = 'csv_imported'")
+
+        for i, old in old_ids.items():
+            r = df.loc[i]
+            print(
+                f"[member_store] {csv_path} {i + 2}행 {r['name']}({r['phone']}): "
+                f"{f'회원번호 {old} 중복' if old else '회원번호 없음'} → {r['member_id']} 로 새로 발급"
+            )
+        return len(df)
+
+    # ------------------------------
+    # 조회
+    # ------------------------------
+    def version(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def count(self) -> int:
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+    def get(self, member_id: str) -> Optional[Dict[str, str]]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT member_id, name, phone FROM members WHERE member_id = ?",
+                (str(member_id),),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def all(self) -> pd.DataFrame:
+        with self._connect() as conn:
+            rows = conn.execute("SELECT member_id, name, phone FROM members ORDER BY member_id").fetchall()
+        return pd.DataFrame([tuple(r) for r in rows], columns=MEMBER_COLUMNS)
+
+    # ------------------------------
+    # 등록
+    # ------------------------------
+    def allocate_id(self, conn=None) -> str:
+        """
+        다음 회원번호 발급 (트랜잭션 안에서 증가시키므로 동시 호출해도 중복 없음)
+        """
+        if conn is None:
+            with self._write() as c:
+                return self.allocate_id(c)
+
+        return format_member_id(next_in(conn, "member"))
+
+    def add(self, name: str, phone: str) -> str:
+        with self._write() as conn:
+            new_id = self.allocate_id(conn)
+            conn.execute(
+                "INSERT INTO members(member_id, name, phone) VALUES (?, ?, ?)",
+                (new_id, name or "", phone or ""),
+            )
+        return new_id
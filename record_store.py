@@ -0,0 +1,198 @@
+# record_store.py
+import csv
+import io
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+
+RECORD_COLUMNS = ["created_at", "member_id", "payload_json"]
+BOM = b"\xef\xbb\xbf"
+
+
+def _encode_row(values) -> bytes:
+    buf = io.StringIO()
+    csv.writer(buf, lineterminator=os.linesep).writerow(values)
+    return buf.getvalue().encode("utf-8")
+
+
+def _decode_line(line: bytes):
+    return next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")]))
+
+
+def _member_of_line(line: bytes) -> Optional[str]:
+    """
+    인덱싱용: 2번째 컬럼(member_id)만 빠르게 추출 (따옴표가 있으면 csv 모듈로)
+    """
+    parts = line.split(b",", 2)
+    if len(parts) == 3 and not parts[0].startswith(b'"') and not parts[1].startswith(b'"'):
+        return parts[1].decode("utf-8")
+    values = _decode_line(line)
+    return values[1] if len(values) >= 2 else None
+
+
+class MeasureRecordStore:
+    """
+    measure_records.csv (append-only) + 회원별 byte offset 인덱스
+
+    - CSV는 그대로 유지 (엑셀/판다스로 열어볼 수 있음)
+    - 인덱스(measure_records.csv.idx, SQLite)에 member_id → 각 행의 시작 위치/길이 저장
+    - append() 는 CSV 끝에 1줄 쓰고 같은 트랜잭션에서 인덱스도 추가
+    - load(member_id) 는 그 회원 행만 seek 해서 읽음 → 전체 기록 수와 무관
+    - CSV가 밖에서 늘어났으면 늘어난 뒷부분만, 줄었거나 바뀌었으면 전체를 다시 인덱싱
+    payload_json 은 json.dumps 결과라 줄바꿈이 없으므로 1기록 = 1줄.
+    """
+
+    def __init__(self, csv_path: str, index_path: Optional[str] = None):
+        self.csv_path = csv_path
+        self.index_path = index_path or csv_path + ".idx"
+        self._ensure_csv()
+        self._init_index()
+
+    def _ensure_csv(self) -> None:
+        if not os.path.exists(self.csv_path):
+            with open(self.csv_path, "wb") as f:
+                f.write(BOM + _encode_row(RECORD_COLUMNS))
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _write(self):
+        """
+        BEGIN IMMEDIATE 로 CSV append + 인덱스 갱신을 직렬화 (여러 태블릿 동시 저장 대비)
+        """
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    def _init_index(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS record_offsets (
+                    member_id TEXT NOT NULL,
+                    offset    INTEGER NOT NULL,
+                    length    INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_record_member ON record_offsets(member_id, offset);
+
+                CREATE TABLE IF NOT EXISTS meta (
+                    key   TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                );
+                INSERT OR IGNORE INTO meta(key, value) VALUES ('indexed_size', 0);
+            """)
+
+    # ------------------------------
+    # 인덱스 동기화
+    # ------------------------------
+    def _indexed_size(self, conn) -> int:
+        return conn.execute("SELECT value FROM meta WHERE key = 'indexed_size'").fetchone()[0]
+
+    def _scan(self, conn, start: int) -> int:
+        """
+        CSV의 start 위치부터 끝까지 읽어 인덱스 추가 → 새 indexed_size 반환
+        """
+        rows = []
+        with open(self.csv_path, "rb") as f:
+            f.seek(start)
+            pos = start
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # 쓰는 중인 마지막 줄은 다음에 처리
+                if pos > 0:
+                    member_id = _member_of_line(line)
+                    if member_id is not None:
+                        rows.append((member_id, pos, len(line)))
+                pos += len(line)
+        conn.executemany(
+            "INSERT INTO record_offsets(member_id, offset, length) VALUES (?, ?, ?)", rows
+        )
+        conn.execute("UPDATE meta SET value = ? WHERE key = 'indexed_size'", (pos,))
+        return pos
+
+    def _tail_is_consistent(self, indexed: int) -> bool:
+        if indexed == 0:
+            return True
+        with open(self.csv_path, "rb") as f:
+            f.seek(indexed - 1)
+            return f.read(1) == b"\n"
+
+    def sync(self, conn=None) -> None:
+        """
+        CSV 크기와 인덱스를 비교해서 필요한 부분만 다시 인덱싱
+        """
+        if conn is None:
+            with self._connect() as c:
+                if self._indexed_size(c) == os.path.getsize(self.csv_path):
+                    return
+            with self._write() as c:
+                return self.sync(c)
+
+        size = os.path.getsize(self.csv_path)
+        indexed = self._indexed_size(conn)
+        if indexed == size:
+            return
+        if indexed > size or not self._tail_is_consistent(indexed):
+            conn.execute("DELETE FROM record_offsets")
+            indexed = 0
+        self._scan(conn, indexed)
+
+    # ------------------------------
+    # 쓰기 / 읽기
+    # ------------------------------
+    def append(self, member_id: str, values: Dict) -> str:
+        created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        line = _encode_row([created_at, str(member_id), json.dumps(values, ensure_ascii=False)])
+
+        with self._write() as conn:
+            self.sync(conn)
+            with open(self.csv_path, "ab") as f:
+                offset = f.tell()
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            conn.execute(
+                "INSERT INTO record_offsets(member_id, offset, length) VALUES (?, ?, ?)",
+                (str(member_id), offset, len(line)),
+            )
+            conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'indexed_size'", (offset + len(line),)
+            )
+        return created_at
+
+    def load(self, member_id: str) -> pd.DataFrame:
+        self.sync()
+        with self._connect() as conn:
+            spans = conn.execute(
+                "SELECT offset, length FROM record_offsets WHERE member_id = ? ORDER BY offset",
+                (str(member_id),),
+            ).fetchall()
+
+        rows = []
+        if spans:
+            with open(self.csv_path, "rb") as f:
+                for offset, length in spans:
+                    f.seek(offset)
+                    rows.append(_decode_line(f.read(length))[:len(RECORD_COLUMNS)])
+        return pd.DataFrame(rows, columns=RECORD_COLUMNS)
+
+    def count(self) -> int:
+        self.sync()
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM record_offsets").fetchone()[0]
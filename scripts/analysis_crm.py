@@ -1,6 +1,11 @@
 # scripts/analysis_crm.py
 import pandas as pd
 from config import REPORT_DIR, TARGET_YEAR
+from report_writer import ReportWriter
+
+def report_path(year: int = TARGET_YEAR):
+    return REPORT_DIR / f"CRM_기본분석_{year}.xlsx"
+
 
 def analyze_crm(customers: pd.DataFrame, orders: pd.DataFrame, year: int = TARGET_YEAR):
     """
@@ -36,11 +41,11 @@ def analyze_crm(customers: pd.DataFrame, orders: pd.DataFrame, year: int = TARGE
     )
 
     # 저장
-    out_path = REPORT_DIR / f"CRM_기본분석_{year}.xlsx"
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        customers.to_excel(writer, sheet_name="customers_raw", index=False)
-        df_year.to_excel(writer, sheet_name="orders_this_year", index=False)
-        vip.to_excel(writer, sheet_name="VIP_candidates_code", index=False)
-        last_order.to_excel(writer, sheet_name="last_order_by_code", index=False)
+    out_path = report_path(year)
+    with ReportWriter(out_path) as report:
+        report.sheet("customers_raw", customers, raw=True)
+        report.sheet("orders_this_year", df_year, raw=True)
+        report.sheet("VIP_candidates_code", vip)
+        report.sheet("last_order_by_code", last_order)
 
     print(f"[analysis_crm] CRM 기본 분석 결과 저장: {out_path}")
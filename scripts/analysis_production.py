@@ -1,6 +1,11 @@
 # scripts/analysis_production.py
 import pandas as pd
 from config import DATA_CLEAN_DIR, REPORT_DIR, TARGET_YEAR
+from report_writer import ReportWriter
+
+def report_path(year: int = TARGET_YEAR):
+    return REPORT_DIR / f"생산분석_{year}.xlsx"
+
 
 def analyze_production(orders: pd.DataFrame, year: int = TARGET_YEAR):
     """
@@ -21,10 +26,10 @@ def analyze_production(orders: pd.DataFrame, year: int = TARGET_YEAR):
     weekday_summary = weekday_summary.rename(columns={"order_id": "order_count"})
 
     # 저장
-    out_path = REPORT_DIR / f"생산분석_{year}.xlsx"
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="orders_raw", index=False)
-        month_summary.to_excel(writer, sheet_name="month_summary", index=False)
-        weekday_summary.to_excel(writer, sheet_name="weekday_summary", index=False)
+    out_path = report_path(year)
+    with ReportWriter(out_path) as report:
+        report.sheet("orders_raw", df, raw=True)
+        report.sheet("month_summary", month_summary)
+        report.sheet("weekday_summary", weekday_summary)
 
     print(f"[analysis_production] 생산/주문 분석 결과 저장: {out_path}")
@@ -2,8 +2,22 @@
 
 import pandas as pd
 from config import DATA_CLEAN_DIR, REPORT_DIR
+from report_writer import ReportWriter
 
-def analyze_stock(stock_df: pd.DataFrame):
+REPORT_FILE = REPORT_DIR / "재고분석.xlsx"
+LOW_STOCK_THRESHOLD = 10
+
+
+def low_stock_alert(balance: pd.DataFrame, threshold: float = LOW_STOCK_THRESHOLD) -> pd.DataFrame:
+    # 부족 경고(잔량 threshold 이하)
+    return balance[balance["balance"] <= threshold]
+
+
+def analyze_stock(stock_df: pd.DataFrame, balance: pd.DataFrame = None):
+    """
+    balance: stock_id 별 현재 잔량 (movement_journal.balances()).
+             없으면 입출고 기록 전체를 합산해서 계산
+    """
     df = stock_df.copy()
 
     # 월별 사용량
@@ -11,17 +25,17 @@ def analyze_stock(stock_df: pd.DataFrame):
     usage = df.groupby(["stock_id", "month"])["quantity_signed"].sum().reset_index()
 
     # 전체 재고잔량
-    balance = df.groupby("stock_id")["quantity_signed"].sum().reset_index()
-    balance = balance.rename(columns={"quantity_signed": "balance"})
-
-    # 부족 경고(잔량 10 이하)
-    alert = balance[balance["balance"] <= 10]
-
-    out_path = REPORT_DIR / "재고분석.xlsx"
-    with pd.ExcelWriter(out_path, engine="openpyxl") as writer:
-        df.to_excel(writer, sheet_name="raw_stock", index=False)
-        usage.to_excel(writer, sheet_name="usage", index=False)
-        balance.to_excel(writer, sheet_name="balance", index=False)
-        alert.to_excel(writer, sheet_name="low_stock_alert", index=False)
+    if balance is None:
+        balance = df.groupby("stock_id")["quantity_signed"].sum().reset_index()
+        balance = balance.rename(columns={"quantity_signed": "balance"})
+
+    alert = low_stock_alert(balance)
+
+    out_path = REPORT_FILE
+    with ReportWriter(out_path) as report:
+        report.sheet("raw_stock", df, raw=True)
+        report.sheet("usage", usage)
+        report.sheet("balance", balance)
+        report.sheet("low_stock_alert", alert)
 
     print(f"[analysis_stock] 재고 분석 보고서 저장됨 → {out_path}")
@@ -1,8 +1,9 @@
 import pandas as pd
 from datetime import datetime
-from config import DATA_RAW_DIR, DATA_CLEAN_DIR
-from stock_register import load_movement, save_movement
+from config import TARGET_YEAR
+from stock_register import load_master, append_movement, append_movement_if_absent, load_posted_order_ids
 from fabric_usage import calc_fabric_usage
+from load_data import load_orders
 
 def auto_stock_out(order_id, orders_df, master_df):
     """
@@ -37,8 +38,6 @@ def auto_stock_out(order_id, orders_df, master_df):
     unit = fabric_row.iloc[0]["unit"]
 
     # 4) OUT 기록 생성
-    movement = load_movement()
-
     # 수량 부호 처리
     signed_qty = -abs(usage)  # OUT은 음수
 
@@ -54,18 +53,91 @@ def auto_stock_out(order_id, orders_df, master_df):
         "note": "자동 원단 소요 처리"
     }
 
-
-    movement = pd.concat([movement, pd.DataFrame([new_row])], ignore_index=True)
-    save_movement(movement)
+    append_movement(new_row)
 
     print(f"[자동 처리 완료] 주문 {order_id} → {fabric_id} 원단 {usage:.2f}{unit} 출고")
     return True
 
 
+def auto_stock_out_batch(order_ids, orders_df, master_df):
+    """
+    여러 주문의 원단 자동 OUT을 한 번에 처리 (예: 한 달 납품분)
+    - order_ids: 주문번호 list / Series / order_id 컬럼이 있는 DataFrame
+    - 원단 사용량은 대상 주문 전체를 한 번에 계산
+    - 이미 OUT 기록(related_order_id)이 있는 주문은 건너뜀
+      (미리 한 번 걸러내고, 저장할 때 저널 잠금 안에서 다시 확인 → 동시에 돈 배치와 중복 출고 없음)
+    - 새 OUT 기록은 한 번에 저장
+    반환: order_id 별 처리 결과 (fabric_usage, status)
+      status: posted / already_posted / not_found / no_usage / no_fabric
+    """
+    if isinstance(order_ids, pd.DataFrame):
+        order_ids = order_ids["order_id"]
+    ids = pd.Series(list(order_ids), dtype=object).dropna().astype(str).str.strip()
+    ids = ids[ids != ""].drop_duplicates().reset_index(drop=True)
+
+    result = pd.DataFrame({"order_id": ids, "fabric_usage": 0.0, "status": "posted"})
+    if result.empty:
+        return result
+
+    # 1) 주문 찾기 / 이미 처리된 주문 제외
+    order_keys = orders_df["order_id"].astype(str).str.strip()
+    found = ids.isin(set(order_keys))
+    posted = ids.isin(load_posted_order_ids("OUT"))
+    result.loc[~found, "status"] = "not_found"
+    result.loc[found & posted, "status"] = "already_posted"
+
+    todo = result["status"] == "posted"
+    orders = orders_df[order_keys.isin(set(ids[todo]))].copy()
+    orders["order_id"] = orders["order_id"].astype(str).str.strip()
+
+    # 2) 원단 사용량 (대상 주문 전체 한 번에)
+    usage = calc_fabric_usage(orders).groupby("order_id")["fabric_usage"].sum()
+    result["fabric_usage"] = result["order_id"].map(usage).fillna(0.0).astype(float)
+    result.loc[todo & (result["fabric_usage"] <= 0), "status"] = "no_usage"
+
+    todo = result["status"] == "posted"
+    if todo.any():
+        # 3) 원단 stock_id (auto_stock_out 과 같이 첫 번째 fabric 기준)
+        fabric_row = master_df[master_df["category"] == "fabric"]
+        if fabric_row.empty:
+            print("[ERROR] stock_master에서 fabric 카테고리를 찾을 수 없습니다.")
+            result.loc[todo, "status"] = "no_fabric"
+            return result
+        fabric = fabric_row.iloc[0]
+
+        # 4) OUT 기록 생성 → 한 번에 저장
+        out = result[todo]
+        rows = pd.DataFrame({
+            "date": datetime.today().strftime("%Y-%m-%d"),
+            "stock_id": fabric["stock_id"],
+            "stock_name": fabric["stock_name"],
+            "type": "OUT",
+            "quantity": out["fabric_usage"].to_numpy(),
+            "quantity_signed": -out["fabric_usage"].abs().to_numpy(),
+            "unit": fabric["unit"],
+            "related_order_id": out["order_id"].to_numpy(),
+            "note": "자동 원단 소요 처리",
+        })
+        _, raced = append_movement_if_absent(rows.to_dict("records"))
+        if raced:
+            # 사용량 계산 중에 다른 배치가 먼저 출고한 주문
+            result.loc[result["order_id"].isin(raced), "status"] = "already_posted"
+            rows = rows[~rows["related_order_id"].isin(raced)]
+        if len(rows):
+            print(
+                f"[자동 처리 완료] 주문 {len(rows)}건 → {fabric['stock_id']} 원단 "
+                f"{rows['quantity'].sum():.2f}{fabric['unit']} 출고"
+            )
+
+    skipped = result["status"].value_counts().drop("posted", errors="ignore")
+    if len(skipped):
+        print("[INFO] 건너뜀: " + ", ".join(f"{k} {v}건" for k, v in skipped.items()))
+    return result
+
+
 if __name__ == "__main__":
     # 테스트 예시 (직접 지정)
-    import pandas as pd
-    orders_df = pd.read_excel(DATA_CLEAN_DIR / "orders_2025.xlsx")
-    master_df = pd.read_excel(DATA_RAW_DIR / "stock_master.xlsx")
+    orders_df = load_orders(TARGET_YEAR)
+    master_df = load_master()
 
     auto_stock_out("2025-0001-01", orders_df, master_df)
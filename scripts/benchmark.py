@@ -0,0 +1,938 @@
+# scripts/benchmark.py
+"""
+파이프라인 주요 단계 성능 비교용 스크립트 (합성 데이터 사용)
+
+    python benchmark.py
+
+각 항목은 기존 구현과 새 구현의 결과가 같은지 먼저 확인한 뒤 소요 시간을 출력한다.
+"""
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 회원 관리 앱 모듈(저장소 최상위)도 같은 스크립트에서 측정
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from costing import calculate_order_costs, summarize_order_costs
+from fabric_usage import calc_fabric_usage, load_fabric_rules
+from generate_stock_id import StockIdAllocator, detect_category
+from movement_journal import MovementJournal
+from movement_normalize import normalize_movements
+from raw_cache import cached_table, invalidate
+from report_writer import ReportWriter
+from transform_orders import (
+    flatten_delivery_calendar,
+    flatten_delivery_calendar_loop,
+    generate_order_ids,
+    generate_order_ids_loop,
+)
+from valuation import InventoryValuation
+
+from data_context import DataContext
+from id_sequence import IdSequence
+from measure_columns import MeasureColumnStore
+from member_search import MemberSearchIndex
+from record_store import MeasureRecordStore
+from settings_manager import convert_measure_input, get_measure_parser, load_settings
+from size_rules import NO_RULE, NO_VALUE, ensure_rule_file, invalidate as invalidate_size_rules, load_size_rules
+from write_behind import WriteBehindQueue
+
+WEEKDAYS = ["일", "월", "화", "수", "목", "금", "토"]
+SURNAMES = ["김", "이", "박", "최", "정", "강", "조", "윤"]
+ITEMS = ["상1", "하1", "조1", "상2,하2", "상1,하1,조1", None]
+
+
+def _timeit(fn, *args, repeat=3, **kwargs):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def make_synthetic_calendar(years: int = 10, rows_per_week: int = 6, seed: int = 0) -> pd.DataFrame:
+    """
+    납품달력과 같은 구조의 합성 캘린더 생성
+    - 1행: '월/일' + 요일 헤더 (요일 1칸 + 품목 3칸 = 4칸 간격)
+    - 월마다 주 단위로 '날짜 헤더 줄' + 이름(코드) 줄 rows_per_week 개
+    """
+    rng = random.Random(seed)
+    n_cols = 1 + 4 * 7
+    rows = [["엘부림 납품달력"] + [None] * (n_cols - 1)]
+
+    header = ["월/일"] + [None] * (n_cols - 1)
+    for i, w in enumerate(WEEKDAYS):
+        header[1 + 4 * i] = w
+    rows.append(header)
+
+    for _ in range(years):
+        for month in range(1, 13):
+            day = 1
+            first = True
+            while day <= 28:
+                date_row = [f"{month}월" if first else None] + [None] * (n_cols - 1)
+                for i in range(7):
+                    if day > 28:
+                        break
+                    date_row[1 + 4 * i] = f"{day}(신정)" if (month == 1 and day == 1) else day
+                    day += 1
+                rows.append(date_row)
+                first = False
+
+                for _ in range(rows_per_week):
+                    row = [None] * n_cols
+                    for i in range(7):
+                        if rng.random() < 0.6:
+                            code = rng.randint(1, 3000)
+                            name = rng.choice(SURNAMES) + "고객"
+                            row[1 + 4 * i] = f"{name}({code})" if rng.random() < 0.9 else name
+                            row[2 + 4 * i] = rng.choice(ITEMS)
+                            row[3 + 4 * i] = rng.choice(["네이비", "차콜", None])
+                    rows.append(row)
+
+    return pd.DataFrame(rows, dtype=object)
+
+
+def bench_flatten_delivery_calendar(years: int = 10):
+    raw = make_synthetic_calendar(years=years)
+    t_loop, flat_loop = _timeit(flatten_delivery_calendar_loop, raw, 2025, repeat=1)
+    t_vec, flat_vec = _timeit(flatten_delivery_calendar, raw, 2025)
+
+    pd.testing.assert_frame_equal(flat_loop, flat_vec)
+    print(
+        f"[flatten_delivery_calendar] {years}년 합성 달력 {raw.shape[0]}행 → 레코드 {len(flat_vec)}건 | "
+        f"loop {t_loop:.3f}s, vectorized {t_vec:.3f}s (x{t_loop / max(t_vec, 1e-9):.1f})"
+    )
+
+
+def bench_raw_cache(years: int = 5):
+    """
+    납품달력 엑셀(header=None) 파싱 vs raw_cache (두 번째 실행 = 다른 프로세스에서 디스크 캐시 로드)
+    """
+    tmp = Path(tempfile.mkdtemp())
+    excel_path = tmp / "delivery_calendar.xlsx"
+    try:
+        make_synthetic_calendar(years=years).to_excel(excel_path, index=False, header=False)
+        t_excel, raw = _timeit(pd.read_excel, excel_path, header=None, repeat=1)
+        cached_table(excel_path, header=None).get()  # 캐시 생성
+
+        def load_from_disk():
+            lazy = cached_table(excel_path, header=None)
+            lazy._df = None  # 새 프로세스처럼 메모리 캐시 없이
+            return lazy.get()
+
+        t_disk, cached = _timeit(load_from_disk)
+        t_mem, _ = _timeit(cached_table(excel_path, header=None).get)
+        pd.testing.assert_frame_equal(raw, cached)
+    finally:
+        invalidate(excel_path)
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(
+        f"[raw_cache] {years}년 납품달력 {raw.shape[0]}행 | "
+        f"엑셀 파싱 {t_excel:.2f}s → 디스크 캐시 {t_disk * 1000:.1f} ms, 메모리 {t_mem * 1000:.2f} ms"
+    )
+
+
+def make_random_flat(n: int, seed: int = 0) -> pd.DataFrame:
+    """
+    generate_order_ids 입력과 같은 형태의 무작위 데이터
+    (코드 없음/None, 날짜 없음, 여러 연도, 같은 날 중복 주문 포함)
+    """
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(1, max(n // 8, 2), size=n).astype(str).astype(object)
+    codes[rng.random(n) < 0.05] = None
+    dates = pd.Series(
+        pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365 * 3, size=n), unit="D")
+    )
+    dates[rng.random(n) < 0.03] = pd.NaT
+    return pd.DataFrame({
+        "order_date": dates,
+        "customer_name_raw": [f"고객{c}" for c in codes],
+        "customer_code_raw": codes,
+    })
+
+
+def check_generate_order_ids_parity(trials: int = 20, n: int = 500):
+    """
+    무작위 데이터로 루프/벡터화 결과가 같은지 확인 (surrogate code 경로 포함)
+    """
+    for seed in range(trials):
+        flat = make_random_flat(n, seed=seed)
+        pd.testing.assert_frame_equal(generate_order_ids_loop(flat), generate_order_ids(flat))
+
+        no_code = flat.drop(columns=["customer_code_raw"])
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected, actual = generate_order_ids_loop(no_code), generate_order_ids(no_code)
+        pd.testing.assert_frame_equal(expected, actual)
+    print(f"[generate_order_ids] parity OK ({trials} x {n} rows)")
+
+
+def bench_generate_order_ids(n: int = 50_000):
+    flat = make_random_flat(n)
+    t_loop, ids_loop = _timeit(generate_order_ids_loop, flat, repeat=1)
+    t_vec, ids_vec = _timeit(generate_order_ids, flat)
+
+    pd.testing.assert_frame_equal(ids_loop, ids_vec)
+    print(
+        f"[generate_order_ids] {n}행 | "
+        f"loop {t_loop:.3f}s, vectorized {t_vec:.3f}s (x{t_loop / max(t_vec, 1e-9):.1f})"
+    )
+
+
+def make_random_movements(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    stock_ids = [f"F{i:03d}" for i in range(1, 41)] + [f"B{i:03d}" for i in range(1, 21)]
+    types = rng.choice(["IN", "OUT"], size=n, p=[0.3, 0.7])
+    qty = np.round(rng.uniform(0.5, 5.0, size=n), 2)
+    ids = rng.choice(stock_ids, size=n)
+    return pd.DataFrame({
+        "date": (pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 2000, n), unit="D")).strftime("%Y-%m-%d"),
+        "stock_id": ids,
+        "stock_name": "",
+        "type": types,
+        "quantity": qty,
+        "quantity_signed": np.where(types == "OUT", -qty, qty),
+        "unit": np.where(np.char.startswith(ids.astype(str), "B"), "ea", "m"),
+        "related_order_id": "",
+        "note": "",
+    })
+
+
+def bench_movement_append(n: int = 20_000, appends: int = 5):
+    """
+    OUT 1건 기록: 기존(엑셀 전체 읽기 + concat + 전체 저장) vs 저널 append
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="bench_journal_"))
+    try:
+        excel_path = workdir / "재고입출고.xlsx"
+        make_random_movements(n).to_excel(excel_path, index=False)
+        row = {"date": "2025-01-12", "stock_id": "F001", "stock_name": "", "type": "OUT",
+               "quantity": 2.3, "quantity_signed": -2.3, "unit": "m",
+               "related_order_id": "2025-0001-01", "note": "벤치마크"}
+
+        legacy_path = workdir / "legacy.xlsx"
+        shutil.copy(excel_path, legacy_path)
+
+        def _legacy_append():
+            df = pd.read_excel(legacy_path)
+            df = pd.concat([df, pd.DataFrame([row])], ignore_index=True)
+            df.to_excel(legacy_path, index=False)
+
+        t_legacy, _ = _timeit(_legacy_append, repeat=1)
+
+        journal = MovementJournal(excel_path, workdir / "journal", master_path=None)  # 최초 1회 엑셀 가져오기
+        t_journal, _ = _timeit(journal.append, row, repeat=appends)
+
+        assert len(journal.load()) == n + appends
+        print(
+            f"[movement_journal] 기록 {n}건에 OUT 1건 추가 | "
+            f"엑셀 전체 재저장 {t_legacy:.2f}s, 저널 append {t_journal * 1000:.2f} ms"
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def bench_stock_balances(n: int = 200_000):
+    """
+    현재 잔량: 기록 전체 groupby 합산 vs 저장된 잔량(balances.json) 읽기
+    """
+    workdir = Path(tempfile.mkdtemp(prefix="bench_balances_"))
+    try:
+        movements = make_random_movements(n)
+        excel_path = workdir / "재고입출고.xlsx"
+        movements.head(1).to_excel(excel_path, index=False)
+        journal = MovementJournal(excel_path, workdir / "journal", master_path=None)
+        journal.append(movements.iloc[1:].to_dict("records"))
+        journal.compact()
+
+        def _full_sum():
+            df, _ = normalize_movements(journal.load())
+            return df.groupby("stock_id")["quantity_signed"].sum()
+
+        t_full, expected = _timeit(_full_sum)
+        t_mat, balances = _timeit(journal.balances)
+
+        got = balances.set_index("stock_id")["balance"]
+        assert np.allclose(expected.sort_index().to_numpy(), got.sort_index().to_numpy())
+        print(
+            f"[stock_balances] 기록 {n}건, 품목 {len(got)}개 | "
+            f"전체 합산 {t_full * 1000:.1f} ms → 저장된 잔량 {t_mat * 1000:.2f} ms"
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def normalize_movements_apply(df):
+    """
+    기존 transform_stock 방식: 날짜 변환 + 행별 apply 로 부호 수량
+    """
+    df = df.copy()
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["quantity_signed"] = df.apply(
+        lambda r: r["quantity"] if r["type"] == "IN" else -r["quantity"],
+        axis=1
+    )
+    return df
+
+
+def bench_normalize_movements(n: int = 200_000):
+    df = make_random_movements(n).drop(columns="quantity_signed")
+
+    t_apply, expected = _timeit(normalize_movements_apply, df, repeat=1)
+    t_vec, (clean, rejected) = _timeit(normalize_movements, df)
+    assert rejected.empty
+    assert np.allclose(expected["quantity_signed"].astype(float), clean["quantity_signed"])
+    print(
+        f"[normalize_movements] {n}행 | "
+        f"apply {t_apply:.3f}s, 컬럼 연산(단위·날짜·검증 포함) {t_vec:.3f}s (x{t_apply / max(t_vec, 1e-9):.1f})"
+    )
+
+
+def generate_stock_ids_loop(names, excel_path):
+    """
+    기존 방식: 자재마다 엑셀 전체를 읽고 stock_id 컬럼 전체를 문자열 치환·정수 변환해서 최대 번호 + 1
+    (발급한 번호는 엑셀에 저장된 뒤에야 다음 계산에 반영되므로 메모리의 DataFrame 에 추가해서 흉내)
+    """
+    ids = []
+    added = []
+    for name in names:
+        df = pd.concat([pd.read_excel(excel_path), pd.DataFrame({"stock_id": added})], ignore_index=True)
+        prefix = detect_category(name)
+        existing = df[df["stock_id"].astype(str).str.startswith(prefix)]
+        if existing.empty:
+            new_id = f"{prefix}001"
+        else:
+            nums = existing["stock_id"].dropna().astype(str).str.replace(prefix, "", regex=False).astype(int)
+            new_id = f"{prefix}{nums.max() + 1:03d}"
+        ids.append(new_id)
+        added.append(new_id)
+    return ids
+
+
+def bench_stock_id_allocator(n_master: int = 2_000, n_new: int = 200):
+    rng = np.random.default_rng(0)
+    prefixes = rng.choice(list("FLIBZ"), n_master)
+    master = pd.DataFrame({"stock_id": [f"{p}{i:03d}" for i, p in enumerate(prefixes, start=1)]})
+    keywords = ["원단", "안감", "심지", "단추", "지퍼"]
+    names = [f"신규 {keywords[i % 5]} {i}" for i in range(n_new)]
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        master.to_excel(tmp / "stock_master.xlsx", index=False)
+        t_loop, expected = _timeit(generate_stock_ids_loop, names, tmp / "stock_master.xlsx", repeat=1)
+
+        def allocate():
+            (tmp / "stock_ids.json").unlink(missing_ok=True)
+            allocator = StockIdAllocator(tmp / "stock_master.xlsx", tmp / "stock_ids.json", movement_path=None)
+            return allocator.allocate([detect_category(n) for n in names])
+
+        t_alloc, got = _timeit(allocate)
+        assert got == expected
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(
+        f"[stock_id] 마스터 {n_master}건, 신규 자재 {n_new}개 | "
+        f"자재마다 엑셀 읽기 {t_loop:.2f}s → 일괄 발급 {t_alloc * 1000:.1f} ms (마스터 1번 읽기 포함)"
+    )
+
+
+def _peak_memory(fn, *args, **kwargs):
+    """
+    tracemalloc 최대 메모리 MB (추적 중에는 느려지므로 시간은 _timeit 으로 따로 측정)
+    """
+    tracemalloc.start()
+    fn(*args, **kwargs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def write_report_excelwriter(path, sheets):
+    # 기존 방식: pd.ExcelWriter(openpyxl) → 통합문서 전체를 메모리에 만든 뒤 저장
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, index=False)
+
+
+def write_report_streaming(path, sheets):
+    with contextlib.redirect_stdout(io.StringIO()), ReportWriter(path) as report:
+        for name, df in sheets.items():
+            report.sheet(name, df, raw=name.endswith("raw"))
+
+
+def bench_report_writer(n: int = 30_000):
+    raw = make_random_movements(n)
+    raw["date"] = pd.to_datetime(raw["date"])
+    sheets = {
+        "stock_raw": raw,
+        "balance": raw.groupby("stock_id", as_index=False)["quantity_signed"].sum(),
+    }
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        t_old, _ = _timeit(write_report_excelwriter, tmp / "old.xlsx", sheets, repeat=1)
+        t_new, _ = _timeit(write_report_streaming, tmp / "new.xlsx", sheets, repeat=1)
+        m_old = _peak_memory(write_report_excelwriter, tmp / "old.xlsx", sheets)
+        m_new = _peak_memory(write_report_streaming, tmp / "new.xlsx", sheets)
+        old = pd.read_excel(tmp / "old.xlsx", sheet_name="balance")
+        new = pd.read_excel(tmp / "new.xlsx", sheet_name="balance")
+        assert np.allclose(old["quantity_signed"], new["quantity_signed"])
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    print(
+        f"[report_writer] 원본 시트 {n}행 | "
+        f"ExcelWriter {t_old:.2f}s / 최대 {m_old:.0f} MB → write-only {t_new:.2f}s / 최대 {m_new:.0f} MB"
+    )
+
+
+def calc_fabric_usage_loop(df_orders, rules: dict):
+    """
+    기존 구현 (행마다 parse_items + apply) - 비교용
+    """
+    def parse_items(text):
+        if pd.isna(text):
+            return []
+        result = []
+        for p in str(text).replace(" ", "").split(","):
+            if len(p) < 2 or not p[1:].isdigit():
+                continue
+            if p[0] in rules:
+                result.append((p[0], int(p[1:])))
+        return result
+
+    df = df_orders.copy()
+    df["parsed"] = df["items"].apply(parse_items)
+    df["fabric_usage"] = df["parsed"].apply(lambda items: sum(rules[c] * n for c, n in items))
+    return df[["order_id", "fabric_usage", "items"]]
+
+
+def bench_fabric_usage(n: int = 200_000):
+    rng = random.Random(0)
+    orders = pd.DataFrame({
+        "order_id": [f"2025-{i:06d}" for i in range(n)],
+        "items": [rng.choice(ITEMS) for _ in range(n)],
+    })
+    rules = load_fabric_rules().to_dict()
+
+    t_loop, expected = _timeit(calc_fabric_usage_loop, orders, rules, repeat=1)
+    t_vec, got = _timeit(calc_fabric_usage, orders)
+
+    assert np.allclose(expected["fabric_usage"].astype(float), got["fabric_usage"])
+    print(
+        f"[fabric_usage] {n}행 | "
+        f"loop {t_loop:.3f}s, extractall {t_vec:.3f}s (x{t_loop / max(t_vec, 1e-9):.1f})"
+    )
+
+
+def make_costing_data(n_orders: int, seed: int = 0):
+    """
+    주문 n건 × 평균 2.5개 자재 OUT + stock_id 별 IN 20건 (단가 다름)
+    """
+    rng = np.random.default_rng(seed)
+    stock_ids = np.array([f"F{i:03d}" for i in range(1, 41)] + [f"B{i:03d}" for i in range(1, 21)])
+    master = pd.DataFrame({
+        "stock_id": stock_ids,
+        "category": ["fabric"] * 40 + ["button"] * 20,
+        "cost_per_unit": rng.integers(5, 50, len(stock_ids)) * 1000,
+    })
+
+    per_order = rng.integers(1, 5, n_orders)
+    order_ids = np.repeat([f"2025-{i:06d}" for i in range(n_orders)], per_order)
+    outs = pd.DataFrame({
+        "date": (pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 365, len(order_ids)), unit="D")),
+        "stock_id": rng.choice(stock_ids, len(order_ids)),
+        "type": "OUT",
+        "quantity": np.round(rng.uniform(0.5, 3.0, len(order_ids)), 2),
+        "related_order_id": order_ids,
+    })
+    ins = pd.DataFrame({
+        "date": (pd.Timestamp("2024-12-01") + pd.to_timedelta(rng.integers(0, 365, 20 * len(stock_ids)), unit="D")),
+        "stock_id": np.repeat(stock_ids, 20),
+        "type": "IN",
+        "quantity": rng.integers(100, 1000, 20 * len(stock_ids)).astype(float),
+        "related_order_id": "",
+        "unit_cost": rng.integers(5, 50, 20 * len(stock_ids)) * 1000.0,
+    })
+    return pd.concat([ins, outs], ignore_index=True), master
+
+
+def order_costs_loop(order_ids, movements, master):
+    """
+    기존 방식: 주문마다 OUT 기록을 마스크로 찾고, stock_id 마다 마스터 단가를 마스크로 찾음
+    """
+    totals = {}
+    for oid in order_ids:
+        rows = movements[(movements["type"] == "OUT") & (movements["related_order_id"] == oid)]
+        total = 0.0
+        for _, r in rows.iterrows():
+            cost = master.loc[master["stock_id"] == r["stock_id"], "cost_per_unit"].values
+            total += r["quantity"] * (cost[0] if len(cost) else 0)
+        totals[oid] = total
+    return totals
+
+
+def bench_order_costing(n_orders: int = 100_000, loop_sample: int = 500):
+    movements, master = make_costing_data(n_orders)
+
+    # 기존 방식은 너무 느려서 일부 주문으로 측정 후 전체 건수로 환산
+    sample = movements.loc[movements["type"] == "OUT", "related_order_id"].drop_duplicates().head(loop_sample)
+    t_loop, loop_totals = _timeit(order_costs_loop, sample, movements.drop(columns="unit_cost"), master, repeat=1)
+    t_loop_est = t_loop / loop_sample * n_orders
+
+    # unit_cost 없으면 가중평균 = 마스터 단가 → 기존 방식과 결과 비교
+    check = summarize_order_costs(
+        calculate_order_costs(movements.drop(columns="unit_cost"), master, "average")
+    ).set_index("order_id")["material_cost"]
+    assert np.allclose(check.loc[list(loop_totals)].to_numpy(), list(loop_totals.values()))
+
+    t_avg, _ = _timeit(calculate_order_costs, movements, master, "average")
+    t_fifo, fifo = _timeit(calculate_order_costs, movements, master, "fifo")
+    print(
+        f"[costing] 주문 {n_orders}건 / OUT {len(movements) - 20 * len(master)}건 / 자재 {len(master)}종 | "
+        f"주문별 loop(환산) {t_loop_est:.0f}s → 가중평균 {t_avg:.2f}s, FIFO {t_fifo:.2f}s "
+        f"(주문 {fifo['order_id'].nunique()}건 원가 계산)"
+    )
+
+
+def make_valuation_movements(years: int = 5, n_stock: int = 300, per_day: int = 300, seed: int = 0):
+    """
+    years 년치 입출고 (하루 per_day 건, IN 10% / OUT 90%, 자재 n_stock 종)
+    """
+    rng = np.random.default_rng(seed)
+    n = years * 365 * per_day
+    stock_ids = np.array([f"S{i:04d}" for i in range(n_stock)])
+    master = pd.DataFrame({
+        "stock_id": stock_ids,
+        "category": "fabric",
+        "cost_per_unit": rng.integers(5, 50, n_stock) * 1000,
+    })
+    is_in = rng.random(n) < 0.1
+    movements = pd.DataFrame({
+        "date": pd.Timestamp("2021-01-01") + pd.to_timedelta(np.sort(rng.integers(0, years * 365, n)), unit="D"),
+        "stock_id": rng.choice(stock_ids, n),
+        "type": np.where(is_in, "IN", "OUT"),
+        "quantity": np.where(is_in, rng.integers(50, 200, n), rng.integers(1, 15, n)).astype(float),
+        "related_order_id": "",
+        "unit_cost": np.where(is_in, rng.integers(5, 50, n) * 1000.0, np.nan),
+    })
+    return movements, master
+
+
+def bench_valuation(years: int = 5):
+    movements, master = make_valuation_movements(years)
+    last = str(movements["date"].max().to_period("M"))
+    prev = str(pd.Period(last, "M") - 1)
+
+    tmp = Path(tempfile.mkdtemp())
+    try:
+        quiet = contextlib.redirect_stdout(io.StringIO())
+        seq = InventoryValuation("fifo", out_dir=tmp / "seq")
+        par = InventoryValuation("fifo", out_dir=tmp / "par")
+        with quiet:
+            t_seq, _ = _timeit(seq.rebuild, movements, master, through=last, max_workers=1, repeat=1)
+            t_par, _ = _timeit(par.rebuild, movements, master, through=last, repeat=1)
+            # 전월까지 마감해 둔 상태에서 마지막 달만 마감
+            par.rebuild(movements, master, through=prev)
+            t_inc, _ = _timeit(par.close, movements, master, through=last, repeat=1)
+
+        a = seq.monthly().sort_values(["stock_id", "month"]).reset_index(drop=True)
+        b = par.monthly().sort_values(["stock_id", "month"]).reset_index(drop=True)
+        assert np.allclose(a["closing_value"], b["closing_value"]) and np.allclose(a["cogs"], b["cogs"])
+
+        # 입출고가 없는 달 마감 → 재고층 그대로 이월 / 빈 기록으로 첫 마감
+        later = str(pd.Period(last, "M") + 2)
+        with quiet:
+            rolled = par.close(movements, master, through=later)
+            empty = InventoryValuation("fifo", out_dir=tmp / "empty").close(
+                movements.iloc[0:0], master, through=last
+            )
+        closing = b[b["month"] == last].set_index("stock_id")["closing_value"]
+        for month, g in rolled.groupby("month"):
+            assert np.allclose(g.set_index("stock_id")["closing_value"].reindex(closing.index), closing), month
+            assert np.allclose(g["cogs"], 0.0), month
+        assert rolled["month"].nunique() == 2 and empty.empty
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(
+        f"[valuation] FIFO {years}년 {len(movements)}건 / 자재 {len(master)}종 | "
+        f"전체 순차 {t_seq:.2f}s, 전체 병렬 {t_par:.2f}s, 마지막 달만 마감 {t_inc:.2f}s"
+    )
+
+
+# ==========================================================
+# 회원 관리 앱 모듈 (app.py / app_legacy.py)
+# ==========================================================
+@contextlib.contextmanager
+def _app_workdir(prefix: str):
+    """
+    임시 폴더를 만들어 그 안에서 실행하고 끝나면 삭제
+    (settings/, data_settings/ 처럼 현재 폴더 기준 경로를 쓰는 모듈도 저장소를 건드리지 않음)
+    """
+    tmp = tempfile.mkdtemp(prefix=prefix)
+    cwd = os.getcwd()
+    os.chdir(tmp)
+    try:
+        yield tmp
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def bench_member_search(n_members: int = 100_000, repeat: int = 200):
+    """
+    기존 방식(str.contains 전체 스캔) vs 인덱스 검색
+    """
+    rng = random.Random(0)
+    surnames = "김이박최정강조윤장임한오서신권황안송류홍"
+    syllables = "민서준지현우성수영진호연재경은하도윤희철"
+    members = pd.DataFrame({
+        "member_id": [f"M{i + 1:04d}" for i in range(n_members)],
+        "name": [rng.choice(surnames) + rng.choice(syllables) + rng.choice(syllables) for _ in range(n_members)],
+        "phone": [f"010-{rng.randint(0, 9999):04d}-{rng.randint(0, 9999):04d}" for _ in range(n_members)],
+    })
+
+    t0 = time.perf_counter()
+    index = MemberSearchIndex(members)
+    t_build = time.perf_counter() - t0
+
+    queries = [("김민", ""), ("ㄱㅁㅅ", ""), ("", "5678"), ("", "010-12"), ("서준", ""), ("박", "1234")]
+
+    for name_q, phone_q in queries:
+        def _scan():
+            mask = pd.Series(False, index=members.index)
+            if name_q:
+                mask |= members["name"].astype(str).str.contains(name_q, na=False)
+            if phone_q:
+                mask |= members["phone"].astype(str).str.contains(phone_q, na=False)
+            return members[mask]
+
+        t_scan, _ = _timeit(lambda: [_scan() for _ in range(repeat)], repeat=1)
+        t_index, rows = _timeit(lambda: [index.search_rows(name_q, phone_q, limit=50) for _ in range(repeat)][-1], repeat=1)
+        print(
+            f"[member_search] 이름={name_q!r:8} 전화={phone_q!r:10} | "
+            f"contains 스캔 {t_scan / repeat * 1000:7.2f} ms → 인덱스 {t_index / repeat * 1000:6.3f} ms ({len(rows)}건)"
+        )
+    print(f"[member_search] 회원 {n_members:,}명 인덱스 생성 {t_build:.2f}s (버전당 1회)")
+
+
+def bench_record_store(n_records: int = 1_000_000, n_members: int = 20_000):
+    """
+    전체 CSV 읽기 + 필터(기존 load_records) vs 인덱스 조회 (1회 rerun에 2번 호출 기준)
+    """
+    with _app_workdir("bench_records_") as workdir:
+        csv_path = os.path.join(workdir, "measure_records.csv")
+        rng = np.random.default_rng(0)
+        members = [f"M{i:04d}" for i in rng.integers(1, n_members + 1, size=n_records)]
+        payload = json.dumps({"name": "홍길동", "neck": "15 1/2", "shoulder": "17 1/4"}, ensure_ascii=False)
+        pd.DataFrame({
+            "created_at": "2025-01-01 10:00:00",
+            "member_id": members,
+            "payload_json": payload,
+        }).to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+        store = MeasureRecordStore(csv_path)
+        t_build, _ = _timeit(store.sync, repeat=1)
+
+        target = members[0]
+
+        def _full_scan():
+            d = pd.read_csv(csv_path, encoding="utf-8-sig")
+            return d[d["member_id"].astype(str) == target]
+
+        t_full, expected = _timeit(lambda: pd.concat([_full_scan() for _ in range(2)]), repeat=1)
+        t_index, got = _timeit(lambda: pd.concat([store.load(target) for _ in range(2)]), repeat=1)
+        assert len(expected) == len(got)
+        t_append, _ = _timeit(store.append, target, {"name": "홍길동"}, repeat=1)
+
+    print(
+        f"[record_store] 기록 {n_records:,}건 / 회원 {n_members:,}명 | 인덱스 생성 {t_build:.2f}s (최초 1회)\n"
+        f"  rerun 1회(조회 2번): 전체 CSV 읽기 {t_full * 1000:.1f} ms → 인덱스 {t_index * 1000:.2f} ms "
+        f"(회원 기록 {len(got) // 2}건), append 1건 {t_append * 1000:.2f} ms"
+    )
+
+
+def bench_measure_columns(n_records: int = 200_000):
+    """
+    월별 평균 어깨: 행마다 json.loads + convert_measure_input(기존 방식) vs 컬럼 파일 집계
+    """
+    with _app_workdir("bench_measure_columns_") as workdir:
+        csv_path = os.path.join(workdir, "measure_records.csv")
+        rng = np.random.default_rng(0)
+        created = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n_records), unit="D")
+        shoulders = rng.choice(["17", "17 1/4", "17½", "17-3/4", "18.25", ""], size=n_records)
+        payloads = [
+            json.dumps({"name": "홍길동", "shoulder": s, "neck": "15 1/2", "total_price": 1200000,
+                        "order_date": "2025-01-02"}, ensure_ascii=False)
+            for s in shoulders
+        ]
+        pd.DataFrame({
+            "created_at": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "member_id": [f"M{i:04d}" for i in rng.integers(1, 5000, n_records)],
+            "payload_json": payloads,
+        }).to_csv(csv_path, index=False, encoding="utf-8-sig")
+
+        def _row_by_row():
+            d = pd.read_csv(csv_path, encoding="utf-8-sig")
+            values = [convert_measure_input(json.loads(s).get("shoulder", ""))[0] for s in d["payload_json"]]
+            d["shoulder"] = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+            d["created_at"] = pd.to_datetime(d["created_at"])
+            return d.groupby(d["created_at"].dt.to_period("M"))["shoulder"].mean()
+
+        t_rows, expected = _timeit(_row_by_row, repeat=1)
+        store = MeasureColumnStore(csv_path)
+        t_compact, _ = _timeit(store.compact, repeat=1)
+        t_cols, got = _timeit(store.monthly_mean, "shoulder", repeat=1)
+
+    pd.testing.assert_series_equal(expected, got, check_names=False)
+    print(
+        f"[measure_columns] 기록 {n_records:,}건 월별 평균 어깨 | 행별 json.loads {t_rows * 1000:.0f} ms "
+        f"→ 컬럼 파일 {t_cols * 1000:.1f} ms (compact {t_compact:.2f}s, 새 기록만 추가)"
+    )
+
+
+def bench_data_context(n_members: int = 5_000, per_member: int = 4, reruns: int = 20):
+    """
+    rerun 마다 엑셀 4개 읽기 + 회원 필터(기존 회원 관리 화면) vs DataContext
+    """
+    with _app_workdir("bench_context_") as workdir:
+        rng = np.random.default_rng(0)
+        member_ids = [f"M{i:04d}" for i in range(1, n_members + 1)]
+        n_rows = n_members * per_member
+        tables = {
+            "members": pd.DataFrame({"member_id": member_ids, "name": "홍길동", "phone": "010-0000-0000"}),
+            "consults": pd.DataFrame({"member_id": rng.choice(member_ids, n_rows), "consult_note": "상담"}),
+            "measures": pd.DataFrame({"member_id": rng.choice(member_ids, n_rows), "chest_cm": 100.0}),
+            "orders": pd.DataFrame({"member_id": rng.choice(member_ids, n_rows), "payload": "{}"}),
+        }
+        sources = {}
+        for name, df in tables.items():
+            path = os.path.join(workdir, f"{name}.xlsx")
+            df.to_excel(path, index=False)
+            sources[name] = (path, lambda p=path: pd.read_excel(p), lambda d, p=path: d.to_excel(p, index=False))
+
+        target = member_ids[0]
+
+        def _read_all():
+            out = {}
+            for name, (_, read, _) in sources.items():
+                df = read()
+                out[name] = len(df[df["member_id"] == target])
+            return out
+
+        t_read, expected = _timeit(_read_all, repeat=1)
+        ctx = DataContext(sources)
+        t_first, _ = _timeit(lambda: {name: len(ctx.for_member(name, target)) for name in sources}, repeat=1)
+        t_ctx, got = _timeit(
+            lambda: [{name: len(ctx.for_member(name, target)) for name in sources} for _ in range(reruns)][-1],
+            repeat=1,
+        )
+
+    assert got == expected
+    print(
+        f"[data_context] 회원 {n_members:,}명 / 표별 {n_rows:,}행 | rerun 1회: 엑셀 4개 읽기 {t_read * 1000:.0f} ms\n"
+        f"  DataContext: 첫 로드 {t_first * 1000:.0f} ms, 이후 rerun {t_ctx / reruns * 1000:.2f} ms "
+        f"(rerun {reruns + 1}번 동안 파일 읽기 {ctx.loads}번)"
+    )
+
+
+def bench_size_rules(n: int = 100_000, loop_sample: int = 200):
+    """
+    기존 방식(치수마다 read_excel + iterrows) vs 규칙 1번 로드 + searchsorted
+    """
+    rng = np.random.default_rng(0)
+    chest = pd.Series(np.round(rng.uniform(88, 110, n), 1))
+    chest[rng.random(n) < 0.05] = np.nan
+
+    with _app_workdir("bench_size_rules_"):
+        path = ensure_rule_file("jacket")
+
+        def recommend_loop(chest_cm):
+            if pd.isna(chest_cm) or chest_cm is None:
+                return NO_VALUE
+            rules = pd.read_excel(path)
+            for _, r in rules.iterrows():
+                if r["가슴_cm_하한"] <= chest_cm <= r["가슴_cm_상한"]:
+                    return r["상의호칭"]
+            return NO_RULE
+
+        t_loop, expected = _timeit(lambda: [recommend_loop(v) for v in chest[:loop_sample]], repeat=1)
+        invalidate_size_rules()
+        t_vec, got = _timeit(lambda: load_size_rules("jacket").recommend(chest), repeat=1)
+        invalidate_size_rules()
+
+    assert [str(x) for x in expected] == [str(x) for x in got[:loop_sample]]
+    print(
+        f"[size_rules] 치수 {n}건 | 건별 read_excel+iterrows(환산) {t_loop / loop_sample * n:.0f}s "
+        f"→ searchsorted {t_vec * 1000:.1f} ms"
+    )
+
+
+def bench_measure_parser(n: int = 200_000):
+    """
+    기존 방식(매번 load_settings + 정규식 컴파일 + str.replace 반복) vs MeasureParser
+    """
+    rng = np.random.default_rng(0)
+    inputs = pd.Series(rng.choice(
+        ["17", "17 1/4", "17¼", "17-3/4", "17 + 1/2", "18.25", "1/2", "15½", "", "약 17", "17 2/4"], size=n
+    ))
+
+    def convert_legacy(raw_value, settings):
+        if raw_value is None:
+            return None, ""
+        raw = str(raw_value).strip()
+        if raw == "":
+            return None, ""
+        char_map = settings.get("약속표기", {}).get("문자정규화", {})
+        repl_map = settings.get("약속표기", {}).get("치수표기_치환", {})
+        s = raw
+        for k, v in char_map.items():
+            s = s.replace(k, v)
+        normalized = re.sub(r"\s+", " ", s.replace("-", " ")).strip()
+        if normalized in repl_map:
+            return float(repl_map[normalized]), normalized
+        ss = re.sub(r"\s+", " ", normalized.replace("+", " "))
+        if re.fullmatch(r"\d+(\.\d+)?", ss):
+            return float(ss), normalized
+        if re.fullmatch(r"\d+/\d+", ss):
+            a, b = ss.split("/")
+            return float(a) / float(b), normalized
+        m = re.fullmatch(r"(\d+)\s+(\d+/\d+)", ss)
+        if m:
+            a, b = m.group(2).split("/")
+            return float(m.group(1)) + float(a) / float(b), normalized
+        m = re.search(r"(\d+(\.\d+)?)", normalized)
+        return (float(m.group(1)), normalized) if m else (None, normalized)
+
+    sample = inputs.iloc[:20_000]
+    with _app_workdir("bench_measure_parser_"):
+        t_legacy, expected = _timeit(lambda: [convert_legacy(v, load_settings()) for v in sample], repeat=1)
+        t_parse, got = _timeit(lambda: [get_measure_parser().parse(v) for v in inputs], repeat=1)
+        t_series, col = _timeit(lambda: get_measure_parser().parse_series(inputs), repeat=1)
+
+    assert expected == got[:len(sample)]
+    assert np.allclose(col.to_numpy()[:len(sample)], [np.nan if v is None else v for v, _ in expected], equal_nan=True)
+    print(
+        f"[settings_manager] 치수 입력 {n:,}건 | 건별 load_settings+정규식(환산) {t_legacy / len(sample) * n * 1000:.0f} ms "
+        f"→ MeasureParser.parse {t_parse * 1000:.0f} ms → parse_series {t_series * 1000:.1f} ms"
+    )
+
+
+def bench_write_behind(n_rows: int = 5_000, saves: int = 10):
+    """
+    저장 버튼마다 엑셀 전체 다시 쓰기(기존) vs submit(WAL 기록 후 반환)
+    """
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "회원번호": [f"M{i:04d}" for i in rng.integers(1, 2_000, n_rows)],
+        "상담일": "2025-01-01",
+        "상담메모": "상담 내용",
+        "금액": rng.integers(100_000, 2_000_000, n_rows),
+    })
+    with _app_workdir("bench_write_behind_") as workdir:
+        path = os.path.join(workdir, "consultations.xlsx")
+        t_sync, _ = _timeit(lambda: [df.to_excel(path, index=False) for _ in range(saves)], repeat=1)
+
+        queue = WriteBehindQueue(os.path.join(workdir, "wal"))
+        t_submit, _ = _timeit(lambda: [queue.submit(path, df.assign(금액=df["금액"] + i)) for i in range(saves)], repeat=1)
+        t_flush, _ = _timeit(queue.flush, timeout=300, repeat=1)
+
+        saved = pd.read_excel(path)
+        leftovers = os.listdir(queue.wal_dir)
+
+    assert int(saved["금액"].iloc[0]) == int(df["금액"].iloc[0]) + saves - 1
+    assert not leftovers
+    print(
+        f"[write_behind] {n_rows:,}행 저장 {saves}번 | 화면 대기: 엑셀 다시 쓰기 {t_sync / saves * 1000:.0f} ms → "
+        f"submit {t_submit / saves * 1000:.1f} ms\n  백그라운드 기록 {t_flush * 1000:.0f} ms "
+        f"(연속 저장 {saves}번 → 파일 기록 {queue.written}번)"
+    )
+
+
+def _register_members(args):
+    """
+    태블릿 1대: 회원 n명 등록 (번호 발급 → 행 추가 예약), crash=True 면 기록을 기다리지 않고 강제 종료
+    """
+    workdir, worker, n, crash = args
+    seq = IdSequence(os.path.join(workdir, "members.db"))
+    queue = WriteBehindQueue(os.path.join(workdir, "wal"), coalesce_seconds=random.uniform(0.01, 0.1))
+    path = os.path.join(workdir, "members_master.xlsx")
+    for i in range(n):
+        member_id = f"M{seq.next('member'):04d}"
+        queue.submit_rows(path, pd.DataFrame([{"회원번호": member_id, "이름": f"태블릿{worker}-{i}"}]), key="회원번호")
+        time.sleep(random.uniform(0, 0.02))
+    if crash:
+        os._exit(0)  # 백그라운드 기록 전에 죽음 → WAL 만 남음
+    queue.flush(timeout=300)
+    return worker
+
+
+def check_concurrent_registration(n_workers: int = 8, per_worker: int = 25):
+    """
+    여러 프로세스가 같은 회원 파일에 동시에 등록 → 회원번호 중복 없음 / 행 유실 없음 확인
+    마지막 프로세스는 기록 전에 강제 종료시키고, recover() 로 남은 WAL 반영
+    """
+    with _app_workdir("stress_members_") as workdir:
+        path = os.path.join(workdir, "members_master.xlsx")
+        pd.DataFrame(columns=["회원번호", "이름"]).to_excel(path, index=False)
+
+        tasks = [(workdir, w, per_worker, w == n_workers - 1) for w in range(n_workers)]
+        t0 = time.perf_counter()
+        procs = [multiprocessing.Process(target=_register_members, args=(t,)) for t in tasks]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+        t_run = time.perf_counter() - t0
+
+        recovered = WriteBehindQueue(os.path.join(workdir, "wal")).recover()
+        df = pd.read_excel(path)
+        leftovers = [n for n in os.listdir(workdir) if n.startswith("~")] + os.listdir(os.path.join(workdir, "wal"))
+
+    expected = n_workers * per_worker
+    assert len(df) == expected, f"행 유실/중복: {len(df)} != {expected}"
+    assert df["회원번호"].is_unique, "회원번호 중복"
+    assert not leftovers, f"남은 임시파일/WAL: {leftovers}"
+    print(
+        f"[id_sequence] 프로세스 {n_workers}개 × 등록 {per_worker}건 ({t_run:.1f}s) → "
+        f"행 {len(df)}개, 회원번호 중복 0, 유실 0 (강제 종료 1개 → recover 로 파일 {recovered}개 반영)"
+    )
+
+
+if __name__ == "__main__":
+    np.random.seed(0)
+    bench_flatten_delivery_calendar()
+    bench_raw_cache()
+    check_generate_order_ids_parity()
+    bench_generate_order_ids()
+    bench_movement_append()
+    bench_stock_balances()
+    bench_normalize_movements()
+    bench_report_writer()
+    bench_stock_id_allocator()
+    bench_fabric_usage()
+    bench_order_costing()
+    bench_valuation()
+    bench_member_search()
+    bench_record_store()
+    bench_measure_columns()
+    bench_data_context()
+    bench_size_rules()
+    bench_measure_parser()
+    bench_write_behind()
+    check_concurrent_registration()
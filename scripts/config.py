@@ -10,6 +10,26 @@ DATA_CLEAN_DIR = BASE_DIR / "data_clean"
 REPORT_DIR = BASE_DIR / "reports"
 LOG_DIR = BASE_DIR / "logs"
 
+# 증분 처리용 manifest (원본 파일 fingerprint + 단계별 실행 기록, data_clean 옆에 저장)
+MANIFEST_FILE = BASE_DIR / "data_clean_manifest.json"
+
+# data_clean 중간 산출물 저장 형식 (storage.py 참고)
+# - "parquet" : 기본값, 타입 보존 + 빠른 읽기/쓰기 (pyarrow 필요)
+# - "feather" : Arrow IPC 파일
+# - "xlsx"    : 예전 방식 (느림)
+CLEAN_FORMAT = "parquet"
+
+# 원본 엑셀 파싱 결과 캐시 (raw_cache.py) - 원본 파일이 그대로면 엑셀을 다시 읽지 않음
+RAW_CACHE_DIR = DATA_CLEAN_DIR / "raw_cache"
+
+# True면 중간 산출물을 저장할 때 같은 이름의 .xlsx도 함께 생성 (엑셀로 직접 확인할 때만)
+# 필요할 때만 따로 뽑으려면: python storage.py orders_2025
+EXPORT_CLEAN_EXCEL = False
+
+# 분석 보고서에 원본 덤프 시트(orders_raw, raw_stock, customers_raw, orders_this_year)를 넣을지 여부
+# 여러 해 데이터면 보고서가 커지므로 False 로 두고 요약 시트만 생성 (report_writer.py)
+REPORT_RAW_SHEETS = True
+
 # 기본 연도 (필요 시 바꿔서 사용)
 TARGET_YEAR = 2025
 
@@ -17,6 +37,20 @@ TARGET_YEAR = 2025
 FILE_CUSTOMER = DATA_RAW_DIR / "회원정보.xlsx"
 FILE_PROD_CAL = DATA_RAW_DIR / "3. 납품달력(2025).xlsx"
 FILE_STOCK_CAL = DATA_RAW_DIR / "4. 입출고달력(2025).xlsx"
+FILE_STOCK_TABLE = DATA_RAW_DIR / "재고입출고.xlsx"
+FILE_STOCK_MASTER = DATA_RAW_DIR / "stock_master.xlsx"
+# stock_id prefix 별 마지막 발급 번호 (generate_stock_id.StockIdAllocator)
+STOCK_ID_STATE = DATA_RAW_DIR / "stock_ids.json"
+
+# 재고 입출고 저널 (movement_journal.py) - 기록은 여기에 추가, 재고입출고.xlsx 는 요청 시 생성
+STOCK_JOURNAL_DIR = DATA_RAW_DIR / "stock_journal"
+
+# 재고 평가 월 마감 결과 (valuation.py) - 평가 방식별 하위 폴더
+VALUATION_DIR = DATA_CLEAN_DIR / "valuation"
+
+# 규칙 표 (app_legacy 설정 화면과 같은 settings 폴더)
+SETTINGS_DIR = BASE_DIR / "settings"
+FILE_FABRIC_RULES = SETTINGS_DIR / "fabric_rules.xlsx"   # 품목코드 → 원단소요(m)
 
 # 디렉토리 없는 경우 생성
 for d in [DATA_RAW_DIR, DATA_CLEAN_DIR, REPORT_DIR, LOG_DIR]:
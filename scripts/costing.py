@@ -1,23 +1,158 @@
+import numpy as np
 import pandas as pd
 
-def calculate_cost(order_df, usage_df, master_df):
+COST_METHODS = ("average", "fifo")
+
+
+def price_index(master_df):
+    """
+    stock_master → stock_id 로 바로 찾는 단가 Series (호출마다 마스크 검색하지 않도록 1번 생성)
+    """
+    master = master_df.dropna(subset=["stock_id"]).drop_duplicates(subset=["stock_id"], keep="last")
+    prices = pd.to_numeric(master["cost_per_unit"], errors="coerce").fillna(0.0)
+    return pd.Series(prices.to_numpy(), index=master["stock_id"].astype(str), name="cost_per_unit")
+
+
+def calculate_cost(order_df, usage_df, master_df, fabric_id=None):
     """
     order_df : 주문 테이블
-    usage_df : fabric_usage 결과
+    usage_df : fabric_usage.parse_items_long 결과 (order_id, code, qty, meters)
     master_df: stock_master.xlsx
+    fabric_id: 사용할 원단 stock_id (없으면 stock_master 의 첫 번째 fabric)
+    반환: 주문·품목코드별 원단 사용량과 예상 재료비 (출고 전 견적용)
     """
+    if fabric_id is None:
+        fabrics = master_df.loc[master_df["category"] == "fabric", "stock_id"]
+        fabric_id = fabrics.iloc[0] if len(fabrics) else None
+    cost_per_m = price_index(master_df).get(str(fabric_id), 0.0)
 
-    # 기본적으로 원단 코드(stock_id) 매핑 필요
-    # 여기서는 단일 원단 사용 가정 → F001로 테스트
-    fabric_id = "F001"
+    df = (
+        usage_df.assign(meters=usage_df["meters"].fillna(0))
+        .groupby(["order_id", "code"], as_index=False, sort=False)["meters"].sum()
+        .rename(columns={"code": "item_type", "meters": "fabric_usage"})
+    )
+    df["material_cost"] = df["fabric_usage"] * cost_per_m
+
+    return df[["order_id","item_type","fabric_usage","material_cost"]]
 
-    cost_per_m = master_df.loc[master_df["stock_id"] == fabric_id, "cost_per_unit"].values
-    if len(cost_per_m) == 0:
-        cost_per_m = 0
+
+# ----------------------------------------------------------
+# 실제 출고 기준 재료비 (입출고 기록 → 주문별, 여러 원단/부자재)
+# ----------------------------------------------------------
+def prepare_movements(movement_df, master_df):
+    """
+    입출고 기록 정리: 수량 숫자화, 날짜 순 정렬(같은 날은 기록 순), IN 단가 채우기
+    IN 기록에 unit_cost 컬럼이 있으면 그 값, 없으면 stock_master 단가
+    """
+    df = movement_df.copy()
+    df = df[df["stock_id"].notna()]
+    df["stock_id"] = df["stock_id"].astype(str).str.strip()
+    df["quantity"] = pd.to_numeric(df["quantity"], errors="coerce").abs().fillna(0.0)
+    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    df["_order"] = np.arange(len(df))
+    df = df.sort_values(["stock_id", "date", "_order"], kind="stable", na_position="last")
+
+    prices = price_index(master_df)
+    master_cost = df["stock_id"].map(prices).fillna(0.0)
+    if "unit_cost" in df.columns:
+        in_cost = pd.to_numeric(df["unit_cost"], errors="coerce").fillna(master_cost)
     else:
-        cost_per_m = cost_per_m[0]
+        in_cost = master_cost
+    df["in_unit_cost"] = in_cost.where(df["type"] == "IN")
+    df["master_cost"] = master_cost
+    return df
 
-    df = usage_df.copy()
-    df["material_cost"] = df["fabric_usage"] * cost_per_m
 
-    return df[["order_id","item_type","fabric_usage","material_cost"]]
+def average_unit_cost(movement_df, master_df):
+    """
+    이동평균이 아닌 전체 가중평균: stock_id 별 sum(IN 수량 × 단가) / sum(IN 수량)
+    IN 기록이 없는 stock_id 는 stock_master 단가
+    """
+    return _average_costs(prepare_movements(movement_df, master_df), master_df)
+
+
+def _average_costs(df, master_df):
+    ins = df[df["type"] == "IN"]
+    value = (ins["quantity"] * ins["in_unit_cost"]).groupby(ins["stock_id"]).sum()
+    qty = ins.groupby("stock_id")["quantity"].sum()
+    avg = (value / qty.replace(0, np.nan)).rename("unit_cost")
+
+    index = price_index(master_df).rename("unit_cost")
+    return avg.combine_first(index)
+
+
+def _fifo_costs(df):
+    """
+    stock_id 별로 정렬된 기록 → OUT 행마다 FIFO 원가
+    IN 누적수량 C_in, OUT 누적수량 C_out 에서 OUT 1건은 [C_out_이전, C_out] 구간을 소진.
+    구간 원가 = F(C_out) - F(C_out_이전), F(x) = 앞에서부터 x 만큼의 IN 금액 (구간별 선형)
+    IN 보다 많이 나가면 마지막 IN 단가(없으면 마스터 단가)로 계산
+    """
+    costs = np.zeros(len(df))
+    stock = df["stock_id"].to_numpy()
+    is_in = (df["type"] == "IN").to_numpy()
+    is_out = (df["type"] == "OUT").to_numpy()
+    qty = df["quantity"].to_numpy(dtype=float)
+    in_cost = df["in_unit_cost"].to_numpy(dtype=float)
+    master_cost = df["master_cost"].to_numpy(dtype=float)
+
+    # 정렬돼 있으므로 stock_id 경계만 찾아서 구간별 계산
+    bounds = np.flatnonzero(np.r_[True, stock[1:] != stock[:-1], True])
+    for s, e in zip(bounds[:-1], bounds[1:]):
+        layer_q = qty[s:e][is_in[s:e]]
+        layer_p = in_cost[s:e][is_in[s:e]]
+        outs = np.flatnonzero(is_out[s:e]) + s
+        if len(outs) == 0:
+            continue
+
+        end = np.cumsum(qty[outs])
+        start = end - qty[outs]
+        if len(layer_q) == 0:
+            costs[outs] = qty[outs] * master_cost[outs]
+            continue
+
+        cum_q = np.r_[0.0, np.cumsum(layer_q)]
+        cum_v = np.r_[0.0, np.cumsum(layer_q * layer_p)]
+
+        def value_at(x):
+            i = np.clip(np.searchsorted(cum_q, x, side="right") - 1, 0, len(layer_q) - 1)
+            return cum_v[i] + (x - cum_q[i]) * layer_p[i]
+
+        costs[outs] = value_at(end) - value_at(start)
+    return costs
+
+
+def calculate_order_costs(movement_df, master_df, method="average"):
+    """
+    입출고 기록의 OUT(related_order_id 있는 것) → 주문·stock_id 별 실제 재료비
+    method: "average" (가중평균 단가, merge 1번) / "fifo" (먼저 들어온 IN 부터 소진)
+    반환: order_id, stock_id, quantity, unit_cost, material_cost
+    """
+    if method not in COST_METHODS:
+        raise ValueError(f"지원하지 않는 원가 계산 방식입니다: {method} ({', '.join(COST_METHODS)})")
+
+    df = prepare_movements(movement_df, master_df)
+    if method == "fifo":
+        df["material_cost"] = _fifo_costs(df)
+
+    order_id = df["related_order_id"].astype("string").str.strip()
+    out = df[(df["type"] == "OUT") & order_id.notna() & (order_id != "")].assign(order_id=order_id)
+
+    if method == "average":
+        avg = _average_costs(df, master_df).rename("avg_unit_cost")
+        out = out.merge(avg, left_on="stock_id", right_index=True, how="left")
+        out["material_cost"] = out["quantity"] * out["avg_unit_cost"].fillna(0.0)
+
+    result = out.groupby(["order_id", "stock_id"], as_index=False, sort=False)[["quantity", "material_cost"]].sum()
+    result["unit_cost"] = result["material_cost"] / result["quantity"].replace(0, np.nan)
+    return result[["order_id", "stock_id", "quantity", "unit_cost", "material_cost"]]
+
+
+def summarize_order_costs(order_costs):
+    """
+    calculate_order_costs 결과 → 주문별 재료비 합계 (사용 자재 수 포함)
+    """
+    return order_costs.groupby("order_id", as_index=False).agg(
+        material_cost=("material_cost", "sum"),
+        stock_items=("stock_id", "nunique"),
+    )
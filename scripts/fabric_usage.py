@@ -1,38 +1,106 @@
+import numpy as np
 import pandas as pd
+from config import FILE_FABRIC_RULES
 
-FABRIC_RULE = {
-    "상": 1.6,
-    "하": 1.1,
-    "조": 0.8,
-}
+# 규칙 파일이 없을 때 만드는 기본값 (품목코드 1개당 원단 m)
+DEFAULT_FABRIC_RULES = pd.DataFrame({
+    "코드": ["상", "하", "조"],
+    "품목": ["상의", "하의", "조끼"],
+    "원단소요_m": [1.6, 1.1, 0.8],
+})
 
-def parse_items(text):
-    if pd.isna(text):
-        return []
+# items 예: "상1,하1,조1" / "상2, 하2" / "셔츠12"
+# 쉼표로 나눈 각 항목 = 코드(숫자·쉼표 아닌 글자 1개 이상) + 수량(숫자)
+ITEM_PATTERN = r"(?:^|,)(?P<code>[^,\d]+)(?P<qty>\d+)(?=,|$)"
+
+USAGE_COLUMNS = ["order_id", "code", "qty", "meters"]
+
+_rules_cache = {}
+
+
+def ensure_fabric_rules(path=FILE_FABRIC_RULES):
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        DEFAULT_FABRIC_RULES.to_excel(path, index=False)
+
+
+def load_fabric_rules(path=FILE_FABRIC_RULES) -> pd.Series:
+    """
+    settings/fabric_rules.xlsx → 코드별 원단소요(m) Series (파일이 바뀔 때만 다시 읽음)
+    """
+    ensure_fabric_rules(path)
+    mtime = path.stat().st_mtime_ns
+    cached = _rules_cache.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
 
-    text = str(text).replace(" ", "")
-    parts = text.split(",")
+    df = pd.read_excel(path, dtype={"코드": str})
+    df["코드"] = df["코드"].str.strip()
+    df = df.dropna(subset=["코드"]).drop_duplicates(subset=["코드"], keep="last")
+    rules = pd.to_numeric(df.set_index("코드")["원단소요_m"], errors="coerce").rename("meters_per_unit")
+    _rules_cache[path] = (mtime, rules)
+    return rules
 
-    result = []
-    for p in parts:
-        if len(p) < 2:
-            continue
 
-        code = p[0]        # 상, 하, 조 등
-        num = p[1:]        # 숫자
+def _extract(df_orders: pd.DataFrame, rules: pd.Series):
+    """
+    items 컬럼 전체를 str.extractall 로 한 번에 파싱 → (usage, 주문 행 위치 배열)
+    items 표기는 종류가 적으므로 고유값만 파싱한 뒤 주문 행으로 펼침
+    """
+    text = df_orders["items"].astype("string").str.replace(r"\s+", "", regex=True)
+    row_code, uniques = pd.factorize(text, use_na_sentinel=True)
 
-        if not num.isdigit():
-            continue
+    found = pd.Series(uniques, dtype="string").str.extractall(ITEM_PATTERN)
+    u = found.index.get_level_values(0).to_numpy(dtype=np.intp)  # 이미 고유값 순서로 정렬됨
 
-        num = int(num)
+    # 주문 행마다 해당 고유값의 항목 수만큼 반복
+    per_unique = np.bincount(u, minlength=len(uniques))
+    starts = np.concatenate(([0], np.cumsum(per_unique)[:-1])) if len(uniques) else per_unique
+    valid = row_code >= 0
+    rows = np.flatnonzero(valid)
+    counts = per_unique[row_code[valid]]
+    pos = np.repeat(rows, counts)
+    first = np.repeat(starts[row_code[valid]], counts)
+    take = first + (np.arange(len(pos)) - np.repeat(np.cumsum(counts) - counts, counts))
 
-        if code in FABRIC_RULE:
-            result.append((code, num))
+    usage = pd.DataFrame({
+        "order_id": df_orders["order_id"].to_numpy()[pos],
+        "code": found["code"].astype(str).to_numpy()[take],
+        "qty": found["qty"].astype(int).to_numpy()[take],
+    })
+    usage["meters"] = usage["code"].map(rules) * usage["qty"]
 
-    return result
+    unknown = usage.loc[usage["meters"].isna(), "code"].unique()
+    if len(unknown):
+        print(f"[fabric_usage] 규칙 표에 없는 코드: {', '.join(sorted(unknown))} (원단소요 0으로 계산)")
+    return usage, pos
+
+
+def parse_items_long(df_orders: pd.DataFrame, rules: pd.Series = None) -> pd.DataFrame:
+    """
+    주문 items → 항목별 long 형식 (order_id, code, qty, meters)
+    규칙 표에 없는 코드도 행은 남기고 meters 만 비움 (경고 출력)
+    costing.calculate_cost 에 그대로 넣어 집계
+    """
+    if "items" not in df_orders.columns or df_orders.empty:
+        return pd.DataFrame(columns=USAGE_COLUMNS)
+    usage, _ = _extract(df_orders, load_fabric_rules() if rules is None else rules)
+    return usage
+
+
+def parse_items(text):
+    """
+    items 문자열 1개 → [(코드, 수량), ...] (규칙 표에 있는 코드만)
+    """
+    usage = parse_items_long(pd.DataFrame({"order_id": [None], "items": [text]}))
+    usage = usage[usage["meters"].notna()]
+    return list(zip(usage["code"], usage["qty"]))
 
 
 def calc_fabric_usage(df_orders):
+    """
+    주문 행별 원단 사용량 합계 (order_id, fabric_usage, items)
+    """
     df = df_orders.copy()
 
     # 여기서 items 컬럼을 명시적으로 사용
@@ -41,10 +109,7 @@ def calc_fabric_usage(df_orders):
         df["fabric_usage"] = 0
         return df[["order_id", "fabric_usage"]]
 
-    df["parsed"] = df["items"].apply(parse_items)
-
-    df["fabric_usage"] = df["parsed"].apply(
-        lambda items: sum(FABRIC_RULE[c] * n for c, n in items)
-    )
+    usage, pos = _extract(df, load_fabric_rules())
+    df["fabric_usage"] = np.bincount(pos, weights=usage["meters"].fillna(0).to_numpy(), minlength=len(df))
 
     return df[["order_id", "fabric_usage", "items"]]
@@ -0,0 +1,40 @@
+# scripts/file_lock.py
+"""
+여러 프로세스가 같은 파일을 동시에 고치지 않도록 하는 잠금 파일 (O_EXCL)
+
+- 잠금 파일을 만들 수 있는 프로세스 1개만 통과, 나머지는 대기
+- 프로세스가 죽어서 남은 잠금(stale_seconds 보다 오래된 파일)은 지우고 다시 시도
+
+    with file_lock(path.with_suffix(".lock")):
+        ...
+"""
+import os
+import time
+from contextlib import contextmanager
+
+
+@contextmanager
+def file_lock(lock_path, timeout: float = 30, stale_seconds: float = 300):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_seconds:
+                    os.remove(lock_path)  # 죽은 프로세스가 남긴 잠금
+                    continue
+            except OSError:
+                continue
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"잠금 대기 시간 초과: {lock_path}")
+            time.sleep(0.05)
+    try:
+        os.close(fd)
+        yield
+    finally:
+        try:
+            os.remove(lock_path)
+        except OSError:
+            pass
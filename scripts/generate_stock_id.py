@@ -1,10 +1,15 @@
 # scripts/generate_stock_id.py
 
+import json
+import os
+
 import pandas as pd
-from config import DATA_RAW_DIR
+from config import FILE_STOCK_MASTER, FILE_STOCK_TABLE, STOCK_ID_STATE
+from file_lock import file_lock
+from storage import read_table
 
-# 재고입출고 파일(템플릿 포함)
-FILE_STOCK = DATA_RAW_DIR / "재고입출고.xlsx"
+# stock_id = prefix(영문) + 번호 (3자리 이상)
+STOCK_ID_PATTERN = r"^([A-Za-z]+)(\d+)$"
 
 # 자재명 키워드 → 타입 매핑
 CATEGORY_MAP = {
@@ -31,40 +36,142 @@ def detect_category(material_name: str) -> str:
     return "A"  # 기본: 기타 액세서리
 
 
+def max_numbers(stock_ids: pd.Series) -> dict:
+    """
+    stock_id 컬럼 → {prefix: 가장 큰 번호} (형식이 다른 값은 무시)
+    """
+    parts = stock_ids.dropna().astype(str).str.strip().str.extract(STOCK_ID_PATTERN).dropna()
+    return parts[1].astype(int).groupby(parts[0]).max().to_dict()
+
+
 def get_next_id(df: pd.DataFrame, prefix: str) -> str:
     """
     동일 prefix(F, L, I, B...)에서 가장 큰 번호를 찾아 +1 하여 새 ID 생성
     """
-    existing = df[df["stock_id"].astype(str).str.startswith(prefix)]
+    return f"{prefix}{max_numbers(df['stock_id']).get(prefix, 0) + 1:03d}"
 
-    if existing.empty:
-        return f"{prefix}001"
 
-    # 숫자 부분만 추출
-    nums = (
-        existing["stock_id"]
-        .dropna()
-        .astype(str)
-        .str.replace(prefix, "", regex=False)
-        .astype(int)
-    )
-    new_num = nums.max() + 1
-    return f"{prefix}{new_num:03d}"
+def _file_fingerprint(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
 
 
-def generate_stock_id(material_name: str) -> str:
+class StockIdAllocator:
     """
-    자재명을 입력하면 자동으로 stock_id 생성.
+    prefix 별 마지막 발급 번호(high-water mark)로 stock_id 발급
+
+    - 발급할 때마다 엑셀을 읽지 않고 stock_ids.json(작은 상태 파일)만 읽고 씀
+    - stock_master.xlsx 는 상태 파일이 없거나, 마지막으로 확인한 뒤 파일이 바뀌었을 때만 다시 읽어서
+      직접 입력된 stock_id 보다 큰 번호부터 발급
+    - 상태 파일을 처음 만들 때 1번은 입출고 기록의 stock_id 도 확인
+      (마스터에 없이 기록에만 있는 번호와 겹치지 않도록, 기존 재고입출고.xlsx 기준 방식과 같은 범위)
+    - 여러 프로세스가 동시에 등록해도 번호가 겹치지 않도록 잠금 파일 안에서 읽기 → 증가 → 저장
     """
-    try:
-        df = pd.read_excel(FILE_STOCK)
-    except FileNotFoundError:
-        print("⚠️ 재고입출고.xlsx 파일이 존재하지 않아 신규 템플릿을 참조할 수 없습니다.")
-        print("   먼저 create_stock_template.py 를 실행하여 템플릿을 생성하세요.")
-        return None
 
+    def __init__(self, master_path=FILE_STOCK_MASTER, state_path=STOCK_ID_STATE, movement_path=FILE_STOCK_TABLE):
+        """
+        movement_path: 처음 1번 확인할 입출고 기록 (None 이면 마스터만)
+        """
+        self.master_path = master_path
+        self.movement_path = movement_path
+        self.state_path = state_path
+        self.lock_path = state_path.with_suffix(".lock")
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        return {
+            "high": state.get("high", {}),
+            "master": state.get("master"),
+            "movements_seeded": state.get("movements_seeded", False),
+        }
+
+    def _write_state(self, state: dict) -> None:
+        tmp = self.state_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.state_path)
+
+    @staticmethod
+    def _merge(state: dict, stock_ids: pd.Series) -> None:
+        for prefix, n in max_numbers(stock_ids).items():
+            state["high"][prefix] = max(state["high"].get(prefix, 0), int(n))
+
+    def _seed_movements(self, state: dict) -> None:
+        if state["movements_seeded"]:
+            return
+        from movement_journal import MovementJournal
+
+        if self.movement_path is not None and self.movement_path.exists():
+            self._merge(state, MovementJournal(self.movement_path).load()["stock_id"])
+        state["movements_seeded"] = True
+
+    def _merge_master(self, state: dict, master_df: pd.DataFrame = None) -> None:
+        """
+        마스터가 마지막 확인 이후 바뀌었으면 (또는 master_df 를 받았으면) 그 번호까지 반영
+        """
+        fingerprint = _file_fingerprint(self.master_path)
+        if master_df is None:
+            if fingerprint == state["master"]:
+                return
+            master_df = read_table(self.master_path) if fingerprint else pd.DataFrame(columns=["stock_id"])
+        self._merge(state, master_df["stock_id"])
+        state["master"] = fingerprint
+
+    def allocate(self, prefixes, master_df: pd.DataFrame = None) -> list:
+        """
+        prefix list → 같은 순서의 새 stock_id list (잠금 1번, 상태 파일 쓰기 1번)
+        master_df: 방금 읽은 마스터가 있으면 넘겨서 다시 읽지 않게 함
+        """
+        prefixes = list(prefixes)
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            self._seed_movements(state)
+            self._merge_master(state, master_df)
+            ids = []
+            for prefix in prefixes:
+                n = state["high"].get(prefix, 0) + 1
+                state["high"][prefix] = n
+                ids.append(f"{prefix}{n:03d}")
+            self._write_state(state)
+        return ids
+
+    def next_id(self, prefix: str) -> str:
+        return self.allocate([prefix])[0]
+
+    def mark_master_saved(self) -> None:
+        """
+        발급한 번호로 마스터를 저장한 직후 호출 → 다음 발급 때 마스터를 다시 읽지 않음
+        (마스터의 번호는 모두 상태 파일의 번호 이하이므로 안전)
+        """
+        with file_lock(self.lock_path):
+            state = self._read_state()
+            state["master"] = _file_fingerprint(self.master_path)
+            self._write_state(state)
+
+
+_allocator = None
+
+
+def get_allocator() -> StockIdAllocator:
+    global _allocator
+    if _allocator is None:
+        _allocator = StockIdAllocator()
+    return _allocator
+
+
+def generate_stock_id(material_name: str) -> str:
+    """
+    자재명을 입력하면 자동으로 stock_id 생성 (stock_master 기준 번호, 엑셀은 바뀌었을 때만 읽음)
+    """
     prefix = detect_category(material_name)
-    new_id = get_next_id(df, prefix)
+    new_id = get_allocator().next_id(prefix)
 
     print(f"[자동 생성됨] {material_name} → {new_id}")
     return new_id
@@ -1,12 +1,16 @@
 # scripts/load_data.py
 import pandas as pd
 from config import FILE_CUSTOMER, FILE_PROD_CAL, FILE_STOCK_CAL
+from raw_cache import cached_table, invalidate
+from storage import read_clean
+from transform_orders import clean_output_stems
+from transform_stock import STOCK_MOVEMENT_STEM
 
 def load_customers() -> pd.DataFrame:
     """
-    회원정보.xlsx 로드 + 기본 컬럼명 정리
+    회원정보.xlsx 로드 + 기본 컬럼명 정리 (파일이 그대로면 raw_cache 에서 로드)
     """
-    df = pd.read_excel(FILE_CUSTOMER)
+    df = cached_table(FILE_CUSTOMER).get()
     df = df.rename(columns={
         "회원번호": "customer_id",
         "이름": "name",
@@ -34,7 +38,7 @@ def load_delivery_calendar() -> pd.DataFrame:
     납품달력(캘린더 형식) 원본을 그대로 로드 (header=None)
     실제 정규화는 transform_orders.py에서 수행
     """
-    df = pd.read_excel(FILE_PROD_CAL, header=None)
+    df = cached_table(FILE_PROD_CAL, header=None).get()
     return df
 
 
@@ -43,7 +47,7 @@ def load_stock_calendar() -> pd.DataFrame:
     입출고달력(캘린더 형식) 원본 로드 (header=None)
     실제 정규화는 transform_stock.py에서 수행
     """
-    df = pd.read_excel(FILE_STOCK_CAL, header=None)
+    df = cached_table(FILE_STOCK_CAL, header=None).get()
     return df
 
 
@@ -55,3 +59,28 @@ def load_all():
     delivery_raw = load_delivery_calendar()
     stock_raw = load_stock_calendar()
     return customers, delivery_raw, stock_raw
+
+
+def invalidate_raw_cache(path=None) -> int:
+    """
+    원본 엑셀 캐시 삭제 (path 없으면 전체) → 다음 load_* 때 엑셀을 다시 읽음
+    """
+    return invalidate(path)
+
+
+def load_orders(year: int) -> pd.DataFrame:
+    """
+    transform_delivery_to_orders 가 저장한 주문 테이블 재사용 (증분 실행 시)
+    """
+    return read_clean(
+        clean_output_stems(year)["orders"],
+        dtype={"order_id": str, "customer_code_raw": str},
+        parse_dates=["order_date"],
+    )
+
+
+def load_stock_movement() -> pd.DataFrame:
+    """
+    transform_stock_table 이 저장한 재고 이동 테이블 재사용 (증분 실행 시)
+    """
+    return read_clean(STOCK_MOVEMENT_STEM, parse_dates=["date"])
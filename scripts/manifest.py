@@ -0,0 +1,125 @@
+# scripts/manifest.py
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+from config import BASE_DIR, MANIFEST_FILE
+
+
+def _key(path) -> str:
+    """
+    manifest에 저장할 경로 키 (프로젝트 루트 기준 상대경로, 다른 PC에서도 동일)
+    """
+    p = Path(path).resolve()
+    try:
+        return p.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return p.as_posix()
+
+
+def file_hash(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def file_fingerprint(path, previous: dict = None):
+    """
+    파일 fingerprint (sha256, mtime, size). 파일이 없으면 None
+    - mtime/size가 이전 기록과 같으면 hash 재계산 생략
+    """
+    path = Path(path)
+    if not path.exists():
+        return None
+
+    st = path.stat()
+    if previous and previous.get("mtime") == st.st_mtime and previous.get("size") == st.st_size:
+        return dict(previous)
+
+    return {"sha256": file_hash(path), "mtime": st.st_mtime, "size": st.st_size}
+
+
+class Manifest:
+    """
+    run_all 증분 처리용 기록
+    - files : 원본 파일별 fingerprint
+    - stages: 단계별 (입력 fingerprint, 출력 파일, 파라미터)
+    단계의 입력 내용(hash/size)과 파라미터가 그대로이고 출력 파일이 남아 있으면 재실행하지 않는다.
+    """
+
+    def __init__(self, path=MANIFEST_FILE, force: bool = False):
+        self.path = Path(path)
+        self.force = force
+        self.data = self._read()
+        self._current = {}
+
+    def _read(self) -> dict:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            data = {}
+        data.setdefault("files", {})
+        data.setdefault("stages", {})
+        return data
+
+    def save(self) -> None:
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+
+    def fingerprint(self, path):
+        """
+        이번 실행 기준 fingerprint (프로세스 안에서는 파일당 1번만 계산)
+        """
+        key = _key(path)
+        if key not in self._current:
+            fp = file_fingerprint(path, self.data["files"].get(key))
+            self._current[key] = fp
+            if fp is None:
+                self.data["files"].pop(key, None)
+            else:
+                self.data["files"][key] = fp
+        return self._current[key]
+
+    def forget(self, paths) -> None:
+        """
+        이번 실행 중 다시 쓴 파일은 fingerprint를 새로 계산하도록 캐시에서 제거
+        """
+        for p in paths:
+            self._current.pop(_key(p), None)
+
+    def is_fresh(self, stage: str, inputs, outputs, params: dict = None) -> bool:
+        if self.force:
+            return False
+
+        entry = self.data["stages"].get(stage)
+        if entry is None or entry.get("params") != params:
+            return False
+
+        if any(not Path(o).exists() for o in outputs):
+            return False
+
+        recorded = entry.get("inputs", {})
+        for p in inputs:
+            cur = self.fingerprint(p)
+            prev = recorded.get(_key(p))
+            if cur is None or prev is None:
+                return False
+            if (cur["sha256"], cur["size"]) != (prev["sha256"], prev["size"]):
+                return False
+        return len(recorded) == len(inputs)
+
+    def record(self, stage: str, inputs, outputs, params: dict = None) -> None:
+        self.data["stages"][stage] = {
+            "inputs": {_key(p): self.fingerprint(p) for p in inputs},
+            "outputs": [_key(o) for o in outputs],
+            "params": params,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        self.save()
@@ -0,0 +1,504 @@
+# scripts/movement_journal.py
+"""
+재고 입출고 저널 (append-only)
+
+- 입출고 1건 기록 = 저널 파일 끝에 1줄 추가 + fsync → 기록 수와 무관하게 일정한 시간
+- 한 줄 = JSON + 탭 + CRC32. 쓰다가 끊긴 마지막 줄은 다음에 열 때 잘라냄 (crash recovery)
+- compact(): 저널을 snapshot.parquet 에 합치고 저널을 비움
+- export_excel(): 사람이 볼 재고입출고.xlsx 를 요청할 때만 생성
+- 재고입출고.xlsx 를 직원이 직접 고쳤으면(파일이 마지막 export 이후 바뀜)
+  그 엑셀을 새 기준으로 삼고, 아직 엑셀에 반영 안 된 저널 기록만 뒤에 붙임
+- balances(): stock_id 별 현재 잔량. append() 때 바뀐 품목만 더해서 갱신하고,
+  reconcile()(compact / run_all 재고 단계)에서 전체 기록 합계와 대조
+  잔량은 movement_normalize 로 정리된 기록(입고/출고 별칭, 단위 환산, 오류 행 제외)만 합산
+  → stock_movement 와 같은 규칙
+
+파일 (data_raw/stock_journal/)
+    movements.jsonl  : 마지막 compact 이후 기록
+    snapshot.parquet : compact 된 기록 (seq 컬럼 포함)
+    balances.json    : stock_id 별 잔량 + 반영된 마지막 seq
+    _meta.json       : 엑셀 fingerprint, 엑셀에 반영된 마지막 seq
+"""
+import json
+import os
+import sys
+import zlib
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from config import FILE_STOCK_MASTER, FILE_STOCK_TABLE, STOCK_JOURNAL_DIR
+from file_lock import file_lock
+from movement_normalize import normalize_movements
+from storage import read_table, write_table
+
+MOVEMENT_COLUMNS = [
+    "date", "stock_id", "stock_name", "type",
+    "quantity", "quantity_signed", "unit",
+    "related_order_id", "note",
+]
+
+JOURNAL_NAME = "movements.jsonl"
+SNAPSHOT_NAME = "snapshot.parquet"
+BALANCES_NAME = "balances.json"
+# 기본 위치의 저널 파일 (run_all 증분 판단용 입력)
+JOURNAL_FILES = [STOCK_JOURNAL_DIR / JOURNAL_NAME, STOCK_JOURNAL_DIR / SNAPSHOT_NAME]
+
+_master_cache = {}  # stock_master 경로 → ((mtime_ns, size), DataFrame)
+
+
+def _json_default(v):
+    if isinstance(v, (pd.Timestamp, datetime, date)):
+        return v.strftime("%Y-%m-%d")
+    if hasattr(v, "item"):  # numpy 숫자
+        return v.item()
+    return str(v)
+
+
+def _encode(record: dict) -> bytes:
+    body = json.dumps(record, ensure_ascii=False, default=_json_default, allow_nan=False)
+    return f"{body}\t{zlib.crc32(body.encode('utf-8')):08x}\n".encode("utf-8")
+
+
+def _clean_value(v):
+    # NaN → None (JSON에 NaN을 쓰지 않음)
+    return None if isinstance(v, float) and v != v else v
+
+
+def _dates_to_str(s: pd.Series) -> pd.Series:
+    """
+    엑셀에서 날짜 셀(Timestamp)과 문자열이 섞여 읽혀도 'YYYY-MM-DD' 문자열로 통일
+    """
+    return s.map(lambda v: _json_default(v) if isinstance(v, (pd.Timestamp, datetime, date)) else v)
+
+
+def _read_master(path):
+    """
+    단위 판단용 stock_master (파일이 바뀌었을 때만 다시 읽음, 없으면 None → stock_id 앞글자 기준)
+    """
+    if path is None or not Path(path).exists():
+        return None
+    st = Path(path).stat()
+    fp = (st.st_mtime_ns, st.st_size)
+    cached = _master_cache.get(str(path))
+    if cached and cached[0] == fp:
+        return cached[1]
+    master = read_table(path)
+    _master_cache[str(path)] = (fp, master)
+    return master
+
+
+class MovementJournal:
+    def __init__(self, excel_path=FILE_STOCK_TABLE, journal_dir=STOCK_JOURNAL_DIR, master_path=FILE_STOCK_MASTER):
+        self.excel_path = Path(excel_path)
+        self.dir = Path(journal_dir)
+        self.master_path = master_path
+        self.journal_path = self.dir / JOURNAL_NAME
+        self.snapshot_path = self.dir / SNAPSHOT_NAME
+        self.balances_path = self.dir / BALANCES_NAME
+        self.meta_path = self.dir / "_meta.json"
+        self.lock_path = self.dir / "_journal.lock"
+
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.journal_path.touch(exist_ok=True)
+        with self._lock():
+            self._sync_excel()
+            if not self.snapshot_path.exists():
+                self._write_snapshot(self._empty())
+            if not self.balances_path.exists():
+                self._rebuild_balances()
+
+    # ------------------------------
+    # 잠금 (여러 프로세스가 동시에 쓰지 않도록)
+    # ------------------------------
+    def _lock(self):
+        return file_lock(self.lock_path)
+
+    # ------------------------------
+    # meta / snapshot
+    # ------------------------------
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"excel_fingerprint": None, "excel_seq": 0}
+
+    def _write_meta(self, meta: dict) -> None:
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.meta_path)
+
+    def _excel_fingerprint(self):
+        if not self.excel_path.exists():
+            return None
+        st = self.excel_path.stat()
+        return [st.st_mtime_ns, st.st_size]
+
+    @staticmethod
+    def _empty() -> pd.DataFrame:
+        return pd.DataFrame(columns=["seq"] + MOVEMENT_COLUMNS)
+
+    def _read_snapshot(self) -> pd.DataFrame:
+        if not self.snapshot_path.exists():
+            return self._empty()
+        return pd.read_parquet(self.snapshot_path)
+
+    def _write_snapshot(self, df: pd.DataFrame) -> None:
+        tmp = self.snapshot_path.with_name("snapshot.tmp.parquet")
+        write_table(df, tmp)
+        os.replace(tmp, self.snapshot_path)
+
+    # ------------------------------
+    # 저널 읽기 / 복구
+    # ------------------------------
+    def _read_journal(self, repair: bool = False):
+        """
+        CRC가 맞는 줄까지 읽음 → (기록 list, 유효한 byte 길이)
+        repair=True 면 깨진 꼬리(쓰다 끊긴 줄)를 잘라냄 (잠금 안에서만)
+        """
+        with open(self.journal_path, "rb") as f:
+            data = f.read()
+
+        bodies, valid = [], 0
+        for line in data.splitlines(keepends=True):
+            if not line.endswith(b"\n"):
+                break
+            body, _, crc = line.rstrip(b"\n").rpartition(b"\t")
+            if not body or f"{zlib.crc32(body):08x}".encode() != crc:
+                break
+            bodies.append(body.decode("utf-8"))
+            valid += len(line)
+
+        if repair and valid < len(data):
+            with open(self.journal_path, "r+b") as f:
+                f.truncate(valid)
+                f.flush()
+                os.fsync(f.fileno())
+            print(f"[movement_journal] 저널 끝의 손상된 {len(data) - valid} byte 제거 (중단된 기록)")
+
+        records = json.loads("[" + ",".join(bodies) + "]") if bodies else []
+        return records, valid
+
+    def _frames(self, repair: bool = False):
+        snapshot = self._read_snapshot()
+        records, _ = self._read_journal(repair=repair)
+        last = int(snapshot["seq"].max()) if len(snapshot) else 0
+        # compact 도중 중단된 경우 snapshot 에 이미 들어간 기록은 건너뜀
+        journal = pd.DataFrame([r for r in records if r["seq"] > last], columns=["seq"] + MOVEMENT_COLUMNS)
+        return snapshot, journal
+
+    def _snapshot_last_seq(self) -> int:
+        """
+        snapshot 의 최대 seq (parquet 통계만 읽음 → 기록 수와 무관)
+        """
+        if not self.snapshot_path.exists():
+            return 0
+        meta = pq.read_metadata(self.snapshot_path)
+        if meta.num_rows == 0:
+            return 0
+        idx = meta.schema.names.index("seq")
+        stats = [meta.row_group(i).column(idx).statistics for i in range(meta.num_row_groups)]
+        if all(s is not None and s.has_min_max for s in stats):
+            return int(max(s.max for s in stats))
+        return int(pd.read_parquet(self.snapshot_path, columns=["seq"])["seq"].max())
+
+    def _journal_last_seq(self) -> int:
+        """
+        저널 마지막 줄의 seq (끝부분만 읽음, 꼬리가 깨져 있으면 복구 후 다시)
+        """
+        size = self.journal_path.stat().st_size
+        if size == 0:
+            return 0
+        with open(self.journal_path, "rb") as f:
+            f.seek(max(0, size - 65536))
+            chunk = f.read()
+        if chunk.endswith(b"\n"):
+            body, _, crc = chunk.rstrip(b"\n").rsplit(b"\n", 1)[-1].rpartition(b"\t")
+            if body and f"{zlib.crc32(body):08x}".encode() == crc:
+                return json.loads(body)["seq"]
+        records, _ = self._read_journal(repair=True)
+        return records[-1]["seq"] if records else 0
+
+    def _last_seq(self) -> int:
+        return max(self._snapshot_last_seq(), self._journal_last_seq())
+
+    # ------------------------------
+    # 직접 수정된 엑셀 반영
+    # ------------------------------
+    def _sync_excel(self) -> None:
+        meta = self._read_meta()
+        fp = self._excel_fingerprint()
+        if fp is None or fp == meta.get("excel_fingerprint"):
+            return
+
+        excel = read_table(self.excel_path)
+        if "date" in excel.columns:
+            excel["date"] = _dates_to_str(excel["date"])
+        excel.insert(0, "seq", range(1, len(excel) + 1))
+
+        # 엑셀에 아직 없는 저널 기록 (마지막 export 이후 추가분)
+        snapshot, journal = self._frames(repair=True)
+        pending = pd.concat([snapshot, journal], ignore_index=True)
+        pending = pending[pending["seq"] > meta.get("excel_seq", 0)].copy()
+        pending["seq"] = range(len(excel) + 1, len(excel) + len(pending) + 1)
+
+        merged = pd.concat([excel, pending], ignore_index=True) if len(pending) else excel
+        self._write_snapshot(merged)
+        self._truncate_journal()
+        self._write_meta({"excel_fingerprint": fp, "excel_seq": len(excel)})
+        self._rebuild_balances()
+        if meta.get("excel_fingerprint") is not None:
+            print(f"[movement_journal] 직접 수정된 엑셀 반영: {len(excel)}행 + 미반영 기록 {len(pending)}건")
+
+    def _all_movements(self) -> pd.DataFrame:
+        """
+        snapshot + 저널 전체 (seq 순, 기록된 값 그대로) - 잠금 안에서 호출
+        """
+        snapshot, journal = self._frames(repair=True)
+        frames = [df for df in (snapshot, journal) if len(df)]
+        df = pd.concat(frames, ignore_index=True) if frames else self._empty()
+        df = df.sort_values("seq", kind="stable").reset_index(drop=True)
+        for c in MOVEMENT_COLUMNS:
+            if c not in df.columns:
+                df[c] = None
+        return df
+
+    # ------------------------------
+    # 잔량 (balances.json)
+    # ------------------------------
+    def _read_balances(self):
+        try:
+            with open(self.balances_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_balances(self, balances: dict, applied_seq: int) -> None:
+        tmp = self.balances_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"applied_seq": applied_seq, "balances": balances}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.balances_path)
+
+    def _sum_balances(self, df: pd.DataFrame) -> dict:
+        """
+        stock_id 별 합계 (normalize_movements 를 통과한 기록만, 정리된 quantity_signed 기준)
+        """
+        if df.empty:
+            return {}
+        clean, _ = normalize_movements(df, _read_master(self.master_path))
+        sid = clean["stock_id"].astype("string").str.strip()
+        valid = clean[sid.notna() & (sid != "")]
+        sums = valid.groupby(sid[valid.index])["quantity_signed"].sum()
+        return {str(k): float(v) for k, v in sums.items()}
+
+    def _rebuild_balances(self, df: pd.DataFrame = None) -> dict:
+        df = self._all_movements() if df is None else df
+        balances = self._sum_balances(df)
+        self._write_balances(balances, int(df["seq"].max()) if len(df) else 0)
+        return balances
+
+    def _apply_balances(self, rows, seqs) -> None:
+        """
+        방금 추가한 기록만 잔량에 반영 (바뀐 stock_id 만)
+        잔량 파일이 이전 seq 까지 반영된 상태가 아니면(중간에 끊긴 적 있음) 전체 재계산
+        """
+        state = self._read_balances()
+        if state is None or state["applied_seq"] != seqs[0] - 1:
+            self._rebuild_balances()
+            return
+
+        balances = state["balances"]
+        for stock_id, delta in self._sum_balances(pd.DataFrame(rows)).items():
+            balances[stock_id] = balances.get(stock_id, 0.0) + delta
+        self._write_balances(balances, seqs[-1])
+
+    def _truncate_journal(self) -> None:
+        with open(self.journal_path, "r+b") as f:
+            f.truncate(0)
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ------------------------------
+    # 공개 API
+    # ------------------------------
+    def _append_locked(self, rows: list) -> list:
+        seq = self._last_seq()
+        payload, seqs = [], []
+        for row in rows:
+            seq += 1
+            record = {"seq": seq}
+            record.update({k: _clean_value(v) for k, v in row.items()})
+            payload.append(_encode(record))
+            seqs.append(seq)
+
+        with open(self.journal_path, "ab") as f:
+            f.write(b"".join(payload))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._apply_balances(rows, seqs)
+        return seqs
+
+    def append(self, rows) -> list:
+        """
+        입출고 기록 추가 (dict 1개 또는 여러 개) → 부여된 seq list
+        여러 건도 write 1번 + fsync 1번
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return []
+
+        with self._lock():
+            self._sync_excel()
+            return self._append_locked(rows)
+
+    def append_if_absent(self, rows, key: str = "related_order_id", movement_type: str = "OUT"):
+        """
+        movement_type 기록 중 key(주문번호)가 아직 없는 행만 추가 → (seq list, 건너뛴 key set)
+        기존 기록 확인과 추가를 같은 잠금 안에서 하므로 동시에 실행된 배치가 같은 주문을 두 번 기록하지 않음
+        (rows 안에서 같은 key 가 여러 번 나오면 첫 행만)
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not rows:
+            return [], set()
+
+        with self._lock():
+            self._sync_excel()
+            seen = self._related_order_ids(movement_type) if key == "related_order_id" else set()
+            todo, skipped = [], set()
+            for row in rows:
+                value = row.get(key)
+                value = "" if value is None else str(_clean_value(value) or "").strip()
+                if value and str(row.get("type", "")).strip() == movement_type:
+                    if value in seen:
+                        skipped.add(value)
+                        continue
+                    seen.add(value)
+                todo.append(row)
+            seqs = self._append_locked(todo) if todo else []
+        return seqs, skipped
+
+    def load(self) -> pd.DataFrame:
+        """
+        전체 입출고 기록 (snapshot + 저널), 기존 load_movement() 와 같은 컬럼
+        """
+        with self._lock():
+            self._sync_excel()
+            df = self._all_movements()
+        return df.drop(columns="seq")
+
+    def compact(self) -> int:
+        """
+        저널 → snapshot.parquet 로 합치고 저널 비움 → 합친 기록 수
+        (snapshot 교체 후 저널 비우기 전에 중단돼도 seq 로 중복 제거)
+        """
+        with self._lock():
+            self._sync_excel()
+            snapshot, journal = self._frames(repair=True)
+            if journal.empty:
+                return 0
+            self._write_snapshot(pd.concat([snapshot, journal], ignore_index=True))
+            self._truncate_journal()
+            self._reconcile()
+        return len(journal)
+
+    def _related_order_ids(self, movement_type: str) -> set:
+        # 잠금 안에서 호출 - snapshot 은 두 컬럼만 읽음
+        cols = ["type", "related_order_id"]
+        names = pq.read_schema(self.snapshot_path).names
+        if all(c in names for c in cols):
+            snapshot = pd.read_parquet(self.snapshot_path, columns=["seq"] + cols)
+        else:
+            snapshot = pd.DataFrame(columns=["seq"] + cols)
+        records, _ = self._read_journal(repair=True)
+
+        last = int(snapshot["seq"].max()) if len(snapshot) else 0
+        journal = pd.DataFrame([r for r in records if r["seq"] > last], columns=["seq"] + cols)
+        df = pd.concat([snapshot, journal], ignore_index=True)
+        ids = df.loc[(df["type"] == movement_type) & df["related_order_id"].notna(), "related_order_id"]
+        return {s for s in ids.astype(str).str.strip() if s}
+
+    def related_order_ids(self, movement_type: str = "OUT") -> set:
+        """
+        이미 기록된 related_order_id (movement_type 기록만)
+        """
+        with self._lock():
+            self._sync_excel()
+            return self._related_order_ids(movement_type)
+
+    def balances(self) -> pd.DataFrame:
+        """
+        stock_id 별 현재 잔량 (기록 전체를 읽지 않고 balances.json 만)
+        """
+        with self._lock():
+            self._sync_excel()
+            state = self._read_balances()
+            if state is None or state["applied_seq"] != self._last_seq():
+                balances = self._rebuild_balances()
+            else:
+                balances = state["balances"]
+        return pd.DataFrame(
+            sorted(balances.items()), columns=["stock_id", "balance"]
+        )
+
+    def _reconcile(self) -> pd.DataFrame:
+        state = self._read_balances() or {"balances": {}}
+        df = self._all_movements()
+        expected = self._sum_balances(df)
+
+        stored = state["balances"]
+        diff = pd.DataFrame(
+            [(k, stored.get(k), expected.get(k)) for k in sorted(set(stored) | set(expected))],
+            columns=["stock_id", "stored", "expected"],
+        )
+        mismatch = diff[~np.isclose(diff["stored"].astype(float), diff["expected"].astype(float), equal_nan=False)]
+        if len(mismatch):
+            print(f"[movement_journal] 잔량 불일치 {len(mismatch)}건 → 전체 기록 기준으로 교정")
+        self._rebuild_balances(df)
+        return mismatch.reset_index(drop=True)
+
+    def reconcile(self) -> pd.DataFrame:
+        """
+        잔량을 전체 기록 합계와 대조 후 교정 → 불일치했던 stock_id (stored / expected)
+        """
+        with self._lock():
+            self._sync_excel()
+            return self._reconcile()
+
+    def export_excel(self) -> Path:
+        """
+        재고입출고.xlsx 생성 (사람이 볼 때만) - compact 후 전체를 한 번 씀
+        """
+        self.compact()
+        with self._lock():
+            self._sync_excel()
+            df = self._read_snapshot()
+            tmp = self.excel_path.with_name(self.excel_path.stem + ".tmp.xlsx")
+            df.drop(columns="seq").to_excel(tmp, index=False)
+            os.replace(tmp, self.excel_path)
+            self._write_meta({
+                "excel_fingerprint": self._excel_fingerprint(),
+                "excel_seq": int(df["seq"].max()) if len(df) else 0,
+            })
+        print(f"[movement_journal] 엑셀 생성: {self.excel_path} ({len(df)}행)")
+        return self.excel_path
+
+
+if __name__ == "__main__":
+    # python movement_journal.py export   → 재고입출고.xlsx 갱신
+    # python movement_journal.py compact  → 저널을 snapshot 에 합침 (+ 잔량 대조)
+    # python movement_journal.py balances → 현재 잔량 출력
+    command = sys.argv[1] if len(sys.argv) > 1 else "export"
+    journal = MovementJournal()
+    if command == "compact":
+        print(f"[movement_journal] compact: {journal.compact()}건")
+    elif command == "balances":
+        print(journal.balances().to_string(index=False))
+    else:
+        journal.export_excel()
@@ -0,0 +1,152 @@
+# scripts/movement_normalize.py
+"""
+재고 입출고 기록 정리 (transform_stock / stock_register 공통)
+
+컬럼 단위로 한 번에 처리 (행별 apply 없음)
+- type     : 공백·대소문자 정리, '입고'/'출고' → IN/OUT. 그 외 값은 제외
+- quantity : 숫자 변환 후 절댓값 (부호는 type 으로만 결정)
+- unit     : 표기 통일(미터/M/meter → m, 개/pcs → ea, cm·yd 는 m 로 환산),
+             비어 있으면 자재 종류의 표준 단위(UNIT_MAP), 표준 단위와 다르면 제외
+- date     : datetime 변환, 읽을 수 없으면 제외
+- quantity_signed : IN → +, OUT → -
+
+반환: (정리된 기록, 제외된 기록 + reject_reason)
+"""
+import numpy as np
+import pandas as pd
+
+MOVEMENT_SIGN = {"IN": 1, "OUT": -1}
+TYPE_ALIASES = {"입고": "IN", "출고": "OUT"}
+
+# 단위 표준
+UNIT_MAP = {
+    "fabric": "m",
+    "lining": "m",
+    "interlining": "m",
+    "button": "ea",
+    "zipper": "ea",
+    "other": "ea",
+}
+
+# stock_id 앞글자 → 자재 종류 (generate_stock_id 의 prefix)
+CATEGORY_BY_PREFIX = {
+    "F": "fabric",
+    "L": "lining",
+    "I": "interlining",
+    "B": "button",
+    "Z": "zipper",
+}
+
+# 단위 표기 → (표준 단위, 환산 배수)
+UNIT_ALIASES = {
+    "m": ("m", 1.0),
+    "meter": ("m", 1.0),
+    "미터": ("m", 1.0),
+    "cm": ("m", 0.01),
+    "yd": ("m", 0.9144),
+    "야드": ("m", 0.9144),
+    "ea": ("ea", 1.0),
+    "개": ("ea", 1.0),
+    "pcs": ("ea", 1.0),
+    "pc": ("ea", 1.0),
+}
+
+REJECT_REASONS = {
+    "type": "입출고 구분(IN/OUT) 오류",
+    "quantity": "수량 없음",
+    "date": "날짜 오류",
+    "unit": "알 수 없는 단위",
+    "unit_mismatch": "자재 표준 단위와 다름",
+}
+
+
+def expected_units(stock_id: pd.Series, master_df: pd.DataFrame = None) -> pd.Series:
+    """
+    stock_id → 표준 단위 (stock_master 의 category 우선, 없으면 stock_id 앞글자)
+    """
+    sid = stock_id.astype("string").str.strip()
+    category = sid.str[:1].map(CATEGORY_BY_PREFIX)
+    if master_df is not None and len(master_df):
+        master = master_df.dropna(subset=["stock_id"]).drop_duplicates(subset=["stock_id"], keep="last")
+        by_id = pd.Series(master["category"].to_numpy(), index=master["stock_id"].astype(str).str.strip())
+        category = sid.map(by_id).fillna(category)
+    return category.fillna("other").map(UNIT_MAP)
+
+
+def signed_quantities(quantity: pd.Series, movement_type: pd.Series) -> pd.Series:
+    """
+    IN → +|수량|, OUT → -|수량| (그 외 type 은 NaN)
+    """
+    qty = pd.to_numeric(quantity, errors="coerce").abs()
+    return qty * movement_type.map(MOVEMENT_SIGN)
+
+
+def normalize_movements(df: pd.DataFrame, master_df: pd.DataFrame = None):
+    """
+    입출고 기록 → (정리된 기록, 제외된 기록)
+    제외된 기록은 원래 값 그대로 두고 reject_reason 컬럼만 추가
+    stock_id·type·quantity 가 모두 빈 행(엑셀 템플릿의 구분용 빈 줄)은 보고 없이 버림
+    """
+    def column(name):
+        return df[name] if name in df.columns else pd.Series(np.nan, index=df.index)
+
+    def blank(s):
+        return s.isna() | (s.astype("string").str.strip() == "").fillna(True)
+
+    # type
+    mtype = column("type").astype("string").str.strip()
+    mtype = mtype.replace(TYPE_ALIASES).str.upper().mask(mtype == "")
+    bad_type = ~mtype.isin(list(MOVEMENT_SIGN)).fillna(False).to_numpy(dtype=bool)
+
+    # quantity (quantity 가 비어 있으면 quantity_signed 의 절댓값)
+    qty = pd.to_numeric(column("quantity"), errors="coerce")
+    qty = qty.fillna(pd.to_numeric(column("quantity_signed"), errors="coerce")).abs()
+    bad_qty = qty.isna().to_numpy()
+
+    empty = (bad_qty & mtype.isna().to_numpy() & blank(column("stock_id")).to_numpy())
+
+    # date
+    date = column("date")
+    if not pd.api.types.is_datetime64_any_dtype(date):
+        date = pd.to_datetime(date, errors="coerce", format="mixed")
+    bad_date = date.isna().to_numpy()
+
+    # unit
+    expected = expected_units(column("stock_id"), master_df)
+    raw_unit = column("unit").astype("string").str.strip().str.lower()
+    raw_unit = raw_unit.mask(raw_unit == "")
+    unit = raw_unit.map({k: v[0] for k, v in UNIT_ALIASES.items()})
+    factor = raw_unit.map({k: v[1] for k, v in UNIT_ALIASES.items()})
+    bad_unit = (raw_unit.notna() & unit.isna()).to_numpy(dtype=bool)
+    unit = unit.fillna(expected)
+    factor = factor.fillna(1.0)
+    mismatch = ((unit != expected) & expected.notna()).fillna(False).to_numpy(dtype=bool) & ~bad_unit
+
+    reason = np.select(
+        [bad_type, bad_qty, bad_date, bad_unit, mismatch],
+        [REJECT_REASONS[k] for k in ("type", "quantity", "date", "unit", "unit_mismatch")],
+        default="",
+    ) if len(df) else np.array([], dtype=object)
+    rejected_mask = (reason != "") & ~empty
+
+    out = df.copy()
+    out["type"] = mtype
+    out["date"] = date
+    out["quantity"] = qty * factor
+    out["unit"] = unit
+    out["quantity_signed"] = signed_quantities(out["quantity"], mtype)
+
+    clean = out[~rejected_mask & ~empty]
+    rejected = df[rejected_mask].assign(reject_reason=reason[rejected_mask])
+    return clean, rejected
+
+
+def report_rejected(rejected: pd.DataFrame, source: str = "movement") -> None:
+    """
+    제외된 기록 건수를 사유별로 출력
+    """
+    if rejected.empty:
+        return
+    counts = rejected["reject_reason"].value_counts()
+    detail = ", ".join(f"{reason} {count}건" for reason, count in counts.items())
+    print(f"[{source}] 입출고 기록 {len(rejected)}건 제외: {detail}")
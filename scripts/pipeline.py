@@ -0,0 +1,178 @@
+# scripts/pipeline.py
+"""
+run_all 단계 실행기 (작은 DAG 스케줄러)
+
+- 각 단계는 입력 파일(inputs)과 출력 파일(outputs)을 선언
+- 다른 단계의 출력 파일을 입력으로 쓰면 그 단계 뒤에 실행 (의존관계 자동 계산)
+- 서로 독립인 단계(주문 ↔ 재고)는 프로세스 풀에서 동시에 실행
+- 각 단계는 한 번만 실행되고, manifest 기준 입력이 그대로면 건너뜀
+- 단계별 소요 시간/최대 메모리를 LOG_DIR 실행 로그에 기록
+"""
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+from pathlib import Path
+
+try:
+    import resource  # Windows에는 없음 → tracemalloc으로 대체
+except ImportError:
+    resource = None
+
+from config import LOG_DIR
+
+
+class Stage:
+    def __init__(self, name: str, func, inputs=(), outputs=(), params: dict = None):
+        """
+        func   : 인자 없이 호출 가능한 모듈 최상위 함수 (functools.partial 가능, 프로세스 간 pickle 필요)
+        inputs : 읽는 파일 (원본 + 다른 단계 출력)
+        outputs: 쓰는 파일
+        """
+        self.name = name
+        self.func = func
+        self.inputs = [Path(p) for p in inputs]
+        self.outputs = [Path(p) for p in outputs]
+        self.params = params
+
+
+def resolve_dependencies(stages) -> dict:
+    """
+    {단계명: 먼저 끝나야 하는 단계명 set}
+    """
+    producer = {}
+    for s in stages:
+        for o in s.outputs:
+            if o in producer:
+                raise ValueError(f"{o} 를 두 단계에서 생성합니다: {producer[o]}, {s.name}")
+            producer[o] = s.name
+
+    deps = {s.name: {producer[p] for p in s.inputs if p in producer} - {s.name} for s in stages}
+
+    # 순환 확인
+    done = set()
+    remaining = dict(deps)
+    while remaining:
+        ready = [n for n, d in remaining.items() if d <= done]
+        if not ready:
+            raise ValueError(f"단계 의존관계에 순환이 있습니다: {sorted(remaining)}")
+        for n in ready:
+            done.add(n)
+            remaining.pop(n)
+    return deps
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 byte 단위
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def execute_stage(func):
+    """
+    단계 1개 실행 → (소요 시간 초, 최대 메모리 MB)
+    워커 프로세스는 단계마다 새로 뜨므로(max_tasks_per_child=1) RSS 최대값이 곧 단계 최대 메모리.
+    (max_workers=1 순차 실행이면 그때까지의 프로세스 최대값)
+    resource 모듈이 없으면(Windows) tracemalloc 최대값(파이썬/NumPy 할당 기준) 사용.
+    """
+    use_tracemalloc = resource is None
+    if use_tracemalloc:
+        tracemalloc.start()
+
+    t0 = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - t0
+
+    if use_tracemalloc:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peak_mb = peak / 1024 / 1024
+    else:
+        peak_mb = _peak_rss_mb()
+    return elapsed, peak_mb
+
+
+def run_stages(stages, manifest=None, max_workers: int = None, log_path=None) -> dict:
+    """
+    stages 를 의존관계 순서대로 실행
+    - max_workers=1 이면 프로세스 풀 없이 현재 프로세스에서 순서대로 실행
+    - manifest 가 있으면 입력이 그대로인 단계는 건너뛰고, 실행한 단계는 기록
+    반환: {단계명: {"status": "done"/"skipped", "seconds": .., "peak_mb": ..}}
+    """
+    by_name = {s.name: s for s in stages}
+    deps = resolve_dependencies(stages)
+    log_path = Path(log_path or LOG_DIR / f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log")
+
+    results = {}
+    reran = set()
+    running = {}
+
+    def _log(line):
+        print(line)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def _ready():
+        return [
+            n for n in by_name
+            if n not in results and n not in running.values() and deps[n] <= set(results)
+        ]
+
+    def _is_fresh(stage):
+        if manifest is None or deps[stage.name] & reran:
+            return False
+        return manifest.is_fresh(stage.name, stage.inputs, stage.outputs, stage.params)
+
+    def _finish(stage, elapsed, peak_mb):
+        reran.add(stage.name)
+        results[stage.name] = {"status": "done", "seconds": elapsed, "peak_mb": peak_mb}
+        if manifest is not None:
+            # 입력도 단계 안에서 생성/갱신될 수 있음 (재고 저널 등) → 실행 후 기준으로 기록
+            manifest.forget(stage.inputs + stage.outputs)
+            manifest.record(stage.name, stage.inputs, stage.outputs, stage.params)
+        mem = f"{peak_mb:.1f} MB" if peak_mb is not None else "-"
+        _log(f"[pipeline] {stage.name:<30} done     {elapsed:8.2f}s  peak {mem}")
+
+    def _skip(stage):
+        results[stage.name] = {"status": "skipped", "seconds": 0.0, "peak_mb": None}
+        _log(f"[pipeline] {stage.name:<30} skipped  (입력 변경 없음)")
+
+    _log(f"[pipeline] 시작 {datetime.now()} | 단계 {len(stages)}개, workers={max_workers or 'auto'}")
+
+    if max_workers == 1:
+        while len(results) < len(by_name):
+            for name in _ready():
+                stage = by_name[name]
+                if _is_fresh(stage):
+                    _skip(stage)
+                else:
+                    _finish(stage, *execute_stage(stage.func))
+        return results
+
+    with ProcessPoolExecutor(max_workers=max_workers, max_tasks_per_child=1) as pool:
+        try:
+            while len(results) < len(by_name):
+                for name in _ready():
+                    stage = by_name[name]
+                    if _is_fresh(stage):
+                        _skip(stage)
+                    else:
+                        running[pool.submit(execute_stage, stage.func)] = name
+
+                if not running:
+                    continue
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    stage = by_name[running.pop(fut)]
+                    _finish(stage, *fut.result())
+        except Exception:
+            # 실패 시 새 단계는 시작하지 않고, 이미 돌고 있는 단계만 마무리
+            for fut in running:
+                fut.cancel()
+            raise
+
+    return results
@@ -0,0 +1,160 @@
+# scripts/raw_cache.py
+"""
+원본 엑셀 파싱 결과 캐시 (load_data 용)
+
+- 원본 파일 경로 + 읽기 옵션(header=None 등)마다 파싱한 DataFrame 을 pickle 로 저장
+  (납품달력처럼 한 컬럼에 날짜/숫자/문자열이 섞인 시트도 타입 그대로 보존 → parquet 대신 pickle)
+- 원본 파일의 mtime·크기가 캐시를 만들 때와 같으면 엑셀을 다시 열지 않음
+- cached_table() 은 LazyFrame 을 돌려주고, 실제 로드는 .get() 할 때 1번 (같은 프로세스에서는 메모리 재사용)
+- invalidate(path) / invalidate() 로 명시적으로 비움
+
+파일 (data_clean/raw_cache/)
+    <원본 이름>-<키 해시>.pkl  : DataFrame
+    <원본 이름>-<키 해시>.json : 원본 경로·mtime·크기·읽기 옵션 (pkl 다음에 기록 → 이 파일이 있어야 유효)
+
+    python raw_cache.py            # 캐시 목록
+    python raw_cache.py clear      # 전체 비우기
+"""
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pandas as pd
+from config import RAW_CACHE_DIR
+from storage import read_table
+
+_memory = {}  # cache key → LazyFrame (같은 프로세스 안 재사용)
+
+
+def _source_stat(path: Path) -> dict:
+    st = path.stat()
+    return {"path": str(path.resolve()), "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+class LazyFrame:
+    """
+    원본 파일 1개 + 읽기 옵션에 대한 지연 로드 DataFrame
+    """
+
+    def __init__(self, path, **read_kwargs):
+        self.path = Path(path)
+        self.read_kwargs = read_kwargs
+        options = json.dumps(read_kwargs, sort_keys=True, default=str)
+        digest = hashlib.sha1(f"{self.path.resolve()}|{options}".encode("utf-8")).hexdigest()[:12]
+        self.options = options
+        self.pickle_path = RAW_CACHE_DIR / f"{self.path.stem}-{digest}.pkl"
+        self.meta_path = self.pickle_path.with_suffix(".json")
+        self._df = None
+        self._stat = None
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self) -> bool:
+        """
+        디스크 캐시가 현재 원본 파일과 같은지 (mtime·크기·읽기 옵션)
+        """
+        meta = self._read_meta()
+        return (
+            meta is not None
+            and self.pickle_path.exists()
+            and meta.get("source") == _source_stat(self.path)
+            and meta.get("options") == self.options
+        )
+
+    def get(self) -> pd.DataFrame:
+        """
+        메모리 → 디스크 캐시 → 엑셀 순서로 로드
+        반환값을 고쳐도 캐시가 바뀌지 않도록 얕은 복사본 반환 (Copy-on-Write)
+        """
+        stat = _source_stat(self.path)
+        if self._df is None or self._stat != stat:
+            self._df = self._read_pickle() if self.is_fresh() else None
+            if self._df is None:
+                self._df = read_table(self.path, **self.read_kwargs)
+                self._write(stat)
+            self._stat = stat
+        return self._df.copy(deep=False)
+
+    def _read_pickle(self):
+        # pandas 버전이 바뀌어 못 읽는 캐시는 다시 만듦
+        try:
+            return pd.read_pickle(self.pickle_path)
+        except Exception as e:
+            print(f"[raw_cache] 캐시를 읽지 못해 원본을 다시 읽습니다 ({self.pickle_path.name}): {e}")
+            return None
+
+    def _write(self, stat: dict) -> None:
+        RAW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp = self.pickle_path.with_suffix(".pkl.tmp")
+        self._df.to_pickle(tmp)
+        os.replace(tmp, self.pickle_path)
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"source": stat, "options": self.options}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.meta_path)
+
+    def invalidate(self) -> None:
+        self._df = None
+        self._stat = None
+        for p in (self.meta_path, self.pickle_path):
+            if p.exists():
+                os.remove(p)
+
+
+def cached_table(path, **read_kwargs) -> LazyFrame:
+    """
+    read_table(path, **read_kwargs) 의 캐시 버전 (파일을 읽는 시점은 .get() 호출 때)
+    """
+    lazy = LazyFrame(path, **read_kwargs)
+    return _memory.setdefault(lazy.pickle_path.name, lazy)
+
+
+def invalidate(path=None) -> int:
+    """
+    path 원본의 캐시(모든 읽기 옵션)를 삭제, path 가 없으면 전체 삭제 → 삭제한 캐시 수
+    """
+    removed = 0
+    if path is None:
+        for lazy in _memory.values():
+            lazy._df = None
+        _memory.clear()
+        pattern = "*.json"
+    else:
+        path = Path(path)
+        for key in [k for k, v in _memory.items() if v.path.resolve() == path.resolve()]:
+            _memory.pop(key)._df = None
+        pattern = f"{path.stem}-*.json"
+
+    for meta_path in RAW_CACHE_DIR.glob(pattern):
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                source = json.load(f)["source"]["path"]
+        except (OSError, ValueError, KeyError):
+            source = None
+        if path is not None and source != str(path.resolve()):
+            continue
+        for p in (meta_path, meta_path.with_suffix(".pkl")):
+            if p.exists():
+                os.remove(p)
+        removed += 1
+    return removed
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["clear"]:
+        targets = sys.argv[2:] or [None]
+        count = sum(invalidate(t) for t in targets)
+        print(f"[raw_cache] 캐시 {count}개 삭제")
+    else:
+        for meta_path in sorted(RAW_CACHE_DIR.glob("*.json")):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            size = meta_path.with_suffix(".pkl").stat().st_size / 1024 if meta_path.with_suffix(".pkl").exists() else 0
+            print(f"{Path(meta['source']['path']).name:<30} {meta['options']:<20} {size:10.1f} KB")
@@ -0,0 +1,127 @@
+# scripts/report_writer.py
+"""
+분석 보고서(.xlsx) 공통 저장 모듈
+
+- openpyxl write-only 모드: 행을 시트 임시파일로 바로 흘려 보내므로
+  pd.ExcelWriter(openpyxl) 처럼 셀 객체 전체를 메모리에 들고 있지 않음
+- 데이터프레임은 CHUNK_ROWS 행씩 나눠서 변환·기록
+- 원본 덤프 시트(raw=True)는 config.REPORT_RAW_SHEETS 가 False 면 건너뜀
+- 엑셀 한 시트 최대 행 수를 넘으면 '시트명_2', '시트명_3' ... 으로 이어서 기록
+- 시트별 행 수 / 기록 시간 / 바이트(압축 전·후)를 출력하고 LOG_DIR/report_sheets.log 에 추가
+
+    with ReportWriter(out_path) as report:
+        report.sheet("orders_raw", df, raw=True)
+        report.sheet("month_summary", month_summary)
+"""
+import os
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+from openpyxl import Workbook
+from config import LOG_DIR, REPORT_RAW_SHEETS
+
+CHUNK_ROWS = 10_000
+MAX_SHEET_ROWS = 1_048_576  # 엑셀 한 시트 최대 행 수 (머리글 포함)
+SHEET_LOG = LOG_DIR / "report_sheets.log"
+
+
+def _excel_values(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    openpyxl 이 받을 수 있는 값으로 변환 (결측 → None, Period·기타 객체 → 문자열)
+    숫자/날짜/문자열 컬럼은 그대로, 타입이 섞인 object 컬럼만 값별로 확인
+    """
+    out = chunk.copy()
+    for c in out.columns:
+        s = out[c]
+        if isinstance(s.dtype, pd.PeriodDtype):
+            out[c] = s.astype(str).where(s.notna())
+        elif isinstance(s.dtype, pd.DatetimeTZDtype):
+            out[c] = s.dt.tz_localize(None)
+        elif s.dtype == object:
+            odd = s.map(lambda v: not isinstance(v, (str, int, float, bool, datetime)) and pd.notna(v))
+            if odd.any():
+                out[c] = s.where(~odd, s[odd].astype(str))
+    return out.astype(object).where(out.notna(), None)
+
+
+class ReportWriter:
+    def __init__(self, path, include_raw: bool = REPORT_RAW_SHEETS, chunk_rows: int = CHUNK_ROWS):
+        self.path = Path(path)
+        self.include_raw = include_raw
+        self.chunk_rows = chunk_rows
+        self.wb = Workbook(write_only=True)
+        self.stats = []  # 시트별 {sheet, rows, seconds, bytes, compressed_bytes}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        return False
+
+    def sheet(self, name: str, df: pd.DataFrame, raw: bool = False) -> None:
+        """
+        df 를 name 시트로 기록 (raw=True 는 원본 덤프 시트 → include_raw=False 면 건너뜀)
+        """
+        if raw and not self.include_raw:
+            print(f"[report] {self.path.name} / {name}: 원본 시트 생략")
+            return
+
+        header = [str(c) for c in df.columns]
+        per_sheet = MAX_SHEET_ROWS - 1
+        parts = max(1, -(-len(df) // per_sheet))
+        for part in range(parts):
+            title = name if part == 0 else f"{name}_{part + 1}"
+            t0 = time.perf_counter()
+            ws = self.wb.create_sheet(title=title[:31])
+            ws.append(header)
+            block = df.iloc[part * per_sheet:(part + 1) * per_sheet]
+            for start in range(0, len(block), self.chunk_rows):
+                chunk = _excel_values(block.iloc[start:start + self.chunk_rows])
+                for row in chunk.itertuples(index=False, name=None):
+                    ws.append(row)
+            self.stats.append({"sheet": ws.title, "rows": len(block), "seconds": time.perf_counter() - t0})
+
+    def close(self) -> list:
+        """
+        통합문서 저장 (임시파일 → 교체) 후 시트별 크기를 채워서 출력·기록
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"~{self.path.stem}.tmp.xlsx")
+        if not self.wb.worksheets:
+            # 시트가 하나도 없으면 엑셀이 열지 못하므로 빈 시트 1개
+            self.wb.create_sheet("empty")
+        t0 = time.perf_counter()
+        self.wb.save(tmp)
+        save_seconds = time.perf_counter() - t0
+        os.replace(tmp, self.path)
+
+        with zipfile.ZipFile(self.path) as zf:
+            infos = {i.filename: i for i in zf.infolist()}
+        for n, stat in enumerate(self.stats, start=1):
+            info = infos.get(f"xl/worksheets/sheet{n}.xml")
+            stat["bytes"] = info.file_size if info else None
+            stat["compressed_bytes"] = info.compress_size if info else None
+
+        self._log(save_seconds)
+        return self.stats
+
+    def _log(self, save_seconds: float) -> None:
+        now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        lines = []
+        for s in self.stats:
+            print(
+                f"[report] {self.path.name} / {s['sheet']:<22} {s['rows']:>9}행  {s['seconds']:7.2f}s  "
+                f"{(s['bytes'] or 0) / 1024:10.1f} KB (압축 {(s['compressed_bytes'] or 0) / 1024:.1f} KB)"
+            )
+            lines.append(
+                f"{now}\t{self.path.name}\t{s['sheet']}\t{s['rows']}\t{s['seconds']:.3f}\t"
+                f"{s['bytes']}\t{s['compressed_bytes']}\n"
+            )
+        lines.append(f"{now}\t{self.path.name}\t(save)\t\t{save_seconds:.3f}\t{self.path.stat().st_size}\t\n")
+        with open(SHEET_LOG, "a", encoding="utf-8") as f:
+            f.writelines(lines)
@@ -1,47 +1,97 @@
 # scripts/run_all.py
+import argparse
 import traceback
 from datetime import datetime
+from functools import partial
 
-from config import LOG_DIR, TARGET_YEAR
-from load_data import load_all
-from transform_orders import transform_delivery_to_orders
-from transform_stock import transform_stock_table
-from analysis_production import analyze_production
-from analysis_stock import analyze_stock
-from analysis_crm import analyze_crm
+from config import LOG_DIR, TARGET_YEAR, FILE_CUSTOMER, FILE_PROD_CAL
+from load_data import (
+    invalidate_raw_cache, load_customers, load_delivery_calendar, load_orders, load_stock_movement,
+)
+from manifest import Manifest
+from movement_journal import MovementJournal, JOURNAL_FILES as STOCK_JOURNAL_FILES
+from pipeline import Stage, run_stages
+from transform_orders import transform_delivery_to_orders, clean_output_paths
+from stock_register import MASTER as FILE_STOCK_MASTER
+from transform_stock import transform_stock_table, FILE_STOCK_TABLE, FILE_STOCK_MOVEMENT, FILE_STOCK_REJECTED
+from analysis_production import analyze_production, report_path as production_report_path
+from analysis_stock import analyze_stock, REPORT_FILE as STOCK_REPORT_FILE
+from analysis_crm import analyze_crm, report_path as crm_report_path
 
 
-def main():
-    start_time = datetime.now()
-    print(f"=== 양복점 데이터 자동화 시작: {start_time} ===")
+# ----------------------------------------------------------
+# 단계 함수 (워커 프로세스에서 실행 → 입력은 파일에서 직접 로드)
+# ----------------------------------------------------------
+def stage_orders(year: int):
+    # 납품달력 → 주문/제작 데이터 변환
+    transform_delivery_to_orders(load_delivery_calendar(), year=year)
+    print("[run_all] 납품달력 정규화 및 주문 테이블 생성 완료")
 
-    try:
-        # 1) 데이터 로드
-        customers, delivery_raw, stock_raw = load_all()
-        print("[run_all] 원본 데이터 로드 완료")
 
-        # 2) 납품달력 → 주문/제작 데이터 변환
-        delivery_flat_with_id, orders = transform_delivery_to_orders(
-            delivery_raw, year=TARGET_YEAR
-        )
-        print("[run_all] 납품달력 정규화 및 주문 테이블 생성 완료")
+def stage_stock():
+    # 입출고달력 → 재고 이동 데이터 변환
+    transform_stock_table()
+    # 저장된 재고 잔량을 전체 기록 합계와 대조 (불일치 시 교정)
+    MovementJournal(FILE_STOCK_TABLE).reconcile()
+    print("[run_all] 입출고달력 정규화 및 재고 이동 테이블 생성 완료")
+
+
+def stage_production(year: int):
+    analyze_production(load_orders(year), year=year)
+
+
+def stage_stock_report():
+    analyze_stock(load_stock_movement(), balance=MovementJournal(FILE_STOCK_TABLE).balances())
+
 
-        # 3) 입출고달력 → 재고 이동 데이터 변환
-        stock_mov = transform_stock_table()
-        analyze_stock(stock_mov)
-        print("[run_all] 입출고달력 정규화 및 재고 이동 테이블 생성 완료")
+def stage_crm(year: int):
+    analyze_crm(load_customers(), load_orders(year), year=year)
 
-        # 4) 분석: 생산/공정
-        analyze_production(orders, year=TARGET_YEAR)
 
-        # 5) 분석: 재고
-        analyze_stock(stock_mov)
+def build_stages(year: int = TARGET_YEAR):
+    """
+    단계별 입력/출력 선언 (의존관계는 파일 기준으로 pipeline에서 계산)
 
-        # 6) 분석: CRM
-        analyze_crm(customers, orders, year=TARGET_YEAR)
+        납품달력 ─ orders ─┬─ production
+                           └─ crm ── 회원정보
+        재고입출고(+저널), stock_master ─ stock ── stock_report
+    """
+    params = {"year": year}
+    orders_outputs = list(clean_output_paths(year).values())
+    orders_file = clean_output_paths(year)["orders"]
+
+    return [
+        Stage("transform_delivery_to_orders", partial(stage_orders, year),
+              inputs=[FILE_PROD_CAL], outputs=orders_outputs, params=params),
+        Stage("transform_stock_table", stage_stock,
+              inputs=[FILE_STOCK_TABLE, *STOCK_JOURNAL_FILES, FILE_STOCK_MASTER],
+              outputs=[FILE_STOCK_MOVEMENT, FILE_STOCK_REJECTED]),
+        Stage("analyze_production", partial(stage_production, year),
+              inputs=[orders_file], outputs=[production_report_path(year)], params=params),
+        Stage("analyze_stock", stage_stock_report,
+              inputs=[FILE_STOCK_MOVEMENT], outputs=[STOCK_REPORT_FILE]),
+        Stage("analyze_crm", partial(stage_crm, year),
+              inputs=[FILE_CUSTOMER, orders_file], outputs=[crm_report_path(year)], params=params),
+    ]
+
+
+def main(incremental: bool = True, workers: int = None):
+    """
+    incremental=True  : 입력 파일이 바뀌지 않은 단계는 건너뛰고 기존 결과 재사용
+    incremental=False : 모든 단계 재실행 (manifest는 새로 기록)
+    workers           : 프로세스 수 (1이면 현재 프로세스에서 순서대로 실행)
+    """
+    start_time = datetime.now()
+    print(f"=== 양복점 데이터 자동화 시작: {start_time} ===")
+
+    try:
+        manifest = Manifest(force=not incremental)
+        log_path = LOG_DIR / f"run_{start_time.strftime('%Y%m%d_%H%M%S')}.log"
+        run_stages(build_stages(TARGET_YEAR), manifest=manifest, max_workers=workers, log_path=log_path)
 
         end_time = datetime.now()
         print(f"=== 자동화 완료: {end_time}, 소요 시간: {end_time - start_time} ===")
+        print(f"[run_all] 단계별 실행 로그: {log_path}")
 
     except Exception as e:
         print("[run_all] 오류 발생:", e)
@@ -56,4 +106,11 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="양복점 데이터 자동화 파이프라인")
+    parser.add_argument("--full", action="store_true", help="변경 여부와 관계없이 모든 단계 재실행")
+    parser.add_argument("--workers", type=int, default=None, help="동시 실행 프로세스 수 (1 = 순차 실행)")
+    parser.add_argument("--clear-cache", action="store_true", help="원본 엑셀 캐시(raw_cache)를 비우고 다시 읽기")
+    args = parser.parse_args()
+    if args.clear_cache:
+        print(f"[run_all] 원본 엑셀 캐시 {invalidate_raw_cache()}개 삭제")
+    main(incremental=not args.full, workers=args.workers)
@@ -1,97 +1,111 @@
 import pandas as pd
 from datetime import datetime
-from config import DATA_RAW_DIR
-from generate_stock_id import detect_category, get_next_id
-
-MASTER = DATA_RAW_DIR / "stock_master.xlsx"
-MOVEMENT = DATA_RAW_DIR / "재고입출고.xlsx"
-
-# 단위 표준
-UNIT_MAP = {
-    "fabric": "m",
-    "lining": "m",
-    "interlining": "m",
-    "button": "ea",
-    "zipper": "ea",
-    "other": "ea",
-}
+from config import FILE_STOCK_MASTER, FILE_STOCK_TABLE
+from file_lock import file_lock
+from storage import read_table, write_table
+from generate_stock_id import detect_category, get_allocator
+from movement_journal import MovementJournal
+from movement_normalize import CATEGORY_BY_PREFIX, UNIT_MAP, normalize_movements, report_rejected
+
+MASTER = FILE_STOCK_MASTER
+MOVEMENT = FILE_STOCK_TABLE
 
 def load_master():
     try:
-        return pd.read_excel(MASTER)
+        return read_table(MASTER)
     except:
         return pd.DataFrame(columns=["stock_id","stock_name","category","unit","cost_per_unit","note"])
 
 def save_master(df):
-    df.to_excel(MASTER, index=False)
-
-def load_movement():
-    try:
-        df = pd.read_excel(MOVEMENT)
-    except:
-        return pd.DataFrame(columns=[
-            "date","stock_id","stock_name","type",
-            "quantity","quantity_signed","unit",
-            "related_order_id","note"
-        ])
-
-    # quantity_signed가 없는 경우 생성
-    if "quantity_signed" not in df.columns:
-        df["quantity_signed"] = df.apply(
-            lambda row: -row["quantity"] if row["type"] == "OUT"
-                        else row["quantity"],
-            axis=1
-        )
+    write_table(df, MASTER)
 
-    return df
+def get_journal():
+    return MovementJournal(MOVEMENT)
 
-
-def save_movement(df):
-    df.to_excel(MOVEMENT, index=False)
-
-def register_material(name, cost_per_unit=0, initial_qty=0):
-    master = load_master()
-    movement = load_movement()
-
-    prefix = detect_category(name)
-    new_id = get_next_id(master, prefix)
-
-    category = {
-        "F": "fabric",
-        "L": "lining",
-        "I": "interlining",
-        "B": "button",
-        "Z": "zipper",
-    }.get(prefix, "other")
-
-    unit = UNIT_MAP[category]
-
-    # 마스터에 신규 등록 추가
-    new_row = {
-        "stock_id": new_id,
-        "stock_name": name,
-        "category": category,
-        "unit": unit,
-        "cost_per_unit": cost_per_unit,
-        "note": ""
-    }
-    master = pd.concat([master, pd.DataFrame([new_row])], ignore_index=True)
-    save_master(master)
+def load_movement():
+    # 전체 입출고 기록 (movement_normalize 로 정리, 오류 행은 건수만 출력하고 제외)
+    movement, rejected = normalize_movements(get_journal().load(), load_master())
+    report_rejected(rejected, "stock_register")
+    return movement
+
+def append_movement(rows):
+    # 입출고 기록 추가 (dict 또는 dict list) - 엑셀 전체를 다시 쓰지 않고 저널 끝에 추가
+    return get_journal().append(rows)
+
+def append_movement_if_absent(rows, movement_type="OUT"):
+    # 아직 movement_type 기록이 없는 주문(related_order_id)의 행만 추가 → (seq list, 건너뛴 주문번호 set)
+    # 확인과 추가가 같은 저널 잠금 안 → 동시에 실행돼도 같은 주문을 두 번 출고하지 않음
+    return get_journal().append_if_absent(rows, movement_type=movement_type)
+
+def load_posted_order_ids(movement_type="OUT"):
+    # 이미 출고(OUT) 기록이 있는 주문번호 set
+    return get_journal().related_order_ids(movement_type)
+
+def load_stock_balances():
+    # stock_id 별 현재 잔량 (입출고 기록 전체를 합산하지 않고 저장된 잔량 사용)
+    return get_journal().balances()
+
+def export_movement_excel():
+    # 재고입출고.xlsx 를 최신 기록으로 다시 생성 (엑셀로 확인할 때만)
+    return get_journal().export_excel()
+
+def register_materials(materials):
+    """
+    자재 여러 개 한 번에 등록 (거래명세서의 신규 자재 등)
+    materials: [{"name":..., "cost_per_unit":..., "initial_qty":...}, ...] 또는 자재명 list
+    마스터 읽기·저장 1번, stock_id 발급 1번, 초기 입고 저널 추가 1번 → 새 stock_id list
+    """
+    items = [m if isinstance(m, dict) else {"name": m} for m in materials]
+    if not items:
+        return []
+
+    # 다른 프로세스의 등록과 마스터 읽기~저장이 겹치지 않도록
+    with file_lock(MASTER.with_suffix(".lock")):
+        master = load_master()
+        prefixes = [detect_category(item["name"]) for item in items]
+        new_ids = get_allocator().allocate(prefixes, master_df=master)
+
+        rows = []
+        for item, prefix, new_id in zip(items, prefixes, new_ids):
+            category = CATEGORY_BY_PREFIX.get(prefix, "other")
+            rows.append({
+                "stock_id": new_id,
+                "stock_name": item["name"],
+                "category": category,
+                "unit": UNIT_MAP[category],
+                "cost_per_unit": item.get("cost_per_unit", 0),
+                "note": ""
+            })
+        # 마스터에 신규 등록 추가
+        master = pd.concat([master, pd.DataFrame(rows)], ignore_index=True)
+        save_master(master)
+        get_allocator().mark_master_saved()
 
     # 초기 입고 처리
-    if initial_qty > 0:
-        movement_row = {
-            "date": datetime.today().strftime("%Y-%m-%d"),
-            "stock_id": new_id,
-            "stock_name": name,
+    today = datetime.today().strftime("%Y-%m-%d")
+    movement_rows = [
+        {
+            "date": today,
+            "stock_id": row["stock_id"],
+            "stock_name": row["stock_name"],
             "type": "IN",
-            "quantity": initial_qty,
-            "unit": unit,
+            "quantity": item.get("initial_qty", 0),
+            "unit": row["unit"],
             "related_order_id": "",
             "note": "초기입고"
         }
-        movement = pd.concat([movement, pd.DataFrame([movement_row])], ignore_index=True)
-        save_movement(movement)
+        for item, row in zip(items, rows)
+        if item.get("initial_qty", 0) > 0
+    ]
+    if movement_rows:
+        append_movement(movement_rows)
+
+    for item, row in zip(items, rows):
+        print(
+            f"[등록 완료] {row['stock_name']} → {row['stock_id']} | "
+            f"단가={row['cost_per_unit']}, 초기입고={item.get('initial_qty', 0)} {row['unit']}"
+        )
+    return new_ids
 
-    print(f"[등록 완료] {name} → {new_id} | 단가={cost_per_unit}, 초기입고={initial_qty} {unit}")
-    return new_id
+def register_material(name, cost_per_unit=0, initial_qty=0):
+    return register_materials([{"name": name, "cost_per_unit": cost_per_unit, "initial_qty": initial_qty}])[0]
@@ -0,0 +1,108 @@
+# scripts/storage.py
+"""
+data_clean 중간 산출물 저장/로드 공통 모듈
+
+- 기본 형식은 config.CLEAN_FORMAT (parquet / feather / xlsx)
+- 엑셀은 사람이 볼 때만 export_excel()로 따로 생성
+- 원본(data_raw) 엑셀도 read_table()로 읽어 확장자별 처리를 한 곳에 모음
+"""
+import sys
+from pathlib import Path
+
+import pandas as pd
+from config import DATA_CLEAN_DIR, CLEAN_FORMAT, EXPORT_CLEAN_EXCEL
+
+SUFFIX = {
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "xlsx": ".xlsx",
+}
+
+
+def clean_path(stem: str, fmt: str = CLEAN_FORMAT) -> Path:
+    """
+    'orders_2025' → data_clean/orders_2025.parquet (형식에 따라 확장자 변경)
+    """
+    if fmt not in SUFFIX:
+        raise ValueError(f"지원하지 않는 저장 형식입니다: {fmt}")
+    return DATA_CLEAN_DIR / f"{stem}{SUFFIX[fmt]}"
+
+
+def _to_arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    parquet/feather는 컬럼당 한 가지 타입만 허용 →
+    문자열/숫자가 섞인 object 컬럼(품목 정보 등)은 문자열로 통일 (결측은 그대로)
+    """
+    out = df.reset_index(drop=True)
+    for c in out.columns:
+        if out[c].dtype != object:
+            continue
+        values = out[c].dropna()
+        if values.map(type).nunique() > 1:
+            out[c] = out[c].map(lambda v: v if pd.isna(v) else str(v))
+    return out
+
+
+def write_table(df: pd.DataFrame, path) -> Path:
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        _to_arrow_safe(df).to_parquet(path, index=False)
+    elif suffix == ".feather":
+        _to_arrow_safe(df).to_feather(path)
+    elif suffix == ".csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    else:
+        df.to_excel(path, index=False)
+    return path
+
+
+def read_table(path, **excel_kwargs) -> pd.DataFrame:
+    """
+    확장자에 맞춰 읽기
+    excel_kwargs 는 엑셀/CSV일 때만 사용 (header=None, dtype, parse_dates 등)
+    parquet/feather는 저장된 타입을 그대로 사용
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    if suffix == ".feather":
+        return pd.read_feather(path)
+    if suffix == ".csv":
+        return pd.read_csv(path, encoding="utf-8-sig", **excel_kwargs)
+    return pd.read_excel(path, **excel_kwargs)
+
+
+def write_clean(df: pd.DataFrame, stem: str) -> Path:
+    """
+    중간 산출물 저장 (EXPORT_CLEAN_EXCEL=True면 엑셀도 함께 저장)
+    """
+    path = write_table(df, clean_path(stem))
+    if EXPORT_CLEAN_EXCEL and path.suffix != ".xlsx":
+        df.to_excel(clean_path(stem, "xlsx"), index=False)
+    return path
+
+
+def read_clean(stem: str, **excel_kwargs) -> pd.DataFrame:
+    return read_table(clean_path(stem), **excel_kwargs)
+
+
+def export_excel(stem: str) -> Path:
+    """
+    중간 산출물을 엑셀로 내보내기 (필요할 때만)
+    """
+    out_path = clean_path(stem, "xlsx")
+    read_clean(stem).to_excel(out_path, index=False)
+    print(f"[storage] 엑셀 내보내기: {out_path}")
+    return out_path
+
+
+if __name__ == "__main__":
+    # python storage.py orders_2025 stock_movement  → data_clean/*.xlsx 생성
+    # 인자가 없으면 data_clean 안의 모든 중간 산출물을 내보냄
+    stems = sys.argv[1:] or sorted(
+        p.stem for p in DATA_CLEAN_DIR.glob(f"*{SUFFIX[CLEAN_FORMAT]}")
+    )
+    for s in stems:
+        export_excel(s)
@@ -1,8 +1,10 @@
 # scripts/transform_orders.py
 import re
 import math
+import numpy as np
 import pandas as pd
-from config import DATA_CLEAN_DIR, TARGET_YEAR
+from config import TARGET_YEAR
+from storage import clean_path, write_clean
 
 def parse_name_and_code(raw):
     """
@@ -18,9 +20,10 @@ def parse_name_and_code(raw):
     return s, None
 
 
-def flatten_delivery_calendar(delivery_raw: pd.DataFrame, year: int) -> pd.DataFrame:
+def flatten_delivery_calendar_loop(delivery_raw: pd.DataFrame, year: int) -> pd.DataFrame:
     """
-    엘부림 납품달력(캘린더 구조)을 실제 '행 데이터'로 펼치는 로직.
+    엘부림 납품달력(캘린더 구조)을 실제 '행 데이터'로 펼치는 로직. (셀 단위 루프 버전)
+    flatten_delivery_calendar 와 결과가 같아야 하며, 비교/벤치마크 기준으로 남겨둠.
 
     구조 가정 (실제 파일 확인해서 맞춰놓은 버전):
     - 어느 행엔가 0열에 '월/일', 1·5·9·13·17·21·25열에 '일,월,화,수,목,금,토'가 있음 → 요일 헤더
@@ -152,12 +155,157 @@ def flatten_delivery_calendar(delivery_raw: pd.DataFrame, year: int) -> pd.DataF
     return flat
 
 
-def generate_order_ids(flat: pd.DataFrame) -> pd.DataFrame:
+WEEKDAY_NAMES = ["일", "월", "화", "수", "목", "금", "토"]
+
+# 셀 분류용 (object 배열 전체에 한 번에 적용)
+_is_str_cell = np.frompyfunc(lambda v: isinstance(v, str), 1, 1)
+_is_num_cell = np.frompyfunc(
+    lambda v: isinstance(v, (int, float)) and not (isinstance(v, float) and math.isnan(v)),
+    1, 1,
+)
+
+
+def _classify_day_cells(cells: np.ndarray):
     """
-    A안: 연도 + customer_code_raw + 일련번호
-    - customer_code_raw가 없으면 customer_name_raw 기준으로 surrogate code 생성
+    요일 열 셀들을 한 번에 분류
+    반환: (날짜 숫자 grid(float, 없으면 NaN), 이름 셀 mask)
+    - 숫자 셀 → int(val)
+    - 문자열 셀 → '1(신정)'처럼 앞쪽 숫자가 있으면 날짜, 없고 비어있지 않으면 이름
+    """
+    day_grid = np.full(cells.shape, np.nan)
+    name_mask = np.zeros(cells.shape, dtype=bool)
+
+    num_mask = _is_num_cell(cells).astype(bool)
+    if num_mask.any():
+        day_grid[num_mask] = np.trunc(cells[num_mask].astype(float))
+
+    str_mask = _is_str_cell(cells).astype(bool)
+    if str_mask.any():
+        texts = pd.Series(cells[str_mask], dtype=object).str.strip()
+        digits = texts.str.extract(r"^(\d+)", expand=False)
+        day_grid[str_mask] = digits.astype(float).to_numpy()
+        name_mask[str_mask] = (texts != "").to_numpy()
+
+    return day_grid, name_mask
+
+
+def _parse_month_column(col0: pd.Series) -> pd.Series:
+    """
+    0열의 '1월', '12월' 같은 값을 월 숫자로 변환 (해당 없으면 NaN)
+    """
+    is_str = _is_str_cell(col0.to_numpy(dtype=object)).astype(bool)
+    text = col0.where(is_str).astype(object)
+    month_text = text.where(text.str.contains("월", na=False)).str.replace("월", "").str.strip()
+    valid = month_text.str.fullmatch(r"[+-]?\d+", na=False)
+    return pd.to_numeric(month_text.where(valid), errors="coerce")
+
+
+def flatten_delivery_calendar(delivery_raw: pd.DataFrame, year: int) -> pd.DataFrame:
     """
+    엘부림 납품달력(캘린더 구조)을 실제 '행 데이터'로 펼치는 로직. (벡터화 버전)
+
+    구조 가정은 flatten_delivery_calendar_loop 와 동일.
+    셀을 한 번만 분류한 뒤
+      - 요일 열에 날짜 숫자가 하나라도 있는 줄 → '날짜 헤더 줄' (mask)
+      - 헤더 줄 위치/월 정보는 아래 방향으로 forward-fill
+      - 헤더 줄이 아닌 줄의 문자열 셀 → 주문 레코드
+    로 처리하므로 여러 해 분량의 달력도 한 번의 스캔으로 펼친다.
+    결과(records 컬럼, row_idx/col_idx 포함)는 루프 버전과 같다.
+    """
+
+    df = delivery_raw
+    n_rows, n_cols = df.shape
+    if n_rows == 0 or n_cols == 0:
+        print("[flatten_delivery_calendar] '월/일' 헤더를 찾지 못했습니다.")
+        return pd.DataFrame()
+
+    # 1) 요일 헤더 행 찾기 (0열이 '월/일'인 첫 행)
+    col0 = df.iloc[:, 0]
+    hits = np.flatnonzero(
+        (col0.astype(str).str.strip() == "월/일").to_numpy()
+        & _is_str_cell(col0.to_numpy(dtype=object)).astype(bool)
+    )
+    if len(hits) == 0:
+        print("[flatten_delivery_calendar] '월/일' 헤더를 찾지 못했습니다.")
+        return pd.DataFrame()
+    weekday_row_idx = int(hits[0])
+
+    weekday_row = df.iloc[weekday_row_idx]
+    day_cols = [
+        c for c in range(1, n_cols)
+        if isinstance(weekday_row.iloc[c], str)
+        and weekday_row.iloc[c].strip() in WEEKDAY_NAMES
+    ]
+
+    start = weekday_row_idx + 1
+    if start >= n_rows or not day_cols:
+        return pd.DataFrame()
+
+    values = df.to_numpy(dtype=object)
+    body = values[start:]
+
+    # 2) 요일 열 셀 분류 (1회) → 날짜 헤더 줄 mask
+    day_grid, name_mask = _classify_day_cells(body[:, day_cols])
+    is_header = ~np.isnan(day_grid).all(axis=1)
 
+    # 각 줄이 속한 날짜 헤더 줄(body 기준 위치), 첫 헤더 이전은 -1
+    positions = np.arange(len(body))
+    header_pos = np.maximum.accumulate(np.where(is_header, positions, -1))
+
+    # 3) 월 정보: 헤더 줄과 첫 헤더 이전 줄에서만 갱신 → forward-fill
+    month_raw = _parse_month_column(col0.iloc[start:].reset_index(drop=True))
+    month_raw = month_raw.where(is_header | (header_pos < 0))
+    month_ffill = month_raw.ffill().to_numpy()
+
+    # 4) 실제 레코드 셀: 헤더 블록 안쪽 줄의 이름 셀 (행 우선 순서)
+    record_mask = name_mask & ((~is_header) & (header_pos >= 0))[:, None]
+    rec_r, rec_k = np.nonzero(record_mask)
+    if len(rec_r) == 0:
+        return pd.DataFrame()
+
+    day_cols_arr = np.asarray(day_cols)
+    rec_c = day_cols_arr[rec_k]
+    days = day_grid[header_pos[rec_r], rec_k]
+    months = month_ffill[rec_r]
+
+    # 날짜 만들기 (잘못된 날짜는 None)
+    dates = pd.to_datetime(
+        pd.DataFrame({"year": year, "month": months, "day": days}),
+        errors="coerce",
+    )
+
+    names, codes = zip(*(parse_name_and_code(v) for v in body[rec_r, rec_c]))
+
+    def _items(offset):
+        cols = rec_c + offset
+        inside = cols < n_cols
+        out = np.full(len(rec_r), None, dtype=object)
+        out[inside] = body[rec_r[inside], cols[inside]]
+        return out.tolist()
+
+    def _to_list(arr):
+        return [None if pd.isna(v) else int(v) for v in arr]
+
+    flat = pd.DataFrame({
+        "order_date": [None if pd.isna(d) else d for d in dates],
+        "customer_name_raw": list(names),
+        "customer_code_raw": list(codes),
+        "weekday": values[weekday_row_idx, rec_c].tolist(),
+        "month": _to_list(months),
+        "day": _to_list(days),
+        "item_info_1": _items(1),
+        "item_info_2": _items(2),
+        "item_info_3": _items(3),
+        "row_idx": (rec_r + start).tolist(),
+        "col_idx": rec_c.tolist(),
+    })
+    return flat
+
+
+def _prepare_order_frame(flat: pd.DataFrame) -> pd.DataFrame:
+    """
+    generate_order_ids 공통 전처리: customer_code_raw 보정 + 정렬
+    """
     df = flat.copy()
 
     # 1) customer_code_raw 없으면 생성
@@ -174,7 +322,67 @@ def generate_order_ids(flat: pd.DataFrame) -> pd.DataFrame:
             print("[generate_order_ids] customer_name_raw도 없어 모든 row에 동일 코드 1을 부여했습니다.")
 
     # 2) 정렬
-    df = df.sort_values(["customer_code_raw", "order_date"]).reset_index(drop=True)
+    return df.sort_values(["customer_code_raw", "order_date"]).reset_index(drop=True)
+
+
+_is_none = np.frompyfunc(lambda v: v is None, 1, 1)
+
+
+def generate_order_ids(flat: pd.DataFrame) -> pd.DataFrame:
+    """
+    A안: 연도 + customer_code_raw + 일련번호
+    - customer_code_raw가 없으면 customer_name_raw 기준으로 surrogate code 생성
+
+    일련번호는 (코드, 연도)가 바뀌는 지점마다 그룹을 나눈 뒤 groupby().cumcount()로 부여하고,
+    주문번호(YYYY-CCCC-SS)는 컬럼 단위 문자열 연산으로 만든다.
+    결과는 generate_order_ids_loop 와 같다.
+    """
+
+    df = _prepare_order_frame(flat)
+
+    # 3) 코드+연도 기준 일련번호 부여
+    code = df["customer_code_raw"]
+    prev_code = code.shift()
+    year = df["order_date"].dt.year
+    prev_year = year.shift()
+
+    # 루프 버전과 같은 비교 규칙: None끼리는 같은 코드, NaN끼리는 다른 코드 / 연도 없음끼리는 같은 연도
+    code_vals = code.to_numpy(dtype=object)
+    prev_vals = prev_code.to_numpy(dtype=object)
+    same_code = (code == prev_code).to_numpy() | (
+        _is_none(code_vals).astype(bool) & _is_none(prev_vals).astype(bool)
+    )
+    same_year = ((year == prev_year) | (year.isna() & prev_year.isna())).to_numpy()
+
+    new_group = ~(same_code & same_year)
+    if len(new_group):
+        new_group[0] = True
+    group_no = np.cumsum(new_group)
+    df["order_seq"] = df.groupby(group_no).cumcount().to_numpy() + 1
+
+    # 4) 주문번호 생성 (코드 없으면 None)
+    has_code = code.notna()
+    order_id = pd.Series(None, index=df.index, dtype=object)
+    if has_code.any():
+        code_num = pd.to_numeric(code[has_code]).astype("int64")
+        y = year[has_code]
+        y_str = y.astype("Int64").astype(str).where(y.notna(), "nan")
+        order_id[has_code] = (
+            y_str
+            + "-" + code_num.astype(str).str.zfill(4)
+            + "-" + df.loc[has_code, "order_seq"].astype(str).str.zfill(2)
+        )
+    df["order_id"] = order_id.tolist()
+
+    return df
+
+
+def generate_order_ids_loop(flat: pd.DataFrame) -> pd.DataFrame:
+    """
+    generate_order_ids 의 행 단위(iterrows) 구현. 결과 비교/벤치마크 기준으로 남겨둠.
+    """
+
+    df = _prepare_order_frame(flat)
 
     # 3) 코드+연도 기준 일련번호 부여
     seq_list = []
@@ -241,6 +449,21 @@ def build_order_table(flat_with_id: pd.DataFrame) -> pd.DataFrame:
     return order_df
 
 
+def clean_output_stems(year: int = TARGET_YEAR) -> dict:
+    """
+    transform_delivery_to_orders 가 data_clean에 쓰는 산출물 이름 (확장자는 storage 형식에 따름)
+    """
+    return {
+        "flat": f"delivery_flat_{year}",
+        "flat_with_id": f"delivery_flat_with_id_{year}",
+        "orders": f"orders_{year}",
+    }
+
+
+def clean_output_paths(year: int = TARGET_YEAR) -> dict:
+    return {k: clean_path(stem) for k, stem in clean_output_stems(year).items()}
+
+
 def transform_delivery_to_orders(delivery_raw: pd.DataFrame, year: int = TARGET_YEAR):
     """
     전체 파이프라인:
@@ -252,8 +475,9 @@ def transform_delivery_to_orders(delivery_raw: pd.DataFrame, year: int = TARGET_
     orders = build_order_table(flat_with_id)
 
     # 저장
-    flat.to_excel(DATA_CLEAN_DIR / f"delivery_flat_{year}.xlsx", index=False)
-    flat_with_id.to_excel(DATA_CLEAN_DIR / f"delivery_flat_with_id_{year}.xlsx", index=False)
-    orders.to_excel(DATA_CLEAN_DIR / f"orders_{year}.xlsx", index=False)
+    stems = clean_output_stems(year)
+    write_clean(flat, stems["flat"])
+    write_clean(flat_with_id, stems["flat_with_id"])
+    write_clean(orders, stems["orders"])
 
     return flat_with_id, orders
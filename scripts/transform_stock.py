@@ -1,22 +1,26 @@
 # scripts/transform_stock.py
 
-import pandas as pd
-from config import DATA_RAW_DIR, DATA_CLEAN_DIR
+from config import FILE_STOCK_TABLE
+from movement_journal import MovementJournal
+from movement_normalize import normalize_movements, report_rejected
+from stock_register import load_master
+from storage import clean_path, write_clean
 
-FILE_STOCK_TABLE = DATA_RAW_DIR / "재고입출고.xlsx"
+STOCK_MOVEMENT_STEM = "stock_movement"
+FILE_STOCK_MOVEMENT = clean_path(STOCK_MOVEMENT_STEM)
+# type/날짜/단위 오류로 제외된 기록 (확인용)
+STOCK_REJECTED_STEM = "stock_movement_rejected"
+FILE_STOCK_REJECTED = clean_path(STOCK_REJECTED_STEM)
 
 def transform_stock_table():
-    df = pd.read_excel(FILE_STOCK_TABLE)
+    # 재고입출고.xlsx(직접 수정분 포함) + 저널에 추가된 기록
+    df = MovementJournal(FILE_STOCK_TABLE).load()
 
-    # 날짜 datetime 변환
-    df["date"] = pd.to_datetime(df["date"], errors="coerce")
+    # 날짜 변환, 단위 통일, IN → + / OUT → - (오류 행은 따로 저장)
+    df, rejected = normalize_movements(df, load_master())
+    report_rejected(rejected, "transform_stock")
 
-    # IN → +, OUT → -
-    df["quantity_signed"] = df.apply(
-        lambda r: r["quantity"] if r["type"] == "IN" else -r["quantity"],
-        axis=1
-    )
-
-    df.to_excel(DATA_CLEAN_DIR / "stock_movement.xlsx", index=False)
+    write_clean(df, STOCK_MOVEMENT_STEM)
+    write_clean(rejected, STOCK_REJECTED_STEM)
 
     return df
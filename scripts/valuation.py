@@ -0,0 +1,320 @@
+# scripts/valuation.py
+"""
+재고 평가 (월말 재고금액 / 매출원가)
+
+- 입출고 기록을 stock_id 별로 날짜 순 재생
+    fifo    : 입고 단위(layer)별 수량·단가를 유지, 출고는 먼저 들어온 layer 부터 소진
+    average : 이동평균 (입고 때마다 평균 단가 갱신, 출고는 그 시점 평균 단가)
+- stock_id 끼리는 서로 독립 → 프로세스 풀에서 나눠서 계산
+- 월 마감(close): 마감한 달의 결과와 월말 layer 를 저장해 두고,
+  다음 마감은 그 뒤 달의 기록만 이어서 재생 (이전 달은 다시 계산하지 않음)
+- 재고보다 많이 출고하면 마지막 입고 단가(없으면 마스터 단가)로 원가를 매기고,
+  나중에 입고되면 그 달 매출원가에서 단가 차이를 보정
+- 이미 마감한 달의 기록이 나중에 바뀌면 경고 → rebuild 로 처음부터 다시 마감
+
+입고 단가: IN 기록의 unit_cost, 없으면 stock_master.cost_per_unit (costing.prepare_movements)
+
+    python valuation.py fifo 2025-06            # 2025-06 까지 마감
+    python valuation.py average --rebuild       # 전월까지 처음부터 다시 마감
+"""
+import argparse
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from config import VALUATION_DIR
+from costing import COST_METHODS, prepare_movements
+from storage import read_table, write_table
+
+MONTHLY_COLUMNS = [
+    "stock_id", "month",
+    "opening_qty", "opening_value",
+    "in_qty", "in_value",
+    "out_qty", "cogs",
+    "closing_qty", "closing_value",
+]
+
+
+# ----------------------------------------------------------
+# stock_id 1개 재생 (워커 프로세스에서 실행 → 모듈 최상위 함수)
+# ----------------------------------------------------------
+def _replay_stock(task):
+    """
+    task = (stock_id, method, layers, months, moves)
+      layers: 직전 마감 시점 [[수량, 단가], ...] (average 는 1개)
+      months: 이번에 마감할 월 문자열 list ('2025-01', ...)
+      moves : 날짜 순 numpy 배열 묶음 (월 번호(months 위치), 종류(1=IN, -1=OUT, 0=기타), 수량, 입고단가, 마스터단가)
+              → 워커로 보낼 때 행 단위 객체 대신 배열째 pickle
+    반환: (stock_id, 월별 행 list, 마감 후 layers)
+    """
+    stock_id, method, layers, months, moves = task
+    moves = list(zip(*(a.tolist() for a in moves)))
+    layers = deque([list(x) for x in layers])
+    last_cost = layers[-1][1] if layers else None
+
+    def on_hand():
+        return sum(q for q, _ in layers), sum(q * c for q, c in layers)
+
+    def receive(qty, cost):
+        """
+        입고 → 부족분(음수 재고)을 먼저 채우고, 그 부족분을 출고 때 매긴 단가와 입고 단가 차이만큼
+        매출원가 보정액 반환 (월별 기초 + 입고 - 매출원가 = 기말 유지)
+        """
+        nonlocal last_cost
+        last_cost = cost
+        if method == "average":
+            q, v = on_hand()
+            adj = min(qty, -q) * (cost - v / q) if q < 0 else 0.0
+            q, v = q + qty, v + qty * cost - adj
+            layers.clear()
+            layers.append([q, v / q if q else cost])
+            return adj
+
+        adj = 0.0
+        while qty > 0 and layers and layers[0][0] < 0:
+            fill = min(qty, -layers[0][0])
+            adj += fill * (cost - layers[0][1])
+            layers[0][0] += fill
+            qty -= fill
+            if layers[0][0] == 0:
+                layers.popleft()
+        if qty > 0:
+            layers.append([qty, cost])
+        return adj
+
+    def issue(qty, fallback_cost):
+        cost = last_cost if last_cost is not None else fallback_cost
+        if method == "average":
+            q, v = on_hand()
+            unit = v / q if q > 0 else cost
+            layers.clear()
+            layers.append([q - qty, unit])
+            return qty * unit
+
+        cogs = 0.0
+        while qty > 0 and layers and layers[0][0] > 0:
+            take = min(qty, layers[0][0])
+            cogs += take * layers[0][1]
+            layers[0][0] -= take
+            qty -= take
+            if layers[0][0] == 0:
+                layers.popleft()
+        if qty > 0:
+            # 재고보다 많이 출고 → 마지막 단가로 음수 layer
+            cogs += qty * cost
+            layers.appendleft([-qty, cost])
+        return cogs
+
+    rows = []
+    i = 0
+    for m, month in enumerate(months):
+        open_q, open_v = on_hand()
+        in_q = in_v = out_q = cogs = 0.0
+        while i < len(moves) and moves[i][0] == m:
+            _, kind, qty, in_cost, master_cost = moves[i]
+            i += 1
+            if qty <= 0:
+                continue
+            if kind == 1:
+                cogs += receive(qty, in_cost)
+                in_q += qty
+                in_v += qty * in_cost
+            elif kind == -1:
+                cogs += issue(qty, master_cost)
+                out_q += qty
+        close_q, close_v = on_hand()
+        rows.append((stock_id, month, open_q, open_v, in_q, in_v, out_q, cogs, close_q, close_v))
+    return stock_id, rows, [list(x) for x in layers]
+
+
+class InventoryValuation:
+    """
+    월 마감 결과 저장 위치: data_clean/valuation/<method>/
+        monthly.parquet : 마감한 달의 stock_id 별 기초/입고/출고(매출원가)/기말
+        layers.parquet  : 마지막 마감 월말의 layer (다음 마감의 시작점)
+        checks.parquet  : 마감한 달의 stock_id 별 기록 수·수량 합 (나중 변경 감지용)
+        meta.json       : 마지막 마감 월
+    """
+
+    def __init__(self, method: str = "fifo", out_dir=None):
+        if method not in COST_METHODS:
+            raise ValueError(f"지원하지 않는 평가 방식입니다: {method} ({', '.join(COST_METHODS)})")
+        self.method = method
+        self.dir = out_dir or VALUATION_DIR / method
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.monthly_path = self.dir / "monthly.parquet"
+        self.layers_path = self.dir / "layers.parquet"
+        self.checks_path = self.dir / "checks.parquet"
+        self.meta_path = self.dir / "meta.json"
+
+    # ------------------------------
+    # 저장된 마감 결과
+    # ------------------------------
+    def closed_through(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("closed_through")
+        except (OSError, ValueError):
+            return None
+
+    def monthly(self) -> pd.DataFrame:
+        if not self.monthly_path.exists():
+            return pd.DataFrame(columns=MONTHLY_COLUMNS)
+        return read_table(self.monthly_path)
+
+    def _layers(self) -> dict:
+        if not self.layers_path.exists():
+            return {}
+        df = read_table(self.layers_path)
+        layers = {}
+        for sid, q, c in zip(df["stock_id"].tolist(), df["qty"].tolist(), df["cost"].tolist()):
+            layers.setdefault(sid, []).append([q, c])
+        return layers
+
+    def _checks(self) -> pd.DataFrame:
+        if not self.checks_path.exists():
+            return pd.DataFrame(columns=["stock_id", "month", "n", "qty"])
+        return read_table(self.checks_path)
+
+    def clear(self) -> None:
+        for p in (self.monthly_path, self.layers_path, self.checks_path, self.meta_path):
+            if p.exists():
+                os.remove(p)
+
+    # ------------------------------
+    # 마감
+    # ------------------------------
+    @staticmethod
+    def _month_checks(df: pd.DataFrame) -> pd.DataFrame:
+        return (
+            df.groupby(["stock_id", "month"], as_index=False)
+            .agg(n=("quantity", "size"), qty=("quantity", "sum"))
+        )
+
+    def _changed_closed_months(self, df: pd.DataFrame, closed: str) -> list:
+        """
+        마감한 달의 기록이 마감 당시와 다른 (stock_id, 월)
+        """
+        before = self._checks()
+        now = self._month_checks(df[df["month"] <= closed])
+        merged = before.merge(now, on=["stock_id", "month"], how="outer", suffixes=("_closed", "_now"))
+        merged = merged.fillna({"n_closed": 0, "n_now": 0, "qty_closed": 0.0, "qty_now": 0.0})
+        diff = (merged["n_closed"] != merged["n_now"]) | ~np.isclose(merged["qty_closed"], merged["qty_now"])
+        return sorted(set(merged.loc[diff, "month"]))
+
+    @staticmethod
+    def _split_moves(todo: pd.DataFrame, first) -> dict:
+        """
+        stock_id 순으로 정렬된 기록 → {stock_id: 배열 묶음} (경계만 찾아서 슬라이스)
+        기록이 없으면 {} → 기존 재고층만 마감 월들로 이월
+        """
+        if todo.empty:
+            return {}
+        stock = todo["stock_id"].to_numpy(dtype=object)
+        arrays = (
+            (todo["date"].dt.to_period("M").array.asi8 - first.ordinal).astype(np.int32),
+            np.select([todo["type"] == "IN", todo["type"] == "OUT"], [1, -1], 0).astype(np.int8),
+            todo["quantity"].to_numpy(dtype=float),
+            todo["in_unit_cost"].fillna(0.0).to_numpy(dtype=float),
+            todo["master_cost"].to_numpy(dtype=float),
+        )
+        bounds = np.flatnonzero(np.r_[True, stock[1:] != stock[:-1], True])
+        return {stock[s]: tuple(a[s:e] for a in arrays) for s, e in zip(bounds[:-1], bounds[1:])}
+
+    def close(self, movement_df, master_df, through=None, max_workers: int = None) -> pd.DataFrame:
+        """
+        through(포함, 'YYYY-MM')까지 아직 마감 안 한 달을 마감 → 이번에 마감한 월별 결과
+        through 가 없으면 전월까지
+        """
+        through = str(pd.Period(through, "M") if through else pd.Timestamp.today().to_period("M") - 1)
+        closed = self.closed_through()
+        if closed and through <= closed:
+            print(f"[valuation] {self.method}: {through} 까지 이미 마감됨 (마지막 마감 {closed})")
+            return pd.DataFrame(columns=MONTHLY_COLUMNS)
+
+        df = prepare_movements(movement_df, master_df)
+        undated = df["date"].isna().sum()
+        if undated:
+            print(f"[valuation] 날짜가 없는 기록 {undated}건은 평가에서 제외")
+        df = df[df["date"].notna()].copy()
+        df["month"] = df["date"].dt.to_period("M").astype(str)
+
+        if closed:
+            changed = self._changed_closed_months(df, closed)
+            if changed:
+                print(
+                    f"[valuation] 경고: 마감된 달의 기록이 바뀌었습니다 ({', '.join(changed)}). "
+                    f"반영하려면 --rebuild 로 다시 마감하세요."
+                )
+
+        todo = df[(df["month"] <= through) & ((df["month"] > closed) if closed else True)]
+        first = pd.Period(closed, "M") + 1 if closed else (
+            pd.Period(todo["month"].min(), "M") if len(todo) else pd.Period(through, "M")
+        )
+        months = [str(p) for p in pd.period_range(first, through, freq="M")]
+
+        layers = self._layers()
+        moves = self._split_moves(todo, first)
+        tasks = [
+            (sid, self.method, layers.get(sid, []), months, moves.get(sid, ()))
+            for sid in sorted(set(layers) | set(moves))
+        ]
+
+        if max_workers == 1 or len(tasks) < 2:
+            results = list(map(_replay_stock, tasks))
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                results = list(pool.map(_replay_stock, tasks, chunksize=max(1, len(tasks) // 32)))
+
+        new_rows = pd.DataFrame([r for _, rows, _ in results for r in rows], columns=MONTHLY_COLUMNS)
+        new_layers = pd.DataFrame(
+            [(sid, q, c) for sid, _, ls in results for q, c in ls], columns=["stock_id", "qty", "cost"]
+        )
+
+        monthly = pd.concat([self.monthly(), new_rows], ignore_index=True) if closed else new_rows
+        checks = pd.concat(
+            [self._checks(), self._month_checks(todo)], ignore_index=True
+        ) if closed else self._month_checks(todo)
+
+        write_table(monthly, self.monthly_path)
+        write_table(new_layers, self.layers_path)
+        write_table(checks, self.checks_path)
+        with open(self.meta_path, "w", encoding="utf-8") as f:
+            json.dump({"closed_through": through, "method": self.method}, f, ensure_ascii=False, indent=2)
+
+        print(
+            f"[valuation] {self.method}: {months[0] if months else through} ~ {through} 마감 "
+            f"(자재 {len(tasks)}종, 기록 {len(todo)}건)"
+        )
+        return new_rows
+
+    def rebuild(self, movement_df, master_df, through=None, max_workers: int = None) -> pd.DataFrame:
+        self.clear()
+        return self.close(movement_df, master_df, through=through, max_workers=max_workers)
+
+    def summary(self) -> pd.DataFrame:
+        """
+        월별 전체 재고금액 / 매출원가
+        """
+        return self.monthly().groupby("month", as_index=False)[
+            ["in_value", "cogs", "closing_value"]
+        ].sum()
+
+
+if __name__ == "__main__":
+    from stock_register import load_master, load_movement
+
+    parser = argparse.ArgumentParser(description="재고 평가 월 마감")
+    parser.add_argument("method", nargs="?", default="fifo", choices=COST_METHODS)
+    parser.add_argument("through", nargs="?", default=None, help="마감 월 YYYY-MM (기본: 전월)")
+    parser.add_argument("--rebuild", action="store_true", help="기존 마감 결과를 지우고 처음부터 다시 마감")
+    parser.add_argument("--workers", type=int, default=None, help="동시 실행 프로세스 수 (1 = 순차 실행)")
+    args = parser.parse_args()
+
+    valuation = InventoryValuation(args.method)
+    run = valuation.rebuild if args.rebuild else valuation.close
+    run(load_movement(), load_master(), through=args.through, max_workers=args.workers)
+    print(valuation.summary().tail(12).to_string(index=False))
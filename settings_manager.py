@@ -2,11 +2,24 @@
 import os
 import json
 import re
+from functools import lru_cache
 from typing import Dict, Any, Tuple, Optional
 
+import numpy as np
+import pandas as pd
+
 SETTINGS_DIR = "data_settings"
 SETTINGS_FILE = os.path.join(SETTINGS_DIR, "shop_settings.json")
 
+# 치수 표기 해석용 (모듈 로드 때 1번 컴파일)
+_SPACES_RE = re.compile(r"\s+")
+_NUMBER_RE = re.compile(r"\d+(\.\d+)?")
+_FRACTION_RE = re.compile(r"(\d+)/(\d+)")
+_MIXED_RE = re.compile(r"(\d+)\s+(\d+)/(\d+)")
+_FIRST_NUMBER_RE = re.compile(r"(\d+(\.\d+)?)")
+
+PARSE_CACHE_SIZE = 4096  # 같은 표기("17 1/4" 등) 반복 입력 캐시
+
 
 def ensure_settings_file() -> None:
     os.makedirs(SETTINGS_DIR, exist_ok=True)
@@ -47,6 +60,7 @@ def save_settings(settings: Dict[str, Any]) -> None:
     os.makedirs(SETTINGS_DIR, exist_ok=True)
     with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
         json.dump(settings, f, ensure_ascii=False, indent=2)
+    _parser_cache.clear()  # mtime 해상도가 낮은 파일시스템에서도 다음 조회 때 다시 읽도록
 
 
 def _normalize_text(raw: str, char_map: Dict[str, str]) -> str:
@@ -55,10 +69,17 @@ def _normalize_text(raw: str, char_map: Dict[str, str]) -> str:
         s = s.replace(k, v)
     # 다양한 구분자 정리
     s = s.replace("-", " ")
-    s = re.sub(r"\s+", " ", s)
+    s = _SPACES_RE.sub(" ", s)
     return s.strip()
 
 
+def _fraction(a: str, b: str) -> Optional[float]:
+    b = float(b)
+    if b == 0:
+        return None
+    return float(a) / b
+
+
 def _parse_fraction_expr(s: str) -> Optional[float]:
     """
     지원:
@@ -71,72 +92,151 @@ def _parse_fraction_expr(s: str) -> Optional[float]:
     """
     ss = s.strip()
     ss = ss.replace("+", " ")
-    ss = re.sub(r"\s+", " ", ss)
+    ss = _SPACES_RE.sub(" ", ss)
 
     # 숫자만
-    if re.fullmatch(r"\d+(\.\d+)?", ss):
+    if _NUMBER_RE.fullmatch(ss):
         return float(ss)
 
     # 분수만
-    if re.fullmatch(r"\d+/\d+", ss):
-        a, b = ss.split("/")
-        b = float(b)
-        if b == 0:
-            return None
-        return float(a) / b
+    m = _FRACTION_RE.fullmatch(ss)
+    if m:
+        return _fraction(m.group(1), m.group(2))
 
     # "정수 분수"
-    m = re.fullmatch(r"(\d+)\s+(\d+/\d+)", ss)
+    m = _MIXED_RE.fullmatch(ss)
     if m:
-        whole = float(m.group(1))
-        frac = m.group(2)
-        a, b = frac.split("/")
-        b = float(b)
-        if b == 0:
+        frac = _fraction(m.group(2), m.group(3))
+        if frac is None:
             return None
-        return whole + (float(a) / b)
+        return float(m.group(1)) + frac
 
     return None
 
 
-def convert_measure_input(raw_value: Any, settings: Dict[str, Any]) -> Tuple[Optional[float], str]:
+class MeasureParser:
     """
-    raw_value: 사용자가 입력한 값(문자/숫자)
-    반환: (표준숫자 or None, 정규화된 원문)
+    settings 1벌로 만든 치수 입력 해석기 (convert_measure_input 과 같은 결과)
+    - 문자정규화: 한 글자 기호(¼ ½ ¾ …)와 '-' 는 str.translate 1번, 여러 글자 키는 정규식 1번
+      (str.replace 를 키마다 반복하지 않음, 치환 결과를 다시 치환하지 않음)
+    - 치수표기_치환 값은 미리 float 로 변환
+    - 같은 입력 문자열은 LRU 캐시에서 바로 반환
+    - parse_series: 컬럼 전체를 고유값만 해석해서 펼침
     """
-    if raw_value is None:
-        return None, ""
-
-    if isinstance(raw_value, (int, float)):
-        return float(raw_value), str(raw_value)
-
-    raw = str(raw_value).strip()
-    if raw == "":
-        return None, ""
 
-    char_map = settings.get("약속표기", {}).get("문자정규화", {})
-    repl_map = settings.get("약속표기", {}).get("치수표기_치환", {})
-
-    normalized = _normalize_text(raw, char_map)
-
-    # 1) 약속표기 치환이 있으면 우선 적용
-    if normalized in repl_map:
-        try:
-            return float(repl_map[normalized]), normalized
-        except:
-            pass
+    def __init__(self, settings: Dict[str, Any], cache_size: int = PARSE_CACHE_SIZE):
+        promise = settings.get("약속표기", {})
+        char_map = promise.get("문자정규화", {}) or {}
+
+        # 치환 결과의 '-' 도 원래처럼 공백이 되도록 미리 바꿔 둠
+        table = {"-": " "}
+        multi = {}
+        for k, v in char_map.items():
+            if not k:
+                continue
+            v = str(v).replace("-", " ")
+            if len(k) == 1:
+                table[k] = v
+            else:
+                multi[k] = v
+        self._table = str.maketrans(table)
+        self._multi = multi
+        self._multi_re = (
+            re.compile("|".join(re.escape(k) for k in sorted(multi, key=len, reverse=True)))
+            if multi else None
+        )
+
+        self._repl = {}
+        for k, v in (promise.get("치수표기_치환", {}) or {}).items():
+            try:
+                self._repl[k] = float(v)
+            except (TypeError, ValueError):
+                pass  # 숫자가 아닌 약속값은 무시하고 분수 해석으로
+
+        self._parse_text = lru_cache(maxsize=cache_size)(self._parse_text_uncached)
+
+    def normalize(self, raw: str) -> str:
+        s = raw.strip()
+        if self._multi_re is not None:
+            s = self._multi_re.sub(lambda m: self._multi[m.group(0)], s)
+        s = s.translate(self._table)
+        return _SPACES_RE.sub(" ", s).strip()
+
+    def _parse_text_uncached(self, raw: str) -> Tuple[Optional[float], str]:
+        normalized = self.normalize(raw)
+
+        # 1) 약속표기 치환이 있으면 우선 적용
+        if normalized in self._repl:
+            return self._repl[normalized], normalized
+
+        # 2) 분수 표현 파싱
+        parsed = _parse_fraction_expr(normalized)
+        if parsed is not None:
+            return float(parsed), normalized
+
+        # 3) 숫자 추출(마지막 안전망)
+        m = _FIRST_NUMBER_RE.search(normalized)
+        if m:
+            return float(m.group(1)), normalized
+
+        return None, normalized
+
+    def parse(self, raw_value: Any) -> Tuple[Optional[float], str]:
+        """
+        raw_value: 사용자가 입력한 값(문자/숫자)
+        반환: (표준숫자 or None, 정규화된 원문)
+        """
+        if raw_value is None:
+            return None, ""
+
+        if isinstance(raw_value, (int, float)):
+            return float(raw_value), str(raw_value)
+
+        raw = str(raw_value).strip()
+        if raw == "":
+            return None, ""
+        return self._parse_text(raw)
+
+    def parse_series(self, s: pd.Series) -> pd.Series:
+        """
+        입력 컬럼 → float Series (해석 불가·빈 값 → NaN)
+        """
+        codes, uniques = pd.factorize(s, use_na_sentinel=True)
+        parsed = np.array(
+            [v if v is not None else np.nan for v, _ in map(self.parse, uniques)], dtype="float64"
+        )
+        out = np.full(len(s), np.nan)
+        hit = codes >= 0
+        out[hit] = parsed[codes[hit]]
+        return pd.Series(out, index=s.index, name=s.name)
+
+
+_parser_cache: Dict[str, Tuple[int, MeasureParser]] = {}
+
+
+def get_measure_parser() -> MeasureParser:
+    """
+    shop_settings.json 기준 MeasureParser (파일 mtime 이 바뀌었을 때만 다시 읽고 만듦)
+    """
+    ensure_settings_file()
+    mtime = os.stat(SETTINGS_FILE).st_mtime_ns
+    cached = _parser_cache.get(SETTINGS_FILE)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    parser = MeasureParser(load_settings())
+    _parser_cache[SETTINGS_FILE] = (mtime, parser)
+    return parser
 
-    # 2) 분수 표현 파싱
-    parsed = _parse_fraction_expr(normalized)
-    if parsed is not None:
-        return float(parsed), normalized
 
-    # 3) 숫자 추출(마지막 안전망)
-    m = re.search(r"(\d+(\.\d+)?)", normalized)
-    if m:
-        return float(m.group(1)), normalized
-
-    return None, normalized
+def convert_measure_input(raw_value: Any, settings: Optional[Dict[str, Any]] = None) -> Tuple[Optional[float], str]:
+    """
+    raw_value: 사용자가 입력한 값(문자/숫자)
+    반환: (표준숫자 or None, 정규화된 원문)
+    settings 를 생략하면 shop_settings.json 의 캐시된 MeasureParser 사용
+    (settings 를 넘기면 그때마다 MeasureParser 를 만들므로 반복 호출은 get_measure_parser() 권장)
+    """
+    parser = get_measure_parser() if settings is None else MeasureParser(settings)
+    return parser.parse(raw_value)
 
 
 def apply_unit(value: Optional[float], from_unit: str, to_unit: str) -> Optional[float]:
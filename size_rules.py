@@ -0,0 +1,179 @@
+# size_rules.py
+"""
+치수 → 기성 호칭 추천 규칙 (settings/size_rules*.xlsx)
+
+- 규칙 파일은 파일이 바뀌었을 때만 다시 읽음 (mtime 기준 캐시), 설정 화면에서 저장하면 invalidate()
+- 범위 검증: 하한 ≤ 상한, 범위끼리 겹치지 않음
+  (92~96 / 96~100 처럼 경계값 하나만 같은 것은 허용 → 경계값은 아래 범위, 기존 위에서부터 찾던 방식과 같음)
+- 저장할 때는 검증에 실패하면 저장하지 않고, 읽을 때 실패하면 경고 후 전부 '규칙 없음' (화면이 멈추지 않도록)
+- 하한 기준으로 정렬해 두고 searchsorted 로 위치를 찾으므로 치수 여러 건도 한 번에 추천
+- 종류별(상의/하의 …) 규칙은 SIZE_RULE_SPECS 에 한 줄 추가
+
+    load_size_rules("jacket").recommend(measures["chest_cm"])
+"""
+import os
+import warnings
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+SETTINGS_DIR = "settings"
+
+NO_VALUE = "추천 불가"   # 치수가 비어 있음
+NO_RULE = "규칙 없음"    # 어느 범위에도 속하지 않음
+
+# 종류 → 화면 이름 / 규칙 파일 / 기준 부위 / 호칭 컬럼 / 파일이 없을 때 기본 규칙
+SIZE_RULE_SPECS = {
+    "jacket": {
+        "title": "상의",
+        "file": "size_rules.xlsx",
+        "part": "가슴",
+        "label": "상의호칭",
+        "default": ([92, 96, 100, 104], [95, 99, 103, 107], ["K48", "K50", "K52", "K54"]),
+    },
+    "pants": {
+        "title": "하의",
+        "file": "size_rules_pants.xlsx",
+        "part": "허리",
+        "label": "하의호칭",
+        "default": ([74, 79, 84, 89], [78, 83, 88, 93], ["30", "32", "34", "36"]),
+    },
+}
+
+_cache: Dict[str, Tuple[int, "SizeRules"]] = {}
+
+
+def rule_columns(kind: str) -> Tuple[str, str, str]:
+    spec = SIZE_RULE_SPECS[kind]
+    return f"{spec['part']}_cm_하한", f"{spec['part']}_cm_상한", spec["label"]
+
+
+def rule_path(kind: str) -> str:
+    return os.path.join(SETTINGS_DIR, SIZE_RULE_SPECS[kind]["file"])
+
+
+def ensure_rule_file(kind: str = "jacket") -> str:
+    path = rule_path(kind)
+    if not os.path.exists(path):
+        os.makedirs(SETTINGS_DIR, exist_ok=True)
+        lo, hi, label = rule_columns(kind)
+        lower, upper, labels = SIZE_RULE_SPECS[kind]["default"]
+        pd.DataFrame({lo: lower, hi: upper, label: labels}).to_excel(path, index=False)
+    return path
+
+
+class SizeRules:
+    """
+    정렬된 [하한, 상한] 구간 → 호칭 (구간은 서로 겹치지 않음, 경계값 공유만 허용)
+    error: 규칙 파일 검증 실패 메시지 (이때 규칙은 비어 있음)
+    """
+
+    def __init__(self, kind: str, lower: np.ndarray, upper: np.ndarray, labels: np.ndarray, error: str = None):
+        self.kind = kind
+        self.lower = lower
+        self.upper = upper
+        self.labels = labels
+        self.error = error
+
+    @classmethod
+    def empty(cls, kind: str, error: str = None) -> "SizeRules":
+        return cls(kind, np.empty(0), np.empty(0), np.empty(0, dtype=object), error)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, kind: str = "jacket") -> "SizeRules":
+        """
+        규칙 표 → SizeRules (빈 줄은 무시, 잘못된 범위나 겹치는 범위는 ValueError)
+        """
+        lo, hi, label = rule_columns(kind)
+        missing = [c for c in (lo, hi, label) if c not in df.columns]
+        if missing:
+            raise ValueError(f"사이즈 규칙에 컬럼이 없습니다: {', '.join(missing)}")
+
+        rules = pd.DataFrame({
+            "lower": pd.to_numeric(df[lo], errors="coerce"),
+            "upper": pd.to_numeric(df[hi], errors="coerce"),
+            "label": df[label].astype("string").str.strip(),
+        })
+        rules = rules[rules.notna().any(axis=1)]
+        incomplete = rules[rules.isna().any(axis=1)]
+        if len(incomplete):
+            raise ValueError(f"하한/상한/{label} 중 빈 칸이 있는 규칙: {', '.join(str(i + 2) for i in incomplete.index)}행")
+
+        reversed_ = rules[rules["lower"] > rules["upper"]]
+        if len(reversed_):
+            rows = ", ".join(f"{r.label}({r.lower:g}~{r.upper:g})" for r in reversed_.itertuples())
+            raise ValueError(f"하한이 상한보다 큰 규칙: {rows}")
+
+        rules = rules.sort_values("lower", kind="stable")
+        lower = rules["lower"].to_numpy(dtype=float)
+        upper = rules["upper"].to_numpy(dtype=float)
+        labels = rules["label"].to_numpy(dtype=object)
+
+        # 정렬 후 바로 다음 구간의 하한이 이전 구간의 상한보다 작으면 겹침 (같으면 경계 공유)
+        overlap = np.flatnonzero(lower[1:] < upper[:-1])
+        if len(overlap):
+            pairs = ", ".join(
+                f"{labels[i]}({lower[i]:g}~{upper[i]:g}) / {labels[i + 1]}({lower[i + 1]:g}~{upper[i + 1]:g})"
+                for i in overlap
+            )
+            raise ValueError(f"범위가 겹치는 규칙: {pairs}")
+        return cls(kind, lower, upper, labels)
+
+    def recommend(self, values) -> pd.Series:
+        """
+        치수(cm) Series/배열 → 호칭 Series (치수 없음 → '추천 불가', 범위 밖 → '규칙 없음')
+        """
+        s = values if isinstance(values, pd.Series) else pd.Series(values)
+        v = pd.to_numeric(s, errors="coerce").to_numpy(dtype=float)
+        out = np.full(len(v), NO_RULE, dtype=object)
+        if len(self.lower):
+            # 상한이 v 이상인 첫 구간 → 그 구간의 하한 이하이면 해당 (공유 경계값은 아래 구간)
+            idx = np.searchsorted(self.upper, v, side="left")
+            safe = np.clip(idx, None, len(self.upper) - 1)
+            hit = (idx < len(self.upper)) & (self.lower[safe] <= v)
+            out[hit] = self.labels[safe[hit]]
+        out[np.isnan(v)] = NO_VALUE
+        return pd.Series(out, index=s.index, name=SIZE_RULE_SPECS[self.kind]["label"])
+
+    def recommend_one(self, value) -> str:
+        return self.recommend([value]).iloc[0]
+
+
+def load_size_rules(kind: str = "jacket") -> SizeRules:
+    """
+    규칙 파일 → SizeRules (파일이 바뀌었을 때만 다시 읽고 검증)
+    검증에 실패하면 경고 후 빈 규칙(전부 '규칙 없음'), 실패 메시지는 .error
+    """
+    path = ensure_rule_file(kind)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _cache.get(kind)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    try:
+        rules = SizeRules.from_frame(pd.read_excel(path), kind)
+    except ValueError as e:
+        warnings.warn(f"{path} 사이즈 규칙을 쓸 수 없습니다 ({e}) → '{NO_RULE}' 로 처리")
+        rules = SizeRules.empty(kind, str(e))
+    _cache[kind] = (mtime, rules)
+    return rules
+
+
+def save_size_rules(df: pd.DataFrame, kind: str = "jacket") -> SizeRules:
+    """
+    설정 화면 편집 결과 저장: 검증에 통과해야 저장 (실패하면 ValueError, 파일은 그대로)
+    """
+    rules = SizeRules.from_frame(df, kind)
+    df.to_excel(rule_path(kind), index=False)
+    invalidate(kind)
+    return rules
+
+
+def invalidate(kind: str = None) -> None:
+    """
+    캐시된 규칙 삭제 (kind 가 없으면 전체) → 다음 load_size_rules 때 파일을 다시 읽음
+    """
+    if kind is None:
+        _cache.clear()
+    else:
+        _cache.pop(kind, None)
@@ -0,0 +1,361 @@
+# write_behind.py
+"""
+화면 저장(save_members / save_consults / save_measures / save_orders)을 뒤에서 처리하는 저장 큐
+
+- submit(path, df): 표 전체 스냅샷을 WAL(pickle, fsync 후 rename)에 먼저 기록하고 바로 반환
+  → 엑셀 전체 다시 쓰기는 백그라운드 스레드가 처리, 화면은 기다리지 않음
+- submit_rows(path, rows, key): 행 추가만 예약 → 기록할 때 잠금 안에서 파일의 현재 내용에 붙임
+  (다른 태블릿이 그 사이 추가한 행을 덮어쓰지 않음, key 가 같은 행은 다시 붙이지 않음)
+- 같은 파일에 대한 저장이 연달아 들어오면 순번대로 합쳐서 파일은 1번만 기록
+- 파일 기록은 같은 폴더의 임시파일에 쓴 뒤 os.replace → 반쯤 쓴 파일이 보이지 않음
+- 순번은 시계가 아니라 파일마다의 카운터(<파일>.wbnext)에서 잠금 안에 발급하고, WAL 도 같은 잠금 안에서 기록
+  → 순번 n 이 보이면 n 이하의 WAL 은 모두 디스크에 있음
+- 대상 파일마다 잠금 파일(O_EXCL)로 프로세스(태블릿) 간 기록을 직렬화하고, 기록할 때는 자기 대기열뿐 아니라
+  그 파일의 WAL 전체(다른 프로세스가 예약한 것 포함)를 순번대로 반영 → 늦게 도착한 스냅샷이 뒤 순번에 밀려 사라지지 않음
+  (같은 파일을 쓰는 프로세스는 같은 wal_dir 를 써야 함, <파일>.wbseq 에 마지막으로 반영한 순번)
+- 그래도 이미 반영된 순번보다 앞선 스냅샷이 나오면 버리지 않고 wal_dir/skipped 로 옮기고 로그를 남김
+- WAL 은 파일 기록이 끝난 뒤 잠금 안에서 삭제 → 중간에 죽어도 다음 시작 때 recover() 가 다시 반영
+- 기록에 실패하면(파일이 열려 있음 등) 그 파일의 저장을 다시 대기열에 넣고 간격을 늘려 가며 재시도
+  wait() 는 실패 중인 파일이면 기다리지 않고 False (실패 메시지는 errors)
+  (기록 직후·삭제 직전에 죽으면 행 추가가 한 번 더 반영될 수 있음 → key 로 중복 제외)
+
+    queue = WriteBehindQueue("data_members/wal")
+    queue.recover()
+    queue.submit(MASTER_FILE, df_kor)   # .xlsx → to_excel, .csv → to_csv(utf-8-sig)
+    queue.submit_rows(CONSULT_FILE, new_rows, key="상담번호")
+    queue.wait(MASTER_FILE)             # 다시 읽기 전에 대기 중인 기록 마무리
+    queue.written_version(MASTER_FILE, seq, base)  # 내 저장만 기록된 직후의 파일 버전 (다시 읽지 않아도 되는지)
+"""
+import atexit
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import pandas as pd
+
+from scripts.file_lock import file_lock
+
+COALESCE_SECONDS = 0.2  # 첫 저장 후 이만큼 더 모아서 기록
+RETRY_SECONDS = 0.5     # 기록 실패 후 첫 재시도 간격 (실패할 때마다 2배)
+RETRY_MAX_SECONDS = 30  # 재시도 간격 상한
+SNAPSHOT = "snapshot"   # 표 전체 교체
+ROWS = "rows"           # 행 추가
+
+
+def write_table(df: pd.DataFrame, path: str) -> None:
+    """
+    확장자에 맞게 임시파일에 쓰고 원자적으로 교체
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    base, ext = os.path.splitext(os.path.basename(path))
+    fd, tmp = tempfile.mkstemp(prefix=f"~{base}.", suffix=ext, dir=folder)
+    os.close(fd)
+    try:
+        if ext.lower() == ".csv":
+            df.to_csv(tmp, index=False, encoding="utf-8-sig")
+        else:
+            df.to_excel(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def read_table(path: str) -> pd.DataFrame:
+    if os.path.splitext(path)[1].lower() == ".csv":
+        return pd.read_csv(path, encoding="utf-8-sig")
+    return pd.read_excel(path)
+
+
+def _append_rows(current: pd.DataFrame, rows: pd.DataFrame, key: Optional[str]) -> pd.DataFrame:
+    if key and key in current.columns and key in rows.columns:
+        rows = rows[~rows[key].astype(str).isin(current[key].astype(str))]
+    if rows.empty:
+        return current
+    if current.empty:
+        return rows.reindex(columns=current.columns.union(rows.columns, sort=False))
+    return pd.concat([current, rows], ignore_index=True)
+
+
+def file_version(path: str) -> Optional[Tuple[int, int]]:
+    """
+    (mtime_ns, 크기) - 파일이 없으면 None
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _read_seq(path: str, suffix: str = ".wbseq") -> int:
+    try:
+        with open(path + suffix, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _write_seq(path: str, seq: int, suffix: str = ".wbseq") -> None:
+    tmp = path + suffix + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(str(seq))
+    os.replace(tmp, path + suffix)
+
+
+def _load_wal(wal: str) -> Optional[tuple]:
+    """
+    WAL 파일 → (경로, (순번, 종류, df, key, WAL 파일)), 이미 반영돼 없어졌거나 읽을 수 없으면 None
+    """
+    try:
+        with open(wal, "rb") as f:
+            e = pickle.load(f)
+    except FileNotFoundError:
+        return None  # 다른 프로세스가 방금 반영
+    except Exception as e:
+        print(f"[write_behind] WAL 을 읽지 못했습니다 ({os.path.basename(wal)}): {e}")
+        return None
+    return e["path"], (e["seq"], e.get("kind", SNAPSHOT), e["df"], e.get("key"), wal)
+
+
+class WriteBehindQueue:
+    def __init__(self, wal_dir: str, coalesce_seconds: float = COALESCE_SECONDS):
+        self.wal_dir = wal_dir
+        self.coalesce_seconds = coalesce_seconds
+        os.makedirs(wal_dir, exist_ok=True)
+        self._pending: Dict[str, List[tuple]] = {}  # 절대경로 → [(순번, 종류, df, key, WAL 파일)]
+        self._writing: Set[str] = set()
+        self._retry_at: Dict[str, float] = {}  # 실패한 파일 → 다음 재시도 시각 (monotonic)
+        self._failures: Dict[str, int] = {}    # 실패한 파일 → 연속 실패 횟수
+        self._cond = threading.Condition()
+        self.written = 0  # 실제로 파일을 기록한 횟수
+        self.errors: Dict[str, str] = {}  # 재시도 중인 기록 실패 (경로 → 메시지), 기록에 성공하면 지워짐
+        self._landed: Dict[str, tuple] = {}  # 마지막 기록 (경로 → (반영한 순번들, 기록 전 파일 버전, 기록 후 파일 버전))
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.flush)
+
+    # ------------------------------
+    # WAL
+    # ------------------------------
+    def _wal_prefix(self, path: str) -> str:
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:10]
+        stem = os.path.splitext(os.path.basename(path))[0]
+        return f"{stem}-{digest}-"
+
+    def _wal_name(self, path: str, seq: int) -> str:
+        return os.path.join(self.wal_dir, f"{self._wal_prefix(path)}{seq:020d}-{os.getpid()}.pkl")
+
+    def _wal_entries(self, path: str) -> List[tuple]:
+        # 순번 잠금 안에서 호출 - path 의 WAL 전체 (다른 프로세스가 예약한 것 포함)
+        prefix = self._wal_prefix(path)
+        found = []
+        for name in sorted(os.listdir(self.wal_dir)):
+            if name.startswith(prefix) and name.endswith(".pkl"):
+                loaded = _load_wal(os.path.join(self.wal_dir, name))
+                if loaded is not None and loaded[0] == path:
+                    found.append(loaded[1])
+        return found
+
+    def _enqueue(self, path: str, kind: str, df: pd.DataFrame, key: Optional[str]) -> int:
+        path = os.path.abspath(path)
+        # 순번 발급 + WAL 기록을 같은 잠금 안에서 (.wbseq 는 예전 time_ns 순번이 남아 있을 때의 하한)
+        with file_lock(path + ".wbnext.lock"):
+            seq = max(_read_seq(path, ".wbnext"), _read_seq(path)) + 1
+            wal = self._wal_name(path, seq)
+            tmp = wal + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(
+                    {"path": path, "seq": seq, "kind": kind, "df": df, "key": key},
+                    f, protocol=pickle.HIGHEST_PROTOCOL,
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, wal)
+            _write_seq(path, seq, ".wbnext")
+
+        with self._cond:
+            self._pending.setdefault(path, []).append((seq, kind, df, key, wal))
+            self._cond.notify_all()
+        return seq
+
+    def submit(self, path: str, df: pd.DataFrame) -> int:
+        """
+        df(표 전체)를 path 에 저장하도록 예약 (WAL 기록까지 끝나면 반환) → 순번
+        이미 더 나중 순번이 기록돼 있으면 이 스냅샷은 버려짐
+        """
+        return self._enqueue(path, SNAPSHOT, df, None)
+
+    def submit_rows(self, path: str, rows: pd.DataFrame, key: str = None) -> int:
+        """
+        rows 를 path 끝에 추가하도록 예약 → 순번
+        기록할 때 잠금 안에서 파일의 현재 내용에 붙이므로 다른 태블릿이 추가한 행이 사라지지 않음
+        key 가 있으면 파일에 이미 있는 key 값의 행은 다시 붙이지 않음
+        """
+        return self._enqueue(path, ROWS, rows, key)
+
+    def recover(self) -> int:
+        """
+        이전 실행에서 기록하지 못한 WAL 을 순번대로 반영 → 기록한 파일 수
+        """
+        entries: Dict[str, List[tuple]] = {}
+        for name in sorted(os.listdir(self.wal_dir)):
+            wal = os.path.join(self.wal_dir, name)
+            if name.endswith(".tmp"):
+                # fsync 전에 죽은 WAL (submit 이 반환되지 않았던 저장), 다른 프로세스가 쓰는 중일 수 있어 오래된 것만
+                if time.time() - os.path.getmtime(wal) > 60:
+                    self._remove(wal)
+                continue
+            if not name.endswith(".pkl"):
+                continue
+            loaded = _load_wal(wal)
+            if loaded is not None:
+                entries.setdefault(loaded[0], []).append(loaded[1])
+        return sum(self._apply(path, items) for path, items in entries.items())
+
+    def _skip(self, path: str, wal: str, seq: int, last: int) -> None:
+        skipped = os.path.join(self.wal_dir, "skipped")
+        os.makedirs(skipped, exist_ok=True)
+        os.replace(wal, os.path.join(skipped, os.path.basename(wal)))
+        print(
+            f"[write_behind] {path}: 순번 {seq} 스냅샷이 이미 반영된 순번 {last} 보다 앞서 적용하지 않음 "
+            f"→ {skipped} 에 보관"
+        )
+
+    @staticmethod
+    def _remove(wal: str) -> None:
+        try:
+            os.remove(wal)
+        except OSError:
+            pass
+
+    # ------------------------------
+    # 백그라운드 기록
+    # ------------------------------
+    def _apply(self, path: str, entries: List[tuple]) -> bool:
+        """
+        잠금 안에서 entries + 그 파일의 다른 WAL 을 순번대로 현재 파일에 반영하고 1번만 기록 → 기록했으면 True
+        - WAL 이 이미 없으면 다른 프로세스(recover)가 반영한 것이므로 건너뜀
+        - 이미 반영된 순번보다 앞선 스냅샷은 덮어쓰지 않고 skipped 폴더로 옮긴 뒤 로그
+        - WAL 삭제까지 잠금 안에서 → 같은 WAL 이 두 번 반영되지 않음
+        """
+        with file_lock(path + ".lock"):
+            with file_lock(path + ".wbnext.lock"):
+                merged = {e[4]: e for e in self._wal_entries(path)}
+            merged.update({e[4]: e for e in entries})
+            last = _read_seq(path)
+            current = None
+            base = None  # 행 추가로 시작했으면 읽은 파일의 버전 (스냅샷으로 시작하면 None)
+            done, seqs = [], []
+            for seq, kind, df, key, wal in sorted(merged.values(), key=lambda e: e[0]):
+                if not os.path.exists(wal):
+                    continue
+                if kind == SNAPSHOT:
+                    if seq <= last:
+                        self._skip(path, wal, seq, last)
+                        continue
+                    done.append(wal)
+                    seqs.append(seq)
+                    current = df
+                else:
+                    done.append(wal)
+                    seqs.append(seq)
+                    if current is None:
+                        base = file_version(path)
+                        current = read_table(path)
+                    current = _append_rows(current, df, key)
+                last = max(last, seq)
+
+            if current is not None:
+                write_table(current, path)
+                _write_seq(path, last)
+                with self._cond:
+                    self._landed[path] = (frozenset(seqs), base, file_version(path))
+            for wal in done:
+                self._remove(wal)
+        if current is None:
+            return False
+        self.written += 1
+        return True
+
+    def _due(self) -> Dict[str, List[tuple]]:
+        # self._cond 를 잡은 상태에서 호출 - 재시도 시각이 된 파일의 대기열만 꺼냄
+        now = time.monotonic()
+        return {p: self._pending.pop(p) for p in list(self._pending) if self._retry_at.get(p, 0) <= now}
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                while not any(self._retry_at.get(p, 0) <= now for p in self._pending):
+                    waits = [self._retry_at[p] - now for p in self._pending if p in self._retry_at]
+                    self._cond.wait(min(waits) if waits else None)
+                    now = time.monotonic()
+            time.sleep(self.coalesce_seconds)
+            with self._cond:
+                batch = self._due()
+                self._writing = set(batch)
+            for path, entries in batch.items():
+                try:
+                    self._apply(path, entries)
+                except Exception as e:
+                    # WAL 은 남겨 두고 대기열 앞에 다시 넣음 (그 사이 들어온 저장과 함께 재시도)
+                    with self._cond:
+                        n = self._failures.get(path, 0) + 1
+                        delay = min(RETRY_SECONDS * 2 ** (n - 1), RETRY_MAX_SECONDS)
+                        self._failures[path] = n
+                        self._retry_at[path] = time.monotonic() + delay
+                        self._pending[path] = entries + self._pending.get(path, [])
+                        self.errors[path] = str(e)
+                    print(f"[write_behind] 기록 실패 ({path}): {e} → {delay:g}초 뒤 재시도 ({n}번째)")
+                else:
+                    with self._cond:
+                        self.errors.pop(path, None)
+                        self._failures.pop(path, None)
+                        self._retry_at.pop(path, None)
+            with self._cond:
+                self._writing = set()
+                self._cond.notify_all()
+
+    def wait(self, path: str = None, timeout: float = 30) -> bool:
+        """
+        path(없으면 전체)의 대기 중·기록 중 저장이 끝날 때까지 대기 → 제시간에 끝났으면 True
+        기록에 실패해 재시도를 기다리는 파일이 있으면 바로 False (errors 에 실패 메시지)
+        """
+        target = os.path.abspath(path) if path else None
+        deadline = time.monotonic() + timeout
+
+        with self._cond:
+            while True:
+                busy = (set(self._pending) | self._writing) if target is None else \
+                    {target} & (set(self._pending) | self._writing)
+                if not busy:
+                    return True
+                if all(p in self.errors and p not in self._writing for p in busy):
+                    return False
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+
+    def written_version(self, path: str, seq: int, base) -> Optional[Tuple[int, int]]:
+        """
+        seq 저장이 들어간 마지막 기록 직후의 파일 버전 → 화면 쪽 메모리 표를 그대로 써도 되면 그 버전, 아니면 None
+        그 기록에 seq 하나만 들어 있고, 스냅샷이었거나 행 추가 전 파일이 base(메모리 표를 읽은 버전)였을 때만
+        (다른 저장이 섞였으면 파일 내용이 메모리와 다르므로 다시 읽어야 함)
+        """
+        with self._cond:
+            landed = self._landed.get(os.path.abspath(path))
+        if landed is None or landed[0] != {seq}:
+            return None
+        if landed[1] is not None and landed[1] != base:
+            return None
+        return landed[2]
+
+    def flush(self, timeout: float = 30) -> bool:
+        return self.wait(None, timeout)